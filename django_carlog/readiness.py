@@ -0,0 +1,114 @@
+"""Readiness checks: can this process serve requests right now?
+
+Unlike the health check, which only shows the process is up, readiness
+checks the database connection, that every migration has been applied and
+that the cache answers. Results are kept for CACHE_SECONDS and refreshed by
+one request at a time, so frequent probes from a load balancer or deploy
+script add at most one round of checks per process every few seconds.
+While one request refreshes them, others get the last result rather than
+waiting, so a hanging database holds up one thread, not every probe.
+Failures are reported by exception class only, as the endpoint is public;
+the details are logged.
+"""
+
+import logging
+import threading
+import uuid
+from time import monotonic, perf_counter
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_SECONDS = 5.0
+CACHE_KEY = "readiness:probe"
+
+
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return {}
+
+
+def check_migrations():
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        return {"ok": False, "pending": [f"{migration.app_label}.{migration.name}" for migration, _ in plan]}
+    return {}
+
+
+def check_cache():
+    value = uuid.uuid4().hex
+    cache.set(CACHE_KEY, value, timeout=CACHE_SECONDS)
+    if cache.get(CACHE_KEY) != value:
+        return {"ok": False, "error": "Value written to the cache could not be read back."}
+    return {}
+
+
+CHECKS = {
+    "database": check_database,
+    "migrations": check_migrations,
+    "cache": check_cache,
+}
+
+
+def run_check(name, check):
+    """Run check, returning its result with ``ok`` and ``ms`` added, and any error it raises as the result."""
+    start = perf_counter()
+    try:
+        result = {"ok": True, **check()}
+    except Exception as e:
+        # Whatever goes wrong means not ready, and is reported rather than raised
+        logger.warning("Readiness check %s failed", name, exc_info=True)
+        result = {"ok": False, "error": type(e).__name__}
+    result["ms"] = round((perf_counter() - start) * 1000, 1)
+    return result
+
+
+class Readiness:
+    """The outcome of every check, recomputed at most every CACHE_SECONDS."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.result = None
+        self.checked_at = None
+        self.refreshing = False
+
+    def check(self):
+        """``(ready, report)``, where report has each check's result and how old they are.
+
+        Before the first round of checks has finished there is nothing to
+        report, which counts as not ready.
+        """
+        with self.lock:
+            stale = self.checked_at is None or monotonic() - self.checked_at >= CACHE_SECONDS
+            refresh = stale and not self.refreshing
+            self.refreshing |= refresh
+        if refresh:
+            try:
+                result = {name: run_check(name, check) for name, check in CHECKS.items()}
+                with self.lock:
+                    self.result, self.checked_at = result, monotonic()
+            finally:
+                self.refreshing = False
+
+        with self.lock:
+            checks, checked_at = self.result, self.checked_at
+        if checks is None:
+            return False, {"status": "unavailable", "age_seconds": None, "checks": {}}
+        ready = all(result["ok"] for result in checks.values())
+        age = round(monotonic() - checked_at, 1)
+        return ready, {"status": "ok" if ready else "unavailable", "age_seconds": age, "checks": checks}
+
+    def clear(self):
+        with self.lock:
+            self.result = None
+            self.checked_at = None
+
+
+READINESS = Readiness()
@@ -8,6 +8,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 
 
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "trips.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -129,6 +131,29 @@ STATIC_ROOT = BASE_DIR / "static"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Per-process memory by default; settings with several workers should use a
+# shared backend, since trips.cache invalidates by bumping a version in the cache.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "carlog",
+    }
+}
+
+# Views with a query_budget that run more queries than it allows raise in
+# tests and log a warning otherwise; see trips.middleware.
+QUERY_BUDGET_STRICT = False
+
+# How long deletions are remembered for the sync API. prune_tombstones removes
+# older ones, and sync tokens older than this get a full sync instead.
+SYNC_TOMBSTONE_RETENTION = timedelta(days=90)
+
+# Prometheus metrics (see trips.metrics). /metrics requires METRICS_TOKEN as
+# a bearer token; without one it is only served when DEBUG is on.
+METRICS_TOKEN: str | None = None
+
 # Django REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
@@ -138,6 +163,16 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
     ],
+    # orjson-backed JSON, falling back to DRF's own when orjson is not installed
+    "DEFAULT_RENDERER_CLASSES": [
+        "trips.renderers.OrjsonRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "trips.renderers.OrjsonParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 # Django Allauth configuration
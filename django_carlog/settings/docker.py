@@ -33,6 +33,17 @@ DATABASES = {
     }
 }
 
+# Shared between the gunicorn workers so cache invalidation reaches all of them
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_DIR", "/dev/shm/carlog-cache"),  # noqa: S108
+    }
+}
+
+# Gunicorn workers share their metrics through PROMETHEUS_MULTIPROC_DIR; see gunicorn.conf.py
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
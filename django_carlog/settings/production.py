@@ -70,9 +70,14 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 
 # Static files with WhiteNoise
-MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1, "whitenoise.middleware.WhiteNoiseMiddleware"
+)
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Metrics (see trips.metrics); /metrics is refused until METRICS_TOKEN is set
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
 # Debug logging - use logging to stderr so it appears in Render logs
 _logger = logging.getLogger(__name__)
 _logger.info("DEBUG mode: %s", DEBUG)
@@ -31,5 +31,8 @@ PASSWORD_HASHERS = [
 # Disable email verification for tests
 ACCOUNT_EMAIL_VERIFICATION = "none"
 
+# Fail tests whose requests go over a view's query budget
+QUERY_BUDGET_STRICT = True
+
 # Root URL conf for tests
 ROOT_URLCONF = "django_carlog.urls"
@@ -1,7 +1,13 @@
+from django.conf import settings
 from django.contrib import admin
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.urls import include, path
+from django.utils.crypto import constant_time_compare
 
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from django_carlog.readiness import READINESS
+from trips.metrics import exposition
 from trips.views import HomeView
 
 
@@ -10,10 +16,31 @@ def health_check(request):
     return JsonResponse({"status": "ok"})
 
 
+def readiness(request):
+    """Readiness probe: 200 if the database, migrations and cache are all fine, else 503; see readiness.py."""
+    ready, report = READINESS.check()
+    return JsonResponse(report, status=200 if ready else 503)
+
+
+def metrics(request):
+    """Prometheus metrics summed over every gunicorn worker; see trips.metrics.
+
+    Requires METRICS_TOKEN as a bearer token, and without one is only served when DEBUG is on.
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponseForbidden()
+    if token and not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE_LATEST)
+
+
 urlpatterns = [
     path("", HomeView.as_view(), name="home"),
     path("admin/", admin.site.urls),
     path("trips/", include("trips.urls")),
     path("accounts/", include("allauth.urls")),
     path("health/", health_check, name="health-check"),
+    path("ready/", readiness, name="readiness"),
+    path("metrics", metrics, name="metrics"),
 ]
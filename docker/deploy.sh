@@ -57,7 +57,7 @@ docker run -d \
     "${IMAGE}:${VERSION}" \
     python -m gunicorn --bind "127.0.0.1:${PORT}" --workers 3 --threads 2 django_carlog.wsgi:application
 
-# Check health
+# Wait until the new container is ready: database reachable, migrations applied, cache working
 echo ">>> Checking application health..."
 MAX_ATTEMPTS=12
 SLEEP_BETWEEN=5
@@ -66,7 +66,7 @@ SLEEP_BETWEEN=5
 HEALTH_HOST=$(grep -E '^DJANGO_ALLOWED_HOSTS=' "${ENV_FILE}" | cut -d'=' -f2 | cut -d',' -f1)
 
 for attempt in $(seq 1 $MAX_ATTEMPTS); do
-    if curl -fsS -H "Host: ${HEALTH_HOST}" "http://127.0.0.1:${PORT}/health/" > /dev/null 2>&1; then
+    if curl -fsS -H "Host: ${HEALTH_HOST}" "http://127.0.0.1:${PORT}/ready/" > /dev/null 2>&1; then
         echo "=== Deployment successful! Application is healthy. ==="
         docker ps --filter "name=${CONTAINER_NAME}"
         echo ">>> Cleaning up old Docker images..."
@@ -0,0 +1,26 @@
+"""Gunicorn settings and hooks for the multiprocess metrics of trips.metrics.
+
+Gunicorn reads ./gunicorn.conf.py by default, so the command in the
+Dockerfile picks these up without a --config flag.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+
+# prometheus_client picks multiprocess mode when it is first imported, and workers inherit the master's
+# modules, so this is set before anything here imports it
+METRICS_DIR = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/dev/shm/carlog-metrics")  # noqa: S108
+
+
+def on_starting(server):
+    # Files of an earlier run would carry its counters into this one
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    Path(METRICS_DIR).mkdir(parents=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess  # noqa: PLC0415
+
+    multiprocess.mark_process_dead(worker.pid, METRICS_DIR)
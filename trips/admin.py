@@ -1,6 +1,63 @@
-from django.contrib import admin
+import csv
+import io
+import json
 
-from trips.models import Car, Odometer, Trip
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.utils import model_ngettext
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.text import capfirst
+
+from trips.bulk import delete_car, merge_cars
+from trips.cache import cached
+from trips.imports import IMPORT_FORMATS, InvalidRowError, format_for, import_trips
+from trips.models import Car, Destination, Odometer, Reason, Trip, TripRollup
+
+
+def car_choices():
+    """(pk, name) choices for every car."""
+    return [(car.pk, str(car)) for car in Car.objects.all()]
+
+
+class KnownCountPaginator(Paginator):
+    """Paginator that can be given its count, to skip the COUNT(*) over the object list."""
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, count=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.known_count = count
+
+    @cached_property
+    def count(self):
+        return super().count if self.known_count is None else self.known_count
+
+
+class TripUploadForm(forms.Form):
+    file = forms.FileField(help_text="CSV or NDJSON in the trip export format.")
+    format = forms.ChoiceField(
+        choices=[("", "From the file extension"), *((name, name.upper()) for name in IMPORT_FORMATS)], required=False
+    )
+    skip = forms.IntegerField(
+        min_value=0, initial=0, help_text="Rows to pass over, such as those imported before an earlier upload failed."
+    )
+    skip_invalid = forms.BooleanField(required=False, help_text="Leave out invalid rows instead of stopping at one.")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("file") and not cleaned_data.get("format"):
+            cleaned_data["format"] = format_for(cleaned_data["file"].name)
+            if cleaned_data["format"] is None:
+                self.add_error("format", "Cannot tell the format from the file name; choose one.")
+        return cleaned_data
 
 
 @admin.register(Trip)
@@ -17,6 +74,106 @@ class TripAdmin(admin.ModelAdmin):
         "car",
     )
     list_editable = ("car",)
+    list_select_related = ("car",)
+    date_hierarchy = "date"
+    paginator = KnownCountPaginator
+    # The unfiltered total would be a second COUNT(*) on every page
+    show_full_result_count = False
+
+    # Changelist filters whose result count the monthly rollups can answer
+    rollup_filters = {"car__id__exact": "car_id", "date__year": "year", "date__month": "month"}
+    changelist_params = {PAGE_VAR, ORDER_VAR}
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(queryset, per_page, orphans, allow_empty_first_page, count=self.rollup_count(request))
+
+    def rollup_count(self, request):
+        """The number of trips the changelist shows, from the rollups, or None if its filters need a COUNT."""
+        params = {key: value for key, value in request.GET.items() if key not in self.changelist_params}
+        if not set(params) <= set(self.rollup_filters):
+            return None
+        filters = {self.rollup_filters[key]: value for key, value in params.items()}
+        try:
+            return TripRollup.objects.filter(**filters).aggregate(trip_count=Sum("trip_count"))["trip_count"] or 0
+        except (ValueError, ValidationError):
+            return None
+
+    change_list_template = "admin/trips/trip/change_list.html"
+    # How many skipped invalid rows an import reports in full
+    shown_invalid_rows = 5
+
+    def get_urls(self):
+        return [
+            path("import/", self.admin_site.admin_view(self.import_view), name="trips_trip_import"),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        """Upload a CSV or NDJSON file of trips and import it in batches."""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = TripUploadForm(request.POST or None, request.FILES or None)
+        if form.is_valid():
+            if self.import_upload(request, form.cleaned_data):
+                return HttpResponseRedirect(reverse("admin:trips_trip_changelist"))
+            return HttpResponseRedirect(request.path)
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "Import trips",
+            "opts": self.opts,
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/trips/trip/import_trips.html", context)
+
+    def import_upload(self, request, options):
+        """Import the uploaded file, reporting the outcome as messages. Returns whether it finished."""
+        lines = io.TextIOWrapper(options["file"].file, encoding="utf-8", newline="")
+        invalid, invalid_count = [], 0
+        committed = options["skip"]
+
+        def on_batch(position, imported):
+            nonlocal committed
+            committed = position
+
+        def on_invalid(error):
+            nonlocal invalid_count
+            invalid_count += 1
+            if len(invalid) < self.shown_invalid_rows:
+                invalid.append(str(error))
+
+        try:
+            imported = import_trips(
+                IMPORT_FORMATS[options["format"]](lines),
+                skip=options["skip"],
+                skip_invalid=options["skip_invalid"],
+                on_batch=on_batch,
+                on_invalid=on_invalid,
+            )
+        except InvalidRowError as e:
+            self.message_user(
+                request,
+                f"{e}. The first {committed} rows were imported; fix the file and upload it again skipping them.",
+                messages.ERROR,
+            )
+            return False
+        except (csv.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+            self.message_user(
+                request, f"Could not read the file after row {committed}, which was imported: {e}", messages.ERROR
+            )
+            return False
+
+        self.message_user(request, f"Imported {imported} trips.", messages.SUCCESS)
+        if invalid_count:
+            self.message_user(request, f"Skipped {invalid_count} invalid rows: {'; '.join(invalid)}", messages.WARNING)
+        return True
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == "car":
+            # Every row's car <select> shares one cached list instead of querying cars per row
+            empty = [] if formfield.empty_label is None else [("", formfield.empty_label)]
+            formfield.choices = empty + cached("car_choices", car_choices)
+        return formfield
 
 
 class TripInline(admin.TabularInline):
@@ -35,6 +192,86 @@ class CarAdmin(admin.ModelAdmin):
     inlines = [
         TripInline,
     ]
+    actions = ["merge_selected"]
+
+    @admin.action(description="Merge selected cars", permissions=["change", "delete"])
+    def merge_selected(self, request, queryset):
+        """Ask which of the selected cars to keep, then move the others' trips and readings into it."""
+        cars = list(queryset)
+        if len(cars) < 2:
+            self.message_user(request, "Select at least two cars to merge.", messages.WARNING)
+            return None
+
+        target = next((car for car in cars if str(car.pk) == request.POST.get("target")), None)
+        if target is None:
+            context = {
+                **self.admin_site.each_context(request),
+                "title": "Merge cars",
+                "opts": self.opts,
+                "cars": cars,
+                "action_checkbox_name": ACTION_CHECKBOX_NAME,
+            }
+            return TemplateResponse(request, "admin/trips/car/merge_cars.html", context)
+
+        with transaction.atomic():
+            moved = sum(merge_cars(car, target) for car in cars if car.pk != target.pk)
+        self.message_user(
+            request,
+            f"Merged {len(cars) - 1} cars into {target}, moving {moved} trips and odometer readings.",
+            messages.SUCCESS,
+        )
+        return None
+
+    def get_deleted_objects(self, objs, request):
+        """List each car with counts of its trips and readings, instead of collecting and listing every one."""
+        cars = list(objs)
+        readings = dict(
+            Odometer.objects.filter(car__in=cars)
+            .order_by()
+            .values("car")
+            .annotate(count=Count("pk"))
+            .values_list("car", "count")
+        )
+        deleted_objects = []
+        for car in cars:
+            # trip_count is the stored counter (see check_car_totals), so trips are not counted here either
+            reading_count = readings.get(car.pk, 0)
+            deleted_objects += [
+                format_html("{}: {}", capfirst(self.opts.verbose_name), car),
+                [
+                    f"{car.trip_count} {model_ngettext(Trip, car.trip_count)}",
+                    f"{reading_count} {model_ngettext(Odometer, reading_count)}",
+                ],
+            ]
+
+        counts = {Car: len(cars), Trip: sum(car.trip_count for car in cars), Odometer: sum(readings.values())}
+        model_admins = {model: self.admin_site.get_model_admin(model) for model, count in counts.items() if count}
+        model_count = {
+            model_admin.opts.verbose_name_plural: counts[model] for model, model_admin in model_admins.items()
+        }
+        perms_needed = {
+            model_admin.opts.verbose_name
+            for model_admin in model_admins.values()
+            if not model_admin.has_delete_permission(request)
+        }
+        return deleted_objects, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        delete_car(obj)
+
+    def delete_queryset(self, request, queryset):
+        for car in queryset:
+            delete_car(car)
 
 
 admin.site.register(Odometer)
+
+
+@admin.register(Destination, Reason)
+class TripLabelAdmin(admin.ModelAdmin):
+    list_display = (
+        "name",
+        "trip_count",
+        "last_used",
+    )
+    search_fields = ("name",)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class TripsConfig(AppConfig):
+    name = "trips"
+
+    def ready(self):
+        from trips import signals  # noqa: F401, PLC0415
@@ -0,0 +1,75 @@
+"""In-process autocomplete for trip destinations and reasons.
+
+Each field gets a SuggestionIndex: its distinct values sorted case-insensitively,
+so the values starting with a prefix are one contiguous slice found by binary
+search, each weighted by how often and how recently it was used according to
+the Destination and Reason tables. Indexes live in process memory and are
+rebuilt the first time they are used after the data version changes (see
+trips.cache), so a keystroke lookup never queries the database.
+"""
+
+import heapq
+from bisect import bisect_left
+from datetime import date
+
+from trips.cache import data_version
+from trips.models import LABEL_MODELS
+
+
+FIELDS = tuple(LABEL_MODELS)
+# A value's weight halves for every HALF_LIFE_DAYS since it was last used
+HALF_LIFE_DAYS = 90
+
+# field -> (data version it was built at, its SuggestionIndex)
+_indexes: dict[str, tuple[int, "SuggestionIndex"]] = {}
+
+
+class SuggestionIndex:
+    """Values ranked by weight, looked up by case-insensitive prefix."""
+
+    def __init__(self, weights):
+        """Build the index from a {value: weight} mapping."""
+        entries = sorted((value.casefold(), -weight, value) for value, weight in weights.items())
+        self.keys = [key for key, _, _ in entries]
+        self.entries = entries
+        self.ranked = [value for _, _, value in sorted(entries, key=lambda entry: (entry[1], entry[0]))]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def suggest(self, prefix="", limit=20):
+        """The limit heaviest values starting with prefix, heaviest first."""
+        prefix = prefix.casefold()
+        if not prefix:
+            return self.ranked[:limit]
+        start = bisect_left(self.keys, prefix)
+        # Every key starting with prefix sorts before prefix + the highest code point
+        end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+        matches = heapq.nsmallest(limit, self.entries[start:end], key=lambda entry: (entry[1], entry[0]))
+        return [value for _, _, value in matches]
+
+
+def usage_weights(field, today=None):
+    """{value: weight} for every distinct value of field, from its use count and last use."""
+    today = today or date.today()
+    labels = LABEL_MODELS[field].objects.values_list("name", "trip_count", "last_used")
+    return {
+        name: trip_count * 0.5 ** (max((today - last_used).days, 0) / HALF_LIFE_DAYS)
+        for name, trip_count, last_used in labels
+    }
+
+
+def suggestion_index(field):
+    """The SuggestionIndex for field, rebuilt if trips have changed since it was built."""
+    version = data_version()
+    built = _indexes.get(field)
+    if built is None or built[0] != version:
+        # Concurrent threads may both rebuild; the last one to finish wins
+        built = (version, SuggestionIndex(usage_weights(field)))
+        _indexes[field] = built
+    return built[1]
+
+
+def suggest(field, prefix="", limit=20):
+    """The best limit values of field starting with prefix."""
+    return suggestion_index(field).suggest(prefix, limit)
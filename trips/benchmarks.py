@@ -0,0 +1,301 @@
+"""Benchmarks for the trips app, run with ``manage.py benchmark``.
+
+Each benchmark takes a size, creates whatever rows it needs and returns a dict
+of measurements. The command runs every benchmark inside a transaction that is
+rolled back afterwards, so they can be pointed at a development database.
+"""
+
+import io
+import tracemalloc
+from collections.abc import Callable
+from datetime import date, timedelta
+from decimal import Decimal
+from statistics import median
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from trips.bulk import create_trips, delete_car
+from trips.export import stream_csv
+from trips.fake import generate_trips
+from trips.imports import import_trips, parse_csv
+from trips.models import Car, Odometer, Trip
+from trips.renderers import OrjsonParser, OrjsonRenderer
+from trips.serializers import TripSerializer, ValuesSerializer
+
+
+BENCHMARKS: dict[str, Callable[[int], dict]] = {}
+
+
+def benchmark(func):
+    """Register func under its name."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def api_client():
+    """An API client authenticated as a throwaway user."""
+    client = APIClient()
+    client.force_authenticate(User(username="benchmark"))
+    return client
+
+
+def benchmark_car():
+    car, _ = Car.objects.get_or_create(name="Benchmark Car")
+    return car
+
+
+@benchmark
+def bulk_trip_create(size):
+    """Rows per second creating trips through the bulk endpoint versus one POST per trip."""
+    car = benchmark_car()
+    car_url = "http://testserver" + reverse("trips:car-detail", args=[car.pk])
+    payload = [
+        {
+            "date": f"2025-{index % 12 + 1:02d}-{index % 28 + 1:02d}",
+            "destination": f"Destination {index % 50}",
+            "reason": "Benchmark",
+            "distance": f"{index % 100 + 1}.5",
+            "car": car_url,
+        }
+        for index in range(size)
+    ]
+    client = api_client()
+
+    start = perf_counter()
+    client.post(reverse("trips:trip-bulk"), payload, format="json")
+    bulk_seconds = perf_counter() - start
+
+    start = perf_counter()
+    for item in payload:
+        client.post(reverse("trips:trip-list"), item, format="json")
+    single_seconds = perf_counter() - start
+
+    return {
+        "bulk_seconds": bulk_seconds,
+        "single_seconds": single_seconds,
+        "bulk_rows_per_second": size / bulk_seconds,
+        "single_rows_per_second": size / single_seconds,
+    }
+
+
+def measure(func, *args):
+    """Run func(*args), returning its (seconds, peak traced memory in KiB)."""
+    tracemalloc.start()
+    start = perf_counter()
+    try:
+        func(*args)
+        return perf_counter() - start, tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+@benchmark
+def car_delete(size):
+    """Deleting a car with size trips and size / 10 odometer readings: Django's cascade versus delete_car."""
+    results = {}
+    for method, delete in (("cascade", Car.delete), ("batched", delete_car)):
+        car = Car.objects.create(name=f"Benchmark {method}")
+        create_trips(
+            (
+                Trip(
+                    date=date(2020, 1, 1) + timedelta(days=index % 2000),
+                    destination=f"Destination {index % 50}",
+                    reason="Benchmark",
+                    distance=Decimal(index % 100 + 1),
+                    car=car,
+                )
+                for index in range(size)
+            ),
+            batch_size=1000,
+        )
+        Odometer.objects.bulk_create(
+            Odometer(date=date(2020, 1, 1) + timedelta(days=index), car=car, km=index * 100)
+            for index in range(size // 10)
+        )
+        seconds, peak_kib = measure(delete, car)
+        results[f"{method}_seconds"] = seconds
+        results[f"{method}_peak_kib"] = peak_kib
+    return results
+
+
+@benchmark
+def trip_import(size):
+    """Rows per second and peak traced memory importing size trips from CSV."""
+    car = benchmark_car()
+    rows = (
+        {
+            "id": index,
+            "date": date(2020, 1, 1) + timedelta(days=index % 2000),
+            "destination": f"Destination {index % 50}",
+            "reason": "Benchmark",
+            "distance": Decimal(index % 100 + 1),
+            "car": car.name,
+        }
+        for index in range(size)
+    )
+    source = io.StringIO("".join(stream_csv(rows)))
+    seconds, peak_kib = measure(import_trips, parse_csv(source))
+    return {"seconds": seconds, "rows_per_second": size / seconds, "peak_kib": peak_kib}
+
+
+# Each URL is requested this many times; the first request also warms the cache
+REQUEST_REPEATS = 3
+
+
+def view_urls(user, car, trip, odometer):
+    """The path of every trips URL that answers GET, keyed by URL name."""
+    args = {
+        "dashboard": [],
+        "trip_list": [],
+        "trip_add": [],
+        "trip_add_quick": [],
+        "trip_edit": [trip.pk],
+        "trip_delete": [trip.pk],
+        "car_list": [],
+        "car_add": [],
+        "car_edit": [car.pk],
+        "car_delete": [car.pk],
+        "cra_report": [],
+        "sync": [],
+        "autocomplete": ["destination"],
+        "api-root": [],
+        "user-list": [],
+        "user-detail": [user.pk],
+        "car-list": [],
+        "car-detail": [car.pk],
+        "trip-list": [],
+        "trip-detail": [trip.pk],
+        "trip-export": ["csv"],
+        "trip-stats": [],
+        "odometer-list": [],
+        "odometer-detail": [odometer.pk],
+    }
+    return {name: reverse(f"trips:{name}", args=url_args) for name, url_args in args.items()}
+
+
+def time_request(client, url):
+    """Status, size, queries and seconds for the first and the median of the later GETs of url."""
+    timings, query_counts = [], []
+    for _ in range(REQUEST_REPEATS):
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            response = client.get(url)
+            # Streaming responses only do their work as they are read
+            content = response.getvalue()
+            timings.append(perf_counter() - start)
+        query_counts.append(len(queries))
+    return {
+        "status": response.status_code,
+        "bytes": len(content),
+        "first_seconds": timings[0],
+        "first_queries": query_counts[0],
+        "seconds": median(timings[1:]),
+        "queries": query_counts[-1],
+    }
+
+
+@benchmark
+def views(size):
+    """Seconds and queries for a GET of every trips URL, after generating size fake trips.
+
+    Run it at several sizes to see how each view scales, e.g.
+    ``manage.py benchmark views --size 1000 100000 1000000 --output views.json``.
+    """
+    start = perf_counter()
+    car = generate_trips(size)[0]
+    generate_seconds = perf_counter() - start
+
+    user = User.objects.create_superuser(username="benchmark-views")
+    client = Client()
+    client.force_login(user)
+    urls = view_urls(user, car, Trip.objects.filter(car=car).first(), Odometer.objects.filter(car=car).first())
+    return {
+        "generate_seconds": generate_seconds,
+        "urls": {name: time_request(client, url) for name, url in urls.items()},
+    }
+
+
+@benchmark
+def trip_list_serialization(size):
+    """Rows per second serializing a page of size trips: TripSerializer on models versus ValuesSerializer on rows."""
+    generate_trips(size, cars=1)
+    serializer = TripSerializer(context={"request": APIRequestFactory().get(reverse("trips:trip-list"))})
+    queryset = Trip.objects.order_by("-date", "-id")
+
+    start = perf_counter()
+    model_data = TripSerializer(list(queryset), many=True, context=serializer.context).data
+    model_seconds = perf_counter() - start
+
+    start = perf_counter()
+    values_serializer = ValuesSerializer(serializer)
+    values_data = values_serializer.to_representation(list(queryset.values(*values_serializer.columns)))
+    values_seconds = perf_counter() - start
+
+    return {
+        "model_seconds": model_seconds,
+        "values_seconds": values_seconds,
+        "model_rows_per_second": size / model_seconds,
+        "values_rows_per_second": size / values_seconds,
+        "speedup": model_seconds / values_seconds,
+        "identical": JSONRenderer().render(model_data) == JSONRenderer().render(values_data),
+    }
+
+
+@benchmark
+def json_rendering(size):
+    """Rows per second rendering and parsing a list response of size trips: DRF's JSON versus orjson."""
+    generate_trips(size, cars=1)
+    request = APIRequestFactory().get(reverse("trips:trip-list"))
+    values_serializer = ValuesSerializer(TripSerializer(context={"request": request}))
+    rows = Trip.objects.order_by("-date", "-id").values(*values_serializer.columns)
+    data = {"next": None, "previous": None, "results": values_serializer.to_representation(rows)}
+
+    results, outputs = {}, {}
+    for name, renderer, parser in (
+        ("json", JSONRenderer(), JSONParser()),
+        ("orjson", OrjsonRenderer(), OrjsonParser()),
+    ):
+        start = perf_counter()
+        content = renderer.render(data)
+        results[f"{name}_render_rows_per_second"] = size / (perf_counter() - start)
+        start = perf_counter()
+        parsed = parser.parse(io.BytesIO(content))
+        results[f"{name}_parse_rows_per_second"] = size / (perf_counter() - start)
+        outputs[name] = content, parsed
+
+    results["render_speedup"] = results["orjson_render_rows_per_second"] / results["json_render_rows_per_second"]
+    results["parse_speedup"] = results["orjson_parse_rows_per_second"] / results["json_parse_rows_per_second"]
+    results["identical"] = outputs["json"] == outputs["orjson"]
+    return results
+
+
+# Query strings compared by the sparse_fields benchmark
+FIELD_SELECTIONS = {
+    "full": {},
+    "pk": {"relations": "pk"},
+    "mobile": {"relations": "pk", "fields": "id,date,distance"},
+}
+
+
+@benchmark
+def sparse_fields(size):
+    """Rows per second and bytes serializing size trips, with every field, pk relations, and just what mobile uses."""
+    generate_trips(size, cars=1)
+    trips = list(Trip.objects.order_by("-date", "-id"))
+    results = {}
+    for name, query in FIELD_SELECTIONS.items():
+        context = {"request": APIRequestFactory().get(reverse("trips:trip-list"), query)}
+        start = perf_counter()
+        data = TripSerializer(trips, many=True, context=context).data
+        results[f"{name}_rows_per_second"] = size / (perf_counter() - start)
+        results[f"{name}_bytes"] = len(OrjsonRenderer().render(data))
+    return results
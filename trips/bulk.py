@@ -0,0 +1,145 @@
+"""Bulk write paths for trips.
+
+``bulk_create``, ``bulk_update`` and raw deletes skip ``post_save`` and
+``post_delete``, so these wrappers send ``trips_bulk_changed`` instead to keep
+the rollups and other denormalized data consistent. Call them inside a
+transaction so the writes and their bookkeeping commit together.
+"""
+
+from copy import copy
+
+from django.db import connections, router, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from trips.cache import bump_data_version
+from trips.models import Car, Odometer, Tombstone, Trip, TripRollup
+from trips.signals import trips_bulk_changed
+
+
+def create_trips(trips, batch_size=None):
+    """Insert trips with bulk_create. Returns the created trips, with their pks set.
+
+    On backends that cannot return the pks of a bulk insert, such as MySQL,
+    bulk_create leaves them unset. There the trips are given one ``created``
+    time and their pks read back by it, so that callers and the
+    ``trips_bulk_changed`` receivers always get saved trips.
+    """
+    trips = list(trips)
+    if connections[router.db_for_write(Trip)].features.can_return_rows_from_bulk_insert:
+        trips = Trip.objects.bulk_create(trips, batch_size=batch_size)
+    else:
+        create_reading_pks(trips, batch_size)
+    trips_bulk_changed.send(sender=Trip, removed=[], added=trips)
+    return trips
+
+
+def create_reading_pks(trips, batch_size):
+    created = timezone.now()
+    # Auto-increment pks only grow, so the new rows are all past the current last one
+    last_pk = Trip.objects.aggregate(last=Max("pk"))["last"] or 0
+    for trip in trips:
+        trip.created = created
+    Trip.objects.bulk_create(trips, batch_size=batch_size)
+    pks = Trip.objects.filter(pk__gt=last_pk, created=created).order_by("pk").values_list("pk", flat=True)
+    pks = list(pks)
+    if len(pks) != len(trips):
+        raise RuntimeError(f"Inserted {len(trips)} trips but found {len(pks)} created at {created}.")
+    # One INSERT numbers its rows in order, and batches are inserted in order
+    for trip, pk in zip(trips, pks, strict=True):
+        trip.pk = pk
+
+
+def update_trips(changes, batch_size=None):
+    """Apply ``(trip, {field: value})`` changes with bulk_update. Returns the updated trips.
+
+    Each trip may only appear once, as the bookkeeping compares every trip
+    with its state before the changes.
+    """
+    changes = list(changes)
+    if len({trip.pk for trip, _ in changes}) != len(changes):
+        raise ValueError("Each trip may only be changed once per update_trips call.")
+    now = timezone.now()
+    previous, trips, fields = [], [], {"modified"}
+    for trip, values in changes:
+        previous.append(copy(trip))
+        for field, value in values.items():
+            setattr(trip, field, value)
+        trip.modified = now
+        trips.append(trip)
+        fields.update(values)
+    Trip.objects.bulk_update(trips, fields, batch_size=batch_size)
+    trips_bulk_changed.send(sender=Trip, removed=previous, added=trips)
+    return trips
+
+
+def delete_trips(trips):
+    """Delete trips by primary key without loading them through the deletion collector.
+
+    Returns the number of rows deleted.
+    """
+    trips = list(trips)
+    using = router.db_for_write(Trip)
+    # Django's own fast-delete path; QuerySet.delete() would send post_delete per trip, counting each twice
+    deleted = Trip.objects.filter(pk__in=[trip.pk for trip in trips])._raw_delete(using)  # noqa: SLF001
+    trips_bulk_changed.send(sender=Trip, removed=trips, added=[])
+    return deleted
+
+
+def delete_car(car, batch_size=1000, progress=None):
+    """Delete car with its trips and odometer readings, batch_size rows at a time.
+
+    Django's cascade loads every dependent row into memory and sends
+    ``post_delete`` for each one. Here trips go through delete_trips and
+    readings through raw deletes, so memory stays bounded and the rollups,
+    counters and tombstones are updated once per batch. If given,
+    ``progress(deleted, total)`` is called after each batch. Returns the
+    number of trips and readings deleted.
+    """
+    using = router.db_for_write(Odometer)
+    trips = Trip.objects.filter(car=car).only("car", "date", "distance", "destination", "reason")
+    readings = Odometer.objects.filter(car=car).values_list("pk", flat=True)
+    deleted = 0
+    with transaction.atomic():
+        total = trips.count() + readings.count()
+        while batch := list(trips[:batch_size]):
+            deleted += delete_trips(batch)
+            if progress:
+                progress(deleted, total)
+        while batch := list(readings[:batch_size]):
+            deleted += Odometer.objects.filter(pk__in=batch)._raw_delete(using)  # noqa: SLF001
+            Tombstone.objects.bulk_create(Tombstone(model_name="odometer", object_id=pk) for pk in batch)
+            if progress:
+                progress(deleted, total)
+        # Nothing is left to cascade to, and deleting the car invalidates the cache
+        car.delete()
+    return deleted
+
+
+def merge_cars(source, target):
+    """Move every trip and odometer reading of source to target, then delete source.
+
+    Each table is moved with one UPDATE, and target's rollups are rebuilt from
+    its trips, so the number of queries does not depend on how many rows move.
+    Returns the number of trips and readings moved.
+    """
+    if source.pk == target.pk:
+        raise ValueError("Cannot merge a car into itself.")
+    now = timezone.now()
+    with transaction.atomic():
+        # Lock both cars so their counters cannot change under us; in pk order to avoid deadlocks
+        locked = {
+            car.pk: car for car in Car.objects.select_for_update().filter(pk__in=[source.pk, target.pk]).order_by("pk")
+        }
+        moved = Trip.objects.filter(car=source).update(car=target, modified=now)
+        moved += Odometer.objects.filter(car=source).update(car=target, modified=now)
+        Car.objects.filter(pk=target.pk).update(
+            trip_count=F("trip_count") + locked[source.pk].trip_count,
+            total_distance=F("total_distance") + locked[source.pk].total_distance,
+            modified=now,
+        )
+        TripRollup.objects.rebuild(car_ids=[target.pk])
+        bump_data_version()
+        # Only the source's (now empty) rollups are left to cascade to
+        source.delete()
+    return moved
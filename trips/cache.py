@@ -0,0 +1,59 @@
+"""Caching for derived trip data.
+
+Cache keys include a data version that every write to Car, Trip or Odometer
+bumps (see trips.signals), so nothing cached is ever served after the data
+behind it changes and no explicit invalidation is needed.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+
+
+VERSION_KEY = "trips:data-version"
+CACHE_TIMEOUT = 60 * 60
+
+
+def data_version():
+    """The current data version, starting a new one if the cache has lost it."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock rather than 1 so a lost counter never revisits old keys
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_data_version():
+    """Invalidate everything cached so far.
+
+    Bumps now, so the writing request sees its own changes, and again on
+    commit, in case another request cached the old data in between.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def cached(name, compute, *args):
+    """Return compute(*args), cached under name and args for the current data version.
+
+    Querysets are evaluated before caching, so the cached copy carries its rows.
+    """
+
+    def evaluate():
+        value = compute(*args)
+        if isinstance(value, QuerySet):
+            len(value)
+        return value
+
+    key = ":".join(["trips", name, str(data_version()), *map(str, args)])
+    return cache.get_or_set(key, evaluate, CACHE_TIMEOUT)
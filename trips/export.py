@@ -0,0 +1,56 @@
+"""Streaming CSV and NDJSON export of trips."""
+
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+from trips.pagination import iterate_by_date
+
+
+EXPORT_FIELDS = ("id", "date", "destination", "reason", "distance", "car")
+CHUNK_SIZE = 2000
+
+
+class PassthroughRenderer(BaseRenderer):
+    """Matches any Accept header, so export requests for e.g. ``text/csv`` get the stream rather than a 406."""
+
+    media_type = "*/*"
+    format = "passthrough"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class Echo:
+    """File-like object whose write() returns the value, so csv.writer output can be yielded."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Yield a dict of EXPORT_FIELDS per trip, reading chunk_size trips per query."""
+    rows = queryset.values("id", "date", "destination", "reason", "distance", "car__name")
+    for row in iterate_by_date(rows, chunk_size):
+        row["car"] = row.pop("car__name")
+        yield row
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        # Distances stay strings so their decimal formatting survives, as in the API
+        yield json.dumps({**row, "date": row["date"].isoformat(), "distance": str(row["distance"])}) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
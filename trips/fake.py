@@ -0,0 +1,125 @@
+"""Realistic synthetic trips for benchmarks and local development."""
+
+import random
+from bisect import bisect
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.db import transaction
+
+from trips.bulk import create_trips
+from trips.models import Car, Odometer, Trip
+
+
+BATCH_SIZE = 5000
+
+PLACES = [
+    "Office",
+    "Head Office",
+    "Warehouse",
+    "Airport",
+    "Train Station",
+    "Hospital",
+    "City Hall",
+    "Bank",
+    "Post Office",
+    "Supplier",
+    "Conference Centre",
+    "University",
+]
+REASONS = [
+    "Client meeting",
+    "Site visit",
+    "Delivery",
+    "Pickup",
+    "Training",
+    "Conference",
+    "Inspection",
+    "Sales call",
+    "Maintenance",
+    "Interview",
+    "Audit",
+    "Other",
+]
+# Weekend days are this much less likely to have trips than weekdays
+WEEKEND_WEIGHT = 0.2
+
+
+def zipf_weights(count):
+    """Cumulative weights making the first of count choices far more common than the last."""
+    return list(accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+class FakeTrips:
+    """A seeded source of plausible trips: a few regular destinations dominate, weekdays outnumber weekends.
+
+    Every destination has a typical distance that its trips vary around, so
+    per-destination totals look like real driving rather than noise.
+    """
+
+    def __init__(self, start, end, destinations=500, seed=0):
+        self.random = random.Random(seed)
+        self.days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        self.day_weights = list(accumulate(WEEKEND_WEIGHT if day.weekday() >= 5 else 1 for day in self.days))
+        self.destinations = (PLACES + [f"Client {number}" for number in range(1, destinations)])[:destinations]
+        self.destination_weights = zipf_weights(len(self.destinations))
+        self.distances = [round(self.random.lognormvariate(2.5, 0.9), 1) + 1 for _ in self.destinations]
+        self.reason_weights = zipf_weights(len(REASONS))
+
+    def pick(self, weights):
+        """A random index into the cumulative weights."""
+        return bisect(weights, self.random.random() * weights[-1])
+
+    def trip(self, car):
+        """An unsaved trip for car."""
+        destination = self.pick(self.destination_weights)
+        distance = min(self.distances[destination] * self.random.uniform(0.9, 1.1), 9999.9)
+        return Trip(
+            date=self.days[self.pick(self.day_weights)],
+            destination=self.destinations[destination],
+            reason=REASONS[self.pick(self.reason_weights)],
+            distance=Decimal(f"{distance:.1f}"),
+            car=car,
+        )
+
+
+def generate_trips(size, cars=3, years=3, end=None, seed=0, batch_size=BATCH_SIZE, progress=None):
+    """Create size trips spread over cars cars and the years years up to end, plus monthly odometer readings.
+
+    Cars named "Fake car N" are created or reused, and each gets a different
+    share of the trips. Trips go through create_trips, so rollups, label
+    tables and car totals are kept current. The same seed always gives the
+    same data. ``progress(created, size)`` is called after every batch.
+    Returns the cars.
+    """
+    end = end or date.today()
+    fake = FakeTrips(date(end.year - years + 1, 1, 1), end, seed=seed)
+    cars = [Car.objects.get_or_create(name=f"Fake car {number}")[0] for number in range(1, cars + 1)]
+    car_weights = zipf_weights(len(cars))
+    monthly_distance = defaultdict(Decimal)
+
+    created = 0
+    while created < size:
+        batch = [fake.trip(cars[fake.pick(car_weights)]) for _ in range(min(batch_size, size - created))]
+        for trip in batch:
+            monthly_distance[trip.car, trip.date.replace(day=1)] += trip.distance
+        with transaction.atomic():
+            create_trips(batch)
+        created += len(batch)
+        if progress:
+            progress(created, size)
+
+    Odometer.objects.bulk_create(odometer_readings(monthly_distance), batch_size=batch_size)
+    return cars
+
+
+def odometer_readings(monthly_distance):
+    """A reading at the start of each month, counting up from the distance driven in earlier months."""
+    readings = []
+    km = defaultdict(lambda: 10_000)
+    for car, month in sorted(monthly_distance, key=lambda key: (key[0].pk, key[1])):
+        readings.append(Odometer(date=month, car=car, km=km[car]))
+        km[car] += round(monthly_distance[car, month])
+    return readings
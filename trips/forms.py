@@ -29,3 +29,10 @@ class TripForm(forms.ModelForm):
             "distance": forms.NumberInput(attrs={"class": "form-control", "step": "0.1"}),
             "car": forms.Select(attrs={"class": "form-select"}),
         }
+
+
+class TripImportForm(TripForm):
+    """TripForm without the car field, which imports resolve by name."""
+
+    class Meta(TripForm.Meta):
+        fields = ["date", "destination", "reason", "distance"]
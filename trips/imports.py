@@ -0,0 +1,108 @@
+"""Streaming CSV and NDJSON import of trips, in the format trips.export writes."""
+
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import transaction
+
+from trips.bulk import create_trips
+from trips.forms import TripImportForm
+from trips.models import Car, Trip
+
+
+BATCH_SIZE = 1000
+
+
+class InvalidRowError(ValueError):
+    """A record that failed validation, with its 1-based position in the input and the form errors."""
+
+    def __init__(self, row_number, errors):
+        super().__init__(f"Row {row_number}: {json.dumps(errors)}")
+        self.row_number = row_number
+        self.errors = errors
+
+
+def parse_csv(lines):
+    """Yield a dict per CSV row, keyed by the header row."""
+    yield from csv.DictReader(lines)
+
+
+def parse_ndjson(lines):
+    """Yield a dict per non-blank line of JSON."""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+IMPORT_FORMATS = {
+    "csv": parse_csv,
+    "ndjson": parse_ndjson,
+}
+FORMAT_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def format_for(filename):
+    """The import format for filename's extension, or None."""
+    return FORMAT_EXTENSIONS.get(Path(filename).suffix.lower())
+
+
+def import_trips(records, batch_size=BATCH_SIZE, skip=0, skip_invalid=False, on_batch=None, on_invalid=None):
+    """Validate records with TripForm's rules and insert them batch_size at a time.
+
+    Records are dicts of trips.export.EXPORT_FIELDS, with the car given by
+    name; ``id`` is ignored, so every record becomes a new trip. Each batch
+    is inserted through create_trips in its own transaction. The first
+    ``skip`` records are passed over, so an import can resume from the
+    position reported by ``on_batch(position, imported)`` after each
+    committed batch.
+
+    An invalid record raises InvalidRowError, after every earlier batch has been
+    committed, unless skip_invalid is set, in which case it is passed to
+    ``on_invalid(error)`` and left out. Returns the number of trips created.
+    """
+    cars = dict(Car.objects.values_list("name", "pk"))
+    records = enumerate(islice(records, skip, None), start=skip + 1)
+    imported = 0
+    while chunk := list(islice(records, batch_size)):
+        batch = []
+        for position, record in chunk:
+            try:
+                batch.append(build_trip(record, cars, position))
+            except InvalidRowError as error:
+                if not skip_invalid:
+                    raise
+                if on_invalid:
+                    on_invalid(error)
+        if batch:
+            with transaction.atomic():
+                create_trips(batch)
+            imported += len(batch)
+        if on_batch:
+            on_batch(position, imported)
+    return imported
+
+
+def build_trip(record, cars, row_number):
+    """An unsaved Trip for record, raising InvalidRowError if it is not valid.
+
+    Cleans each value with TripImportForm's own fields rather than building a
+    form per row, which would deep-copy every field each time.
+    """
+    if not isinstance(record, dict):
+        # An NDJSON line may hold any JSON value
+        raise InvalidRowError(row_number, {NON_FIELD_ERRORS: ["Expected a JSON object."]})
+    values, errors = {}, {}
+    for name, field in TripImportForm.base_fields.items():
+        try:
+            values[name] = field.clean(record.get(name))
+        except ValidationError as e:
+            errors[name] = e.messages
+    values["car_id"] = cars.get(record.get("car"))
+    if values["car_id"] is None:
+        errors["car"] = [f"Unknown car {record.get('car')!r}."]
+    if errors:
+        raise InvalidRowError(row_number, errors)
+    return Trip(**values)
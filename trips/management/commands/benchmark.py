@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from trips.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Run trips benchmarks and print one JSON result per line. All data written is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all). One of {sorted(BENCHMARKS)}.")
+        parser.add_argument(
+            "--size",
+            type=int,
+            nargs="+",
+            default=[1000],
+            help="Number of rows each benchmark works on. Every benchmark runs once per size.",
+        )
+        parser.add_argument("--output", help="Also write the results as a JSON list to this file.")
+
+    def handle(self, *args, **options):
+        names = options["names"] or sorted(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+        results = []
+        # The test client talks to "testserver"
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for size in options["size"]:
+                for name in names:
+                    with transaction.atomic():
+                        result = {"benchmark": name, "size": size, **BENCHMARKS[name](size)}
+                        transaction.set_rollback(True)
+                    results.append(result)
+                    self.stdout.write(json.dumps(result))
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
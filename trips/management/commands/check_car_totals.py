@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trips.cache import bump_data_version
+from trips.models import Car
+
+
+class Command(BaseCommand):
+    help = "Check each car's stored trip_count and total_distance against its trips, and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without repairing it.")
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for car in Car.objects.with_actual_totals().order_by("pk"):
+            if (car.trip_count, car.total_distance) == (car.actual_trip_count, car.actual_total_distance):
+                continue
+            drifted += 1
+            self.stdout.write(
+                f"{car}: stored {car.trip_count} trips ({car.total_distance:.1f} km), "
+                f"actual {car.actual_trip_count} trips ({car.actual_total_distance:.1f} km)"
+            )
+            if not options["dry_run"]:
+                self.repair(car.pk)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All car totals are consistent."))
+        elif options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{drifted} cars have drifted."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {drifted} cars."))
+
+    def repair(self, car_id):
+        # Recount with the car row locked, so a trip written meanwhile applies its F() update after ours
+        with transaction.atomic():
+            Car.objects.select_for_update().values_list("pk").get(pk=car_id)
+            car = Car.objects.with_actual_totals().get(pk=car_id)
+            Car.objects.filter(pk=car_id).update(
+                trip_count=car.actual_trip_count, total_distance=car.actual_total_distance
+            )
+            # update() sends no signals, so cached car lists would keep the drifted totals
+            bump_data_version()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.bulk import delete_car
+from trips.models import Car
+
+
+class Command(BaseCommand):
+    help = "Delete a car with all its trips and odometer readings in batches, reporting progress."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Name of the car to delete.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per query.")
+
+    def handle(self, *args, **options):
+        try:
+            car = Car.objects.get(name=options["name"])
+        except Car.DoesNotExist as e:
+            raise CommandError(f"No car named {options['name']!r}") from e
+
+        def progress(deleted, total):
+            self.stdout.write(f"Deleted {deleted}/{total} trips and odometer readings")
+
+        deleted = delete_car(car, batch_size=options["batch_size"], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {car} with {deleted} trips and odometer readings."))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.fake import BATCH_SIZE, generate_trips
+
+
+class Command(BaseCommand):
+    help = (
+        "Add realistic fake trips over several cars and years, with monthly odometer readings. "
+        "The same --seed always gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("size", type=int, help="Number of trips to create.")
+        parser.add_argument("--cars", type=int, default=3, help="Number of cars the trips are spread over.")
+        parser.add_argument("--years", type=int, default=3, help="Number of years, up to this one, the trips span.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Trips inserted per transaction.")
+
+    def handle(self, *args, **options):
+        if options["size"] < 0 or options["cars"] < 1 or options["years"] < 1:
+            raise CommandError("size must not be negative, and --cars and --years must be at least 1.")
+
+        def progress(created, size):
+            self.stdout.write(f"Created {created}/{size} trips")
+
+        cars = generate_trips(
+            options["size"],
+            cars=options["cars"],
+            years=options["years"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            progress=progress,
+        )
+        names = ", ".join(car.name for car in cars)
+        self.stdout.write(self.style.SUCCESS(f"Created {options['size']} trips for {names}."))
@@ -0,0 +1,79 @@
+import csv
+import json
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.imports import BATCH_SIZE, IMPORT_FORMATS, InvalidRowError, format_for, import_trips
+
+
+class Command(BaseCommand):
+    help = (
+        "Import trips from a CSV or NDJSON file in the export format, in batches. "
+        "Progress is checkpointed after every batch so a failed import can be resumed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for standard input.")
+        parser.add_argument("--format", choices=sorted(IMPORT_FORMATS), help="Input format (default: from extension).")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Trips inserted per transaction.")
+        parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint).")
+        parser.add_argument("--resume", action="store_true", help="Continue after the rows in the checkpoint.")
+        parser.add_argument("--skip-invalid", action="store_true", help="Report invalid rows and carry on.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"] or format_for(path)
+        if import_format is None:
+            raise CommandError(f"Cannot tell the format of {path!r}; pass --format.")
+
+        checkpoint = Path(options["checkpoint"]) if options["checkpoint"] else None
+        if checkpoint is None and path != "-":
+            checkpoint = Path(f"{path}.checkpoint")
+        skip = self.read_checkpoint(checkpoint, options["resume"])
+
+        def on_batch(position, imported):
+            if checkpoint:
+                checkpoint.write_text(json.dumps({"rows": position}))
+            self.stdout.write(f"Imported {imported} trips, {position} rows read")
+
+        def on_invalid(error):
+            self.stderr.write(str(error))
+
+        with self.open(path) as lines:
+            try:
+                imported = import_trips(
+                    IMPORT_FORMATS[import_format](lines),
+                    batch_size=options["batch_size"],
+                    skip=skip,
+                    skip_invalid=options["skip_invalid"],
+                    on_batch=on_batch,
+                    on_invalid=on_invalid,
+                )
+            except InvalidRowError as e:
+                raise CommandError(f"{e}. Fix it and rerun with --resume to continue from the last batch.") from e
+            except (csv.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise CommandError(f"Could not read {path!r}: {e}") from e
+
+        if checkpoint:
+            checkpoint.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} trips."))
+
+    def read_checkpoint(self, checkpoint, resume):
+        """The number of rows already imported according to checkpoint."""
+        if checkpoint is None or not checkpoint.exists():
+            if resume:
+                raise CommandError("No checkpoint to resume from.")
+            return 0
+        if not resume:
+            raise CommandError(f"{checkpoint} exists from an earlier import; pass --resume or delete it.")
+        return json.loads(checkpoint.read_text())["rows"]
+
+    def open(self, path):
+        if path == "-":
+            return sys.stdin
+        try:
+            return Path(path).open(newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(f"Could not open {path!r}: {e}") from e
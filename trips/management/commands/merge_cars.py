@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.bulk import merge_cars
+from trips.models import Car
+
+
+class Command(BaseCommand):
+    help = "Move every trip and odometer reading of one car to another, then delete the first car."
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Name of the car to merge and delete.")
+        parser.add_argument("target", help="Name of the car to keep.")
+
+    def handle(self, *args, **options):
+        cars = Car.objects.in_bulk([options["source"], options["target"]], field_name="name")
+        missing = [name for name in (options["source"], options["target"]) if name not in cars]
+        if missing:
+            raise CommandError(f"No car named {missing[0]!r}")
+        source, target = cars[options["source"]], cars[options["target"]]
+        try:
+            moved = merge_cars(source, target)
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(
+            self.style.SUCCESS(f"Merged {source} into {target}, moving {moved} trips and odometer readings.")
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from trips.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than settings.SYNC_TOMBSTONE_RETENTION. Run it daily, e.g. from cron."
+
+    def handle(self, *args, **options):
+        count = Tombstone.objects.prune()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {count} tombstones."))
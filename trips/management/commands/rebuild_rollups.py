@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from trips.models import Destination, Reason, TripRollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly TripRollup table and the Destination and Reason tables from the Trip table."
+
+    def handle(self, *args, **options):
+        count = TripRollup.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} trip rollup rows."))
+        destinations, reasons = Destination.objects.rebuild(), Reason.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {destinations} destinations and {reasons} reasons."))
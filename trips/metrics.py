@@ -0,0 +1,88 @@
+"""Prometheus metrics, kept by prometheus_client and added up across gunicorn workers.
+
+gunicorn.conf.py sets PROMETHEUS_MULTIPROC_DIR before any worker imports
+this module, which puts prometheus_client in multiprocess mode: every worker
+keeps its samples in memory-mapped files in that directory, and a scrape adds
+them all up through MultiProcessCollector. The worker gauges are "live"
+ones, which prometheus_client's mark_process_dead drops when gunicorn reports
+a worker gone, while counters and histograms keep the exited worker's counts
+so totals never go backwards. Without PROMETHEUS_MULTIPROC_DIR, as in
+development and tests, a scrape only sees the process answering it.
+"""
+
+import os
+from pathlib import Path
+from time import time
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route and method.",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter("http_requests", "Requests by route, method and status.", ["route", "method", "status"])
+DB_QUERIES = Counter("db_queries", "Database queries run by requests, by route.", ["route"])
+DB_QUERY_DURATION = Counter(
+    "db_query_duration_seconds", "Time requests spent in database queries, by route.", ["route"]
+)
+WORKERS = Gauge("gunicorn_workers", "Worker processes that have handled a request.", multiprocess_mode="livesum")
+REQUESTS_IN_FLIGHT = Gauge(
+    "gunicorn_worker_requests_in_flight", "Requests each worker is handling.", multiprocess_mode="liveall"
+)
+RESIDENT_MEMORY = Gauge(
+    "gunicorn_worker_resident_memory_bytes", "Resident memory of each worker.", multiprocess_mode="liveall"
+)
+START_TIME = Gauge("gunicorn_worker_start_time_seconds", "Unix time each worker started.", multiprocess_mode="liveall")
+
+# Gunicorn workers import this module as they start, unless the app is preloaded
+STARTED = time()
+
+
+def resident_memory_bytes():
+    """This process's resident set size, or None where /proc is not available."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def request_started():
+    REQUESTS_IN_FLIGHT.inc()
+
+
+def request_finished():
+    REQUESTS_IN_FLIGHT.dec()
+
+
+def observe_request(route, method, status, seconds, queries, db_seconds):
+    """Record one finished request, and this worker's gauges as they now stand."""
+    REQUEST_DURATION.labels(route, method).observe(seconds)
+    REQUESTS.labels(route, method, str(status)).inc()
+    DB_QUERIES.labels(route).inc(queries)
+    DB_QUERY_DURATION.labels(route).inc(db_seconds)
+
+    WORKERS.set(1)
+    START_TIME.set(STARTED)
+    memory = resident_memory_bytes()
+    if memory is not None:
+        RESIDENT_MEMORY.set(memory)
+
+
+def exposition(directory=None):
+    """The metrics of every process writing to directory, or PROMETHEUS_MULTIPROC_DIR, in the text format.
+
+    Without either, only this process's metrics.
+    """
+    directory = directory or os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=directory)
+    return generate_latest(registry)
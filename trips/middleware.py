@@ -0,0 +1,123 @@
+"""Per-request query counts and timings, reported in a Server-Timing header and a log line."""
+
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+from trips import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Anything else is counted as "other", so made-up methods cannot add metric labels
+METRIC_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class QueryBudgetExceededError(Exception):
+    """A view ran more queries than its query_budget allows."""
+
+
+class QueryStats:
+    """An execute_wrapper counting the queries run through it and the time they took."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += perf_counter() - start
+
+
+def query_budget(view_func, method):
+    """The query budget the class behind view_func declares for a request with method, or None.
+
+    ``query_budget`` is either one number for every request, or a dict keyed
+    by lowercase HTTP method or, for viewsets, by action name; requests it
+    does not mention are not checked.
+    """
+    # Django views have view_class; DRF viewsets only have cls, and actions mapping methods to action names
+    view_class = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
+    budget = getattr(view_class, "query_budget", None)
+    if not isinstance(budget, dict):
+        return budget
+    method = method.lower()
+    return budget.get(getattr(view_func, "actions", {}).get(method, method))
+
+
+class RequestTimingMiddleware:
+    """Count the queries and time spent in the database and in the view for every request.
+
+    The numbers go out as a ``Server-Timing`` header, which browser dev tools
+    show alongside the request, as an INFO line on the ``trips.middleware``
+    logger with the same values in its ``extra``, and into the Prometheus
+    metrics of trips.metrics. Views that set a ``query_budget`` (see
+    query_budget()) are checked against it: going over raises
+    QueryBudgetExceededError when settings.QUERY_BUDGET_STRICT is set, as it
+    is in tests, and logs a warning otherwise.
+
+    Streaming responses run most of their queries after the view returns, so
+    only the queries up to that point are counted for them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        start = perf_counter()
+        metrics.request_started()
+        try:
+            with connection.execute_wrapper(stats):
+                response = self.get_response(request)
+        finally:
+            metrics.request_finished()
+        view_ms = (perf_counter() - start) * 1000
+        db_ms = stats.seconds * 1000
+
+        response["Server-Timing"] = f'db;dur={db_ms:.1f};desc="{stats.count} queries", view;dur={view_ms:.1f}'
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        logger.info(
+            "%s %s status=%d view=%s queries=%d db_ms=%.1f view_ms=%.1f",
+            request.method,
+            request.path,
+            response.status_code,
+            view_name,
+            stats.count,
+            db_ms,
+            view_ms,
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "view": view_name,
+                "queries": stats.count,
+                "db_ms": db_ms,
+                "view_ms": view_ms,
+            },
+        )
+        metrics.observe_request(
+            route=view_name or "unmatched",
+            method=request.method if request.method in METRIC_METHODS else "other",
+            status=response.status_code,
+            seconds=view_ms / 1000,
+            queries=stats.count,
+            db_seconds=stats.seconds,
+        )
+
+        budget = query_budget(match.func, request.method) if match else None
+        if budget is not None and stats.count > budget:
+            message = (
+                f"{request.method} {request.path} ({view_name}) ran {stats.count} queries, over its budget of {budget}"
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceededError(message)
+            logger.warning(message)
+        return response
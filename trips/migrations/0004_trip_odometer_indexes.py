@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0003_alter_car_id_alter_odometer_id_alter_trip_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='odometer',
+            index=models.Index(fields=['car', 'date'], name='odometer_car_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='odometer',
+            index=models.Index(fields=['date'], name='odometer_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['car', 'date'], name='trip_car_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['date'], name='trip_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['-date', '-created'], name='trip_date_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:25
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def build_rollups(apps, schema_editor):
+    Trip = apps.get_model('trips', 'Trip')
+    TripRollup = apps.get_model('trips', 'TripRollup')
+    totals = (
+        Trip.objects.order_by()
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .values('car_id', 'year', 'month')
+        .annotate(trip_count=Count('id'), total_distance=Sum('distance'))
+    )
+    TripRollup.objects.bulk_create(TripRollup(**row) for row in totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0004_trip_odometer_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('trip_count', models.IntegerField(default=0)),
+                ('total_distance', models.DecimalField(decimal_places=1, default=Decimal('0'), max_digits=12)),
+                ('car', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trips.car')),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+                'indexes': [models.Index(fields=['year', 'month'], name='triprollup_year_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('car', 'year', 'month'), name='triprollup_car_year_month_uniq')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
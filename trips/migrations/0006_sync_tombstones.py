@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0005_triprollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['deleted'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='car',
+            index=models.Index(fields=['modified'], name='car_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='odometer',
+            index=models.Index(fields=['modified'], name='odometer_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['modified'], name='trip_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted'], name='tombstone_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:40
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def fold_labels(apps, schema_editor):
+    Trip = apps.get_model('trips', 'Trip')
+    for model_name, field in (('Destination', 'destination'), ('Reason', 'reason')):
+        model = apps.get_model('trips', model_name)
+        usage = Trip.objects.order_by().values(field).annotate(trip_count=Count('id'), last_used=Max('date'))
+        model.objects.bulk_create(
+            model(name=row[field], trip_count=row['trip_count'], last_used=row['last_used']) for row in usage
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0006_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Destination',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20, unique=True)),
+                ('trip_count', models.IntegerField(default=0)),
+                ('last_used', models.DateField()),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Reason',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20, unique=True)),
+                ('trip_count', models.IntegerField(default=0)),
+                ('last_used', models.DateField()),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['destination', 'date'], name='trip_destination_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['reason', 'date'], name='trip_reason_date_idx'),
+        ),
+        migrations.RunPython(fold_labels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:42
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def count_trips(apps, schema_editor):
+    Car = apps.get_model('trips', 'Car')
+    Trip = apps.get_model('trips', 'Trip')
+    totals = Trip.objects.order_by().values('car_id').annotate(trip_count=Count('id'), total_distance=Sum('distance'))
+    for row in totals:
+        Car.objects.filter(pk=row['car_id']).update(trip_count=row['trip_count'], total_distance=row['total_distance'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0007_trip_labels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='car',
+            name='total_distance',
+            field=models.DecimalField(decimal_places=1, default=Decimal('0'), editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='car',
+            name='trip_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_trips, migrations.RunPython.noop),
+    ]
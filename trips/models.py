@@ -1,10 +1,53 @@
-from django.db import models
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from typing import TYPE_CHECKING
 
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Sum, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, Greatest
+from django.utils import timezone
+
+from model_utils import FieldTracker
 from model_utils.models import TimeStampedModel
 
+from trips.cache import bump_data_version
+
+
+if TYPE_CHECKING:
+    from django.db.models import Expression
+
+
+class CarManager(models.Manager):
+    def add_trips(self, car_id: int, trip_count: int, distance: Decimal) -> None:
+        """Add (or with negative values, remove) trips to car_id's totals."""
+        self.filter(pk=car_id).update(
+            trip_count=F("trip_count") + trip_count,
+            total_distance=F("total_distance") + distance,
+        )
+
+    def with_actual_totals(self):
+        """Cars annotated with actual_trip_count and actual_total_distance counted from the Trip table."""
+        return self.annotate(
+            actual_trip_count=Count("trip"),
+            actual_total_distance=Coalesce(
+                Sum("trip__distance"),
+                Value(Decimal(0)),
+                output_field=models.DecimalField(max_digits=12, decimal_places=1),
+            ),
+        )
+
 
 class Car(TimeStampedModel):
     name = models.CharField(max_length=20, unique=True)
+    # Kept in step with Trip by trips.signals; check_car_totals repairs any drift
+    trip_count = models.IntegerField(default=0, editable=False)
+    total_distance = models.DecimalField(max_digits=12, decimal_places=1, default=Decimal(0), editable=False)
+
+    objects = CarManager()
+
+    COUNTER_FIELDS = ("trip_count", "total_distance")
 
     def __str__(self):
         return f"{self.name}"
@@ -13,6 +56,39 @@ class Car(TimeStampedModel):
         ordering = [
             "name",
         ]
+        indexes = [
+            models.Index(fields=["modified"], name="car_modified_idx"),
+        ]
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # The counters only ever change through F() updates, so saving a stale copy must not write them back
+        if update_fields is None and not self._state.adding:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class DateRangeQuerySet(models.QuerySet):
+    """Calendar filters on ``date`` written as half-open ranges, so they can use its indexes."""
+
+    def for_dates(self, start: date, end: date):
+        """Rows dated from start up to but not including end."""
+        return self.filter(date__gte=start, date__lt=end)
+
+    def for_year(self, year: int):
+        return self.for_dates(date(year, 1, 1), date(year + 1, 1, 1))
+
+    def for_month(self, year: int, month: int):
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return self.for_dates(start, end)
+
+    def for_fiscal_year(self, year: int, start_month: int = 1):
+        """The twelve months starting on the first of start_month in year."""
+        return self.for_dates(date(year, start_month, 1), date(year + 1, start_month, 1))
 
 
 class Trip(TimeStampedModel):
@@ -22,6 +98,9 @@ class Trip(TimeStampedModel):
     distance = models.DecimalField(max_digits=5, decimal_places=1)
     car = models.ForeignKey(Car, on_delete=models.CASCADE)
 
+    objects = DateRangeQuerySet.as_manager()
+    tracker = FieldTracker(fields=["car", "date", "distance", "destination", "reason"])
+
     def __str__(self):
         return f"{self.date} to {self.destination} for {self.reason} ({self.distance} km)"
 
@@ -29,6 +108,14 @@ class Trip(TimeStampedModel):
         ordering = [
             "-date",
         ]
+        indexes = [
+            models.Index(fields=["car", "date"], name="trip_car_date_idx"),
+            models.Index(fields=["date"], name="trip_date_idx"),
+            models.Index(fields=["-date", "-created"], name="trip_date_created_idx"),
+            models.Index(fields=["modified"], name="trip_modified_idx"),
+            models.Index(fields=["destination", "date"], name="trip_destination_date_idx"),
+            models.Index(fields=["reason", "date"], name="trip_reason_date_idx"),
+        ]
 
 
 class Odometer(TimeStampedModel):
@@ -36,6 +123,8 @@ class Odometer(TimeStampedModel):
     car = models.ForeignKey(Car, on_delete=models.CASCADE)
     km = models.IntegerField()
 
+    objects = DateRangeQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.date} {self.km} km ({self.car})"
 
@@ -43,3 +132,207 @@ class Odometer(TimeStampedModel):
         ordering = [
             "-date",
         ]
+        indexes = [
+            models.Index(fields=["car", "date"], name="odometer_car_date_idx"),
+            models.Index(fields=["date"], name="odometer_date_idx"),
+            models.Index(fields=["modified"], name="odometer_modified_idx"),
+        ]
+
+
+class TripRollupManager(models.Manager):
+    def apply_delta(self, car_id: int, day: date, trip_count: int, distance: Decimal) -> None:
+        """Add (or with negative values, remove) trips to the rollup row for car_id's month of day."""
+        with transaction.atomic():
+            rows = self.filter(car_id=car_id, year=day.year, month=day.month)
+            if trip_count > 0:
+                _, created = self.get_or_create(
+                    car_id=car_id,
+                    year=day.year,
+                    month=day.month,
+                    defaults={"trip_count": trip_count, "total_distance": distance},
+                )
+                if created:
+                    return
+            # Never create rows when removing trips: the car may be mid-cascade-delete.
+            rows.update(
+                trip_count=F("trip_count") + trip_count,
+                total_distance=F("total_distance") + distance,
+            )
+            if trip_count < 0:
+                rows.filter(trip_count__lte=0).delete()
+
+    def rebuild(self, car_ids=None) -> int:
+        """Recompute rollup rows from the Trip table, for every car or only car_ids.
+
+        Returns the number of rows written.
+        """
+        trips, rollups = Trip.objects.order_by(), self.all()
+        if car_ids is not None:
+            trips, rollups = trips.filter(car_id__in=car_ids), rollups.filter(car_id__in=car_ids)
+        totals = (
+            trips.annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+            .values("car_id", "year", "month")
+            .annotate(trip_count=Count("id"), total_distance=Sum("distance"))
+        )
+        with transaction.atomic():
+            rollups.delete()
+            created = self.bulk_create(self.model(**row) for row in totals)
+            # Neither sends the signals that would otherwise invalidate cached views
+            bump_data_version()
+        return len(created)
+
+
+class TripRollup(models.Model):
+    """Per car, per month trip totals, kept in step with Trip by trips.signals."""
+
+    car = models.ForeignKey(Car, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    trip_count = models.IntegerField(default=0)
+    total_distance = models.DecimalField(max_digits=12, decimal_places=1, default=Decimal(0))
+
+    objects = TripRollupManager()
+
+    class Meta:
+        ordering = [
+            "-year",
+            "-month",
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["car", "year", "month"], name="triprollup_car_year_month_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["year", "month"], name="triprollup_year_month_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.car} {self.year}-{self.month:02d}: {self.trip_count} trips ({self.total_distance} km)"
+
+
+class TripLabelManager(models.Manager["TripLabel"]):
+    def record_usage(self, removed=(), added=()) -> None:
+        """Count trips that stopped (removed) or started (added) using a name, given as (name, date) pairs.
+
+        Names are created on first use and deleted once no trip uses them.
+        """
+        field = self.model.trip_field
+        removed_uses, added_uses = Counter(removed), Counter(added)
+        # A trip saved without touching this field or its date changes nothing
+        removed_uses, added_uses = removed_uses - added_uses, added_uses - removed_uses
+        counts: Counter[str] = Counter()
+        last_used: dict[str, date] = {}
+        for (name, day), uses in added_uses.items():
+            counts[name] += uses
+            last_used[name] = max(last_used.get(name, day), day)
+        for (name, _), uses in removed_uses.items():
+            counts[name] -= uses
+        stale = {name for name, _ in removed_uses}
+
+        with transaction.atomic():
+            for name, count in counts.items():
+                changes: dict[str, Expression] = {"trip_count": F("trip_count") + count} if count else {}
+                if name in last_used:
+                    _, created = self.get_or_create(
+                        name=name, defaults={"trip_count": count, "last_used": last_used[name]}
+                    )
+                    if created:
+                        continue
+                    changes["last_used"] = Greatest("last_used", Value(last_used[name]))
+                if changes:
+                    self.filter(name=name).update(**changes)
+            if stale:
+                # Removing a trip may remove the latest use, so look the others up again
+                self.filter(name__in=stale, trip_count__lte=0).delete()
+                latest = (
+                    Trip.objects.order_by()
+                    .filter(**{f"{field}__in": stale})
+                    .values(field)
+                    .annotate(last_used=Max("date"))
+                )
+                for row in latest:
+                    self.filter(name=row[field]).update(last_used=row["last_used"])
+
+    def rebuild(self) -> int:
+        """Recompute every row from the Trip table. Returns the number of rows written."""
+        field = self.model.trip_field
+        usage = Trip.objects.order_by().values(field).annotate(trip_count=Count("id"), last_used=Max("date"))
+        with transaction.atomic():
+            self.all().delete()
+            labels = self.bulk_create(
+                self.model(name=row[field], trip_count=row["trip_count"], last_used=row["last_used"]) for row in usage
+            )
+            # Neither sends the signals that would otherwise invalidate cached views and the autocomplete index
+            bump_data_version()
+        return len(labels)
+
+
+class TripLabel(models.Model):
+    """A distinct value of one Trip text field, with how many trips use it and when one last did.
+
+    Kept in step with Trip by trips.signals, so distinct-value lists and
+    lookups read this small table instead of scanning trips.
+    """
+
+    name = models.CharField(max_length=20, unique=True)
+    trip_count = models.IntegerField(default=0)
+    last_used = models.DateField()
+
+    objects = TripLabelManager()
+    trip_field = ""
+
+    class Meta:
+        abstract = True
+        ordering = [
+            "name",
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Destination(TripLabel):
+    trip_field = "destination"
+
+
+class Reason(TripLabel):
+    trip_field = "reason"
+
+
+# Every TripLabel model, keyed by the Trip field it counts
+LABEL_MODELS: dict[str, type[TripLabel]] = {model.trip_field: model for model in (Destination, Reason)}
+
+
+class TombstoneManager(models.Manager["Tombstone"]):
+    def cutoff(self):
+        """The oldest deletion still kept; older tombstones may have been pruned."""
+        return timezone.now() - settings.SYNC_TOMBSTONE_RETENTION
+
+    def prune(self) -> int:
+        """Delete the tombstones from before cutoff(); return how many."""
+        count, _ = self.filter(deleted__lt=self.cutoff()).delete()
+        return count
+
+
+class Tombstone(models.Model):
+    """Record of a deleted Car, Trip or Odometer, so sync clients can drop it too.
+
+    Kept for settings.SYNC_TOMBSTONE_RETENTION and then removed by the
+    prune_tombstones command; sync tokens older than that get a full sync.
+    """
+
+    model_name = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    deleted = models.DateTimeField(default=timezone.now)
+
+    objects = TombstoneManager()
+
+    class Meta:
+        ordering = [
+            "deleted",
+        ]
+        indexes = [
+            models.Index(fields=["deleted"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} {self.object_id} deleted {self.deleted}"
@@ -0,0 +1,130 @@
+"""Pagination classes for the trips API."""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
+
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def after_position(position_date, position_id, descending=True):
+    """Filter for rows after (date, id) in (-date, -id) order, or (date, id) order if not descending."""
+    if descending:
+        return Q(date__lt=position_date) | Q(date=position_date, id__lt=position_id)
+    return Q(date__gt=position_date) | Q(date=position_date, id__gt=position_id)
+
+
+def row_position(row):
+    """The (date, id) of a model instance or a ``values()`` row including ``date`` and ``id``."""
+    if isinstance(row, dict):
+        return row["date"], row["id"]
+    return row.date, row.pk
+
+
+def iterate_by_date(queryset, chunk_size):
+    """Yield every row of queryset in (-date, -id) order, fetching chunk_size rows per query.
+
+    Unlike ``QuerySet.iterator()``, memory stays flat on MySQL too, whose
+    driver buffers the whole result set of a query. Works with model and
+    ``values()`` querysets; the latter must include ``date`` and ``id``.
+    """
+    queryset = queryset.order_by("-date", "-id")
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield from chunk
+        position = after_position(*row_position(chunk[-1]))
+        chunk = list(queryset.filter(position)[:chunk_size]) if len(chunk) == chunk_size else []
+
+
+class DateCursorPagination(BasePagination):
+    """Keyset pagination over (-date, -id) for models with a ``date`` field.
+
+    Each cursor holds the (date, id) of the row it continues from, so a page is
+    an index range scan rather than an OFFSET, no COUNT(*) is ever run, and rows
+    inserted while a client is paging neither shift nor repeat later pages.
+    Pages model querysets, and ``values()`` querysets including ``date`` and ``id``.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        position = self.decode_cursor(request)
+
+        if position is None:
+            reverse = False
+        else:
+            after_date, after_id, reverse = position
+            queryset = queryset.filter(after_position(after_date, after_id, descending=not reverse))
+
+        queryset = queryset.order_by("date", "id") if reverse else queryset.order_by("-date", "-id")
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        # Moving backwards, there is always a next page (the one we came from);
+        # moving forwards, there is a previous page whenever we started from a cursor.
+        self.next_position = None
+        self.previous_position = None
+        if results:
+            if has_more or reverse:
+                self.next_position = (*row_position(results[-1]), False)
+            if (has_more and reverse) or (position is not None and not reverse):
+                self.previous_position = (*row_position(results[0]), True)
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self):
+        return self.encode_cursor(self.previous_position)
+
+    def encode_cursor(self, position):
+        if position is None:
+            return None
+        position_date, position_id, reverse = position
+        token = f"{position_date.isoformat()}|{position_id}|{int(reverse)}"
+        encoded = urlsafe_b64encode(token.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """Return the (date, id, reverse) position in the request's cursor, or None on the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position_date, position_id, reverse = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            return date.fromisoformat(position_date), int(position_id), reverse == "1"
+        except (TypeError, ValueError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
@@ -0,0 +1,52 @@
+"""JSON rendering and parsing for the REST API through orjson, when it is installed.
+
+OrjsonRenderer gives the same bytes as DRF's JSONRenderer: anything orjson
+does not serialize natively, including datetimes and Decimals, is handed to
+DRF's JSONEncoder, and U+2028/U+2029 are escaped the same way. Serializers
+already turn Trip.distance into a string such as ``"12.5"``, which orjson
+writes as is. Pretty-printed responses, as the browsable API asks for, and
+every response when orjson is not installed go through JSONRenderer itself;
+likewise OrjsonParser falls back to JSONParser.
+"""
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+class OrjsonRenderer(JSONRenderer):
+    """JSONRenderer writing compact JSON through orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # orjson only writes compact, UTF-8 JSON; anything else is left to JSONRenderer
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if not HAS_ORJSON or data is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        # Escaped like JSONRenderer does, so the output stays a strict JavaScript subset
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+class OrjsonParser(JSONParser):
+    """JSONParser reading request bodies through orjson."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not HAS_ORJSON:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}") from exc
@@ -1,11 +1,86 @@
+from types import SimpleNamespace
+
 from django.contrib.auth.models import User
+from django.utils.functional import cached_property
 
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 
+from trips.bulk import create_trips, update_trips
 from trips.models import Car, Odometer, Trip
 
 
-class UserSerializer(serializers.HyperlinkedModelSerializer):
+RELATION_MODES = ("url", "pk")
+
+
+def primary_key_fields(fields):
+    """The serializer fields with ``url`` replaced by the pk as ``id``, and hyperlinked relations by pks."""
+    result = {}
+    for name, field in fields.items():
+        if isinstance(field, serializers.HyperlinkedIdentityField):
+            result["id"] = serializers.IntegerField(source="pk", read_only=True)
+        elif isinstance(field, serializers.HyperlinkedRelatedField):
+            if field.read_only:
+                kwargs = {"read_only": True}
+            else:
+                kwargs = {"queryset": field.queryset, "required": field.required, "allow_null": field.allow_null}
+            result[name] = serializers.PrimaryKeyRelatedField(source=field.source, **kwargs)
+        else:
+            result[name] = field
+    return result
+
+
+def field_selection(request):
+    """The ``(relations, fields)`` a request asks for, with fields None unless ``?fields=`` names some."""
+    names = [name for name in request.GET.get("fields", "").split(",") if name]
+    return request.GET.get("relations", "url"), names or None
+
+
+def check_field_selection(request, serializer_classes):
+    """Raise ValidationError for an unknown ``?relations=`` mode or a ``?fields=`` name none of serializer_classes has."""
+    relations, names = field_selection(request)
+    if relations not in RELATION_MODES:
+        raise serializers.ValidationError({"relations": [f"Expected one of: {', '.join(RELATION_MODES)}."]})
+    if names:
+        known = set()
+        for serializer_class in serializer_classes:
+            known.update(serializer_class(context={"request": request}).fields)
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            raise serializers.ValidationError({"fields": [f"Unknown field: {name}" for name in unknown]})
+
+
+class DynamicFieldsMixin:
+    """Lets the request choose which fields a hyperlinked serializer has, and links by pk instead of URL.
+
+    ``?fields=url,date`` keeps only the named fields when reading; writes
+    always take every field. ``?relations=pk`` replaces ``url`` with the
+    object's ``id`` and each related object's URL with its pk, for reads and
+    writes alike, so no URL is built at all. Both combine, as in
+    ``?relations=pk&fields=id,date,distance``.
+
+    Bad values do not raise here, as the browsable API builds serializers
+    for its forms even for a request that failed: an unknown relations mode
+    falls back to URLs, and names the serializer does not have select
+    nothing, so ``?fields=colour`` leaves no fields at all. The views reject
+    such values up front with check_field_selection.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None:
+            return fields
+
+        relations, names = field_selection(request)
+        if relations == "pk":
+            fields = primary_key_fields(fields)
+        if not names or request.method not in SAFE_METHODS:
+            return fields
+        return {name: field for name, field in fields.items() if name in names}
+
+
+class UserSerializer(DynamicFieldsMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = User
         fields = ("url", "username", "email", "is_staff")
@@ -14,7 +89,7 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
-class CarSerializer(serializers.HyperlinkedModelSerializer):
+class CarSerializer(DynamicFieldsMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Car
         fields = (
@@ -26,9 +101,47 @@ class CarSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
-class TripSerializer(serializers.HyperlinkedModelSerializer):
+class TripListSerializer(serializers.ListSerializer):
+    """Writes many trips at once with bulk_create/bulk_update.
+
+    For updates, pass the trips being changed as the instance and include each
+    trip's ``id`` in its item of the payload.
+    """
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        trip_id = data.get("id") if isinstance(data, dict) else None
+        if trip_id not in self.trips_by_id:
+            raise serializers.ValidationError({"id": ["No trip with this id."]})
+        # A second change to the same trip would be counted twice in the rollups and totals
+        if trip_id in self.validated_ids:
+            raise serializers.ValidationError({"id": ["This trip is already changed by an earlier item."]})
+        self.validated_ids.add(trip_id)
+        self.child.instance = self.trips_by_id[trip_id]
+        self.child.initial_data = data
+        return {"id": trip_id, **super().run_child_validation(data)}
+
+    @cached_property
+    def trips_by_id(self):
+        return {trip.pk: trip for trip in self.instance}
+
+    @cached_property
+    def validated_ids(self):
+        return set()
+
+    def create(self, validated_data):
+        return create_trips([Trip(**attrs) for attrs in validated_data])
+
+    def update(self, instance, validated_data):
+        return update_trips([(self.trips_by_id[attrs.pop("id")], attrs) for attrs in validated_data])
+
+
+class TripSerializer(DynamicFieldsMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Trip
+        list_serializer_class = TripListSerializer
         fields = (
             "url",
             "date",
@@ -43,7 +156,57 @@ class TripSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
-class OdometerSerializer(serializers.HyperlinkedModelSerializer):
+# A pk no row will have, marking where each row's pk goes in a URL template
+URL_PK_PLACEHOLDER = 918273645546372819
+
+
+def url_template(field):
+    """A function from a pk to the URL the hyperlinked field gives the object with that pk."""
+    url = str(field.to_representation(SimpleNamespace(pk=URL_PK_PLACEHOLDER)))
+    prefix, suffix = url.split(str(URL_PK_PLACEHOLDER))
+    return lambda pk: f"{prefix}{pk}{suffix}"
+
+
+def primary_key(pk):
+    return pk
+
+
+class ValuesSerializer:
+    """The read-only output of a hyperlinked serializer, for ``values()`` rows rather than model instances.
+
+    It follows the fields the serializer has, including those chosen by
+    DynamicFieldsMixin. Each hyperlink is reversed once, for a placeholder pk, and every row's pk
+    is filled into the result, instead of calling reverse() twice per row.
+    Other fields go through the serializer's own fields, so the JSON is the
+    same as the serializer would render. ``columns`` are the names to pass to
+    ``values()``.
+    """
+
+    def __init__(self, serializer):
+        self.fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.HyperlinkedIdentityField):
+                column, convert = "id", url_template(field)
+            elif isinstance(field, serializers.HyperlinkedRelatedField):
+                column, convert = f"{field.source}_id", url_template(field)
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                column, convert = f"{field.source}_id", primary_key
+            else:
+                column, convert = field.source, field.to_representation
+            self.fields.append((name, column, convert))
+        self.columns = [column for _, column, _ in self.fields]
+
+    def to_representation(self, rows):
+        fields = self.fields
+        return [
+            {name: None if row[column] is None else convert(row[column]) for name, column, convert in fields}
+            for row in rows
+        ]
+
+
+class OdometerSerializer(DynamicFieldsMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Odometer
         fields = (
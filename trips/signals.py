@@ -0,0 +1,161 @@
+"""Signal handlers keeping denormalized trip data in step with the Trip table."""
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from trips.cache import bump_data_version
+from trips.models import LABEL_MODELS, Car, Odometer, Tombstone, Trip, TripRollup
+
+
+# Sent by the bulk write paths in trips.bulk, which bypass post_save/post_delete.
+# Receivers get ``removed`` and ``added`` lists of Trip instances; an update
+# appears as its previous state in ``removed`` and its new state in ``added``.
+trips_bulk_changed = Signal()
+
+
+ROLLUP_FIELDS = ("car", "date", "distance")
+
+
+def _as_date(day):
+    # Trips created with string values (e.g. from fixtures) are not coerced until reloaded.
+    return date.fromisoformat(day) if isinstance(day, str) else day
+
+
+def _apply_rollup_delta(car_id, day, distance, sign):
+    TripRollup.objects.apply_delta(car_id, _as_date(day), sign, sign * Decimal(str(distance)))
+
+
+@receiver(post_save, sender=Trip)
+def update_rollup_on_save(sender, instance, created, **kwargs):
+    """Move the trip's contribution from its previous (car, month) to its current one."""
+    if not created:
+        tracker = instance.tracker
+        if not any(tracker.has_changed(field) for field in ROLLUP_FIELDS):
+            return
+        _apply_rollup_delta(tracker.previous("car"), tracker.previous("date"), tracker.previous("distance"), -1)
+    _apply_rollup_delta(instance.car_id, instance.date, instance.distance, 1)
+
+
+@receiver(post_delete, sender=Trip)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    """Remove the deleted trip from its (car, month) rollup."""
+    _apply_rollup_delta(instance.car_id, instance.date, instance.distance, -1)
+
+
+@receiver(trips_bulk_changed)
+def update_rollups_on_bulk_change(sender, removed, added, **kwargs):
+    """Apply one delta per (car, month) touched by a bulk write."""
+    deltas = defaultdict(lambda: [0, Decimal(0)])
+    for trips, sign in ((removed, -1), (added, 1)):
+        for trip in trips:
+            delta = deltas[(trip.car_id, trip.date.year, trip.date.month)]
+            delta[0] += sign
+            delta[1] += sign * Decimal(str(trip.distance))
+    for (car_id, year, month), (trip_count, distance) in deltas.items():
+        if trip_count or distance:
+            TripRollup.objects.apply_delta(car_id, date(year, month, 1), trip_count, distance)
+
+
+def _apply_car_deltas(removed, added):
+    """Apply one counter update per car for trips given as (car_id, distance) pairs."""
+    deltas = defaultdict(lambda: [0, Decimal(0)])
+    for trips, sign in ((removed, -1), (added, 1)):
+        for car_id, distance in trips:
+            delta = deltas[car_id]
+            delta[0] += sign
+            delta[1] += sign * Decimal(str(distance))
+    for car_id, (trip_count, distance) in deltas.items():
+        if trip_count or distance:
+            Car.objects.add_trips(car_id, trip_count, distance)
+
+
+@receiver(post_save, sender=Trip)
+def update_car_totals_on_save(sender, instance, created, **kwargs):
+    """Move the trip's distance from its previous car's totals to its current car's."""
+    removed = []
+    if not created:
+        tracker = instance.tracker
+        if not (tracker.has_changed("car") or tracker.has_changed("distance")):
+            return
+        removed = [(tracker.previous("car"), tracker.previous("distance"))]
+    _apply_car_deltas(removed, [(instance.car_id, instance.distance)])
+
+
+@receiver(post_delete, sender=Trip)
+def update_car_totals_on_delete(sender, instance, **kwargs):
+    """Remove the deleted trip from its car's totals."""
+    _apply_car_deltas([(instance.car_id, instance.distance)], [])
+
+
+@receiver(trips_bulk_changed)
+def update_car_totals_on_bulk_change(sender, removed, added, **kwargs):
+    """Apply one counter update per car touched by a bulk write."""
+    _apply_car_deltas(
+        [(trip.car_id, trip.distance) for trip in removed],
+        [(trip.car_id, trip.distance) for trip in added],
+    )
+
+
+@receiver(post_save, sender=Trip)
+def update_labels_on_save(sender, instance, created, **kwargs):
+    """Count the trip against its destination and reason, instead of its previous ones."""
+    tracker = instance.tracker
+    for model in LABEL_MODELS.values():
+        field = model.trip_field
+        removed = []
+        if not created:
+            if not (tracker.has_changed(field) or tracker.has_changed("date")):
+                continue
+            removed = [(tracker.previous(field), _as_date(tracker.previous("date")))]
+        model.objects.record_usage(removed=removed, added=[(getattr(instance, field), _as_date(instance.date))])
+
+
+@receiver(post_delete, sender=Trip)
+def update_labels_on_delete(sender, instance, **kwargs):
+    """Stop counting the deleted trip against its destination and reason."""
+    for model in LABEL_MODELS.values():
+        model.objects.record_usage(removed=[(getattr(instance, model.trip_field), _as_date(instance.date))])
+
+
+@receiver(trips_bulk_changed)
+def update_labels_on_bulk_change(sender, removed, added, **kwargs):
+    """Apply a bulk write's changes to destination and reason usage."""
+    for model in LABEL_MODELS.values():
+        field = model.trip_field
+        model.objects.record_usage(
+            removed=[(getattr(trip, field), trip.date) for trip in removed],
+            added=[(getattr(trip, field), trip.date) for trip in added],
+        )
+
+
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Odometer)
+def record_tombstone(sender, instance, **kwargs):
+    """Record the deletion for delta sync clients."""
+    Tombstone.objects.create(model_name=sender.__name__.lower(), object_id=instance.pk)
+
+
+@receiver(trips_bulk_changed)
+def record_tombstones_on_bulk_change(sender, removed, added, **kwargs):
+    """Record tombstones for trips a bulk write removed and did not add back."""
+    kept = {trip.pk for trip in added}
+    Tombstone.objects.bulk_create(
+        Tombstone(model_name="trip", object_id=trip.pk) for trip in removed if trip.pk not in kept
+    )
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_save, sender=Trip)
+@receiver(post_save, sender=Odometer)
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Odometer)
+@receiver(trips_bulk_changed)
+def invalidate_cache(sender, **kwargs):
+    """Bump the data version so cached views recompute."""
+    bump_data_version()
@@ -0,0 +1,11 @@
+from django.core.cache import cache
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keep cached view data from leaking between tests, whose database rows are rolled back."""
+    cache.clear()
+    yield
+    cache.clear()
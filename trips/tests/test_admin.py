@@ -1,13 +1,22 @@
 """Unit tests for trips admin."""
 
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
 import pytest
 
 from trips.admin import CarAdmin, TripInline
-from trips.models import Car, Trip
+from trips.models import Car, Odometer, Trip
 
 
 @pytest.fixture
@@ -65,3 +74,113 @@ class TestCarAdmin:
         """Test that CarAdmin has TripInline."""
         car_admin = CarAdmin(Car, site)
         assert TripInline in car_admin.inlines
+
+    def test_merge_action_asks_for_target(self, client, admin_user):
+        """Test that the merge action first asks which car to keep."""
+        cars = [Car.objects.create(name="Civic"), Car.objects.create(name="civic")]
+        client.force_login(admin_user)
+        response = client.post(
+            reverse("admin:trips_car_changelist"),
+            {"action": "merge_selected", ACTION_CHECKBOX_NAME: [car.pk for car in cars]},
+        )
+        assert response.status_code == 200
+        assert response.templates[0].name == "admin/trips/car/merge_cars.html"
+        assert Car.objects.count() == 2
+
+    def test_merge_action(self, client, admin_user):
+        """Test that confirming the merge moves trips to the chosen car."""
+        keep, duplicate = Car.objects.create(name="Civic"), Car.objects.create(name="civic")
+        Trip.objects.create(date="2025-01-15", destination="A", reason="B", distance="10.0", car=duplicate)
+        client.force_login(admin_user)
+        response = client.post(
+            reverse("admin:trips_car_changelist"),
+            {"action": "merge_selected", ACTION_CHECKBOX_NAME: [keep.pk, duplicate.pk], "target": keep.pk},
+        )
+        assert response.status_code == 302
+        assert list(Car.objects.values_list("name", flat=True)) == ["Civic"]
+        assert Trip.objects.get().car == keep
+
+    @pytest.fixture
+    def doomed_car(self):
+        """Create a car with three trips and two odometer readings."""
+        car = Car.objects.create(name="Doomed")
+        for day in (1, 2, 3):
+            Trip.objects.create(date=date(2025, 1, day), destination="A", reason="B", distance="1.0", car=car)
+        for km in (100, 200):
+            Odometer.objects.create(date=date(2025, 1, 1), car=car, km=km)
+        return car
+
+    def test_delete_confirmation_counts_dependents(self, client, admin_user, doomed_car):
+        """Test that the delete page counts the car's trips and readings instead of loading them."""
+        client.force_login(admin_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("admin:trips_car_delete", args=[doomed_car.pk]))
+        assert response.status_code == 200
+        assert not any('"trips_trip"' in query["sql"] for query in queries)
+        assert response.context["deleted_objects"] == ["Car: Doomed", ["3 trips", "2 odometers"]]
+        assert dict(response.context["model_count"]) == {"cars": 1, "trips": 3, "odometers": 2}
+
+    def test_delete_selected(self, client, admin_user, doomed_car):
+        """Test that "delete selected" asks for confirmation with counts, then deletes through delete_car."""
+        client.force_login(admin_user)
+        data = {"action": "delete_selected", ACTION_CHECKBOX_NAME: [doomed_car.pk]}
+        response = client.post(reverse("admin:trips_car_changelist"), data)
+        assert response.context["deletable_objects"] == [["Car: Doomed", ["3 trips", "2 odometers"]]]
+        response = client.post(reverse("admin:trips_car_changelist"), {**data, "post": "yes"})
+        assert response.status_code == 302
+        assert not Car.objects.exists()
+        assert not Odometer.objects.exists()
+
+
+@pytest.mark.django_db
+class TestTripAdminChangelist:
+    """Tests for the trip changelist's query count."""
+
+    @pytest.fixture
+    def trips(self):
+        """Create 150 trips spread over three cars and two years."""
+        cars = [Car.objects.create(name=f"Car {index}") for index in range(3)]
+        Trip.objects.bulk_create(
+            Trip(
+                date=date(2024 + index % 2, index % 12 + 1, 1),
+                destination="A",
+                reason="B",
+                distance=Decimal("1.0"),
+                car=cars[index % 3],
+            )
+            for index in range(150)
+        )
+        call_command("rebuild_rollups", stdout=StringIO())
+        return cars
+
+    def changelist_queries(self, client, admin_user, params=None):
+        """GET the trip changelist, returning the response and its queries."""
+        client.force_login(admin_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("admin:trips_trip_changelist"), params or {})
+        assert response.status_code == 200
+        return response, [query["sql"] for query in queries]
+
+    def test_page_of_100_rows(self, client, admin_user, trips):
+        """Test that a 100-row page with a car select per row takes a fixed handful of queries."""
+        response, queries = self.changelist_queries(client, admin_user)
+        assert len(response.context["cl"].result_list) == 100
+        assert response.context["cl"].result_count == 150
+        car_queries = [sql for sql in queries if 'FROM "trips_car"' in sql]
+        # The car list filter and the shared choice list
+        assert len(car_queries) == 2
+        assert not any("COUNT(*)" in sql and 'FROM "trips_trip"' in sql for sql in queries)
+        assert len(queries) <= 8
+
+    def test_filtered_count_from_rollups(self, client, admin_user, trips):
+        """Test that car and year filters are counted from the rollups."""
+        response, queries = self.changelist_queries(
+            client, admin_user, {"car__id__exact": trips[0].pk, "date__year": 2024}
+        )
+        assert response.context["cl"].result_count == 25
+        assert not any("COUNT(*)" in sql and 'FROM "trips_trip"' in sql for sql in queries)
+
+    def test_other_filters_count_trips(self, client, admin_user, trips):
+        """Test that filters the rollups cannot answer fall back to counting trips."""
+        response, _ = self.changelist_queries(client, admin_user, {"date__gte": "2025-06-01"})
+        assert response.context["cl"].result_count == 49
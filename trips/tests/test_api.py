@@ -1,15 +1,25 @@
 """Unit tests for trips API endpoints."""
 
+import json
+from datetime import date, timedelta
 from decimal import Decimal
+from io import StringIO
 
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 import pytest
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
 
-from trips.models import Car, Odometer, Trip
+from trips import benchmarks, urls
+from trips.export import export_rows
+from trips.models import Car, Odometer, Tombstone, Trip, TripRollup
+from trips.serializers import TripSerializer
 
 
 @pytest.fixture
@@ -85,6 +95,34 @@ class TestTripAPI:
         assert response.data["reason"] == "Test Reason"
         assert Decimal(response.data["distance"]) == Decimal("25.5")
 
+    def test_list_sparse_pk_fields(self, api_client, sample_trip):
+        """Test that the list gives just the requested fields, with pks instead of URLs."""
+        response = api_client.get("/trips/api/trips/", {"relations": "pk", "fields": "id,date,distance"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["results"] == [
+            {"id": sample_trip.pk, "date": sample_trip.date.isoformat(), "distance": "25.5"}
+        ]
+
+    def test_list_unknown_field(self, api_client, sample_trip):
+        """Test that an unknown field is a bad request."""
+        response = api_client.get("/trips/api/trips/", {"fields": "colour"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {"fields": ["Unknown field: colour"]}
+
+    @pytest.mark.parametrize("query", [{"relations": "bogus"}, {"fields": "colour"}])
+    def test_bad_selection_in_browsable_api(self, api_client, sample_trip, query):
+        """Test that bad values are a bad request for the browsable API too, which builds serializers for its forms."""
+        response = api_client.get("/trips/api/trips/", query, HTTP_ACCEPT="text/html")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_create_with_car_pk(self, api_client, sample_car):
+        """Test that a trip can be created with its car's pk in pk mode."""
+        payload = {"date": "2025-05-01", "destination": "A", "reason": "B", "distance": "3.0", "car": sample_car.pk}
+        response = api_client.post("/trips/api/trips/?relations=pk", payload, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["car"] == sample_car.pk
+        assert Trip.objects.get(pk=response.data["id"]).car == sample_car
+
     def test_filter_trips_by_car(self, api_client, sample_trip, sample_car):
         """Test filtering trips by car."""
         response = api_client.get(f"/trips/api/trips/?car={sample_car.pk}")
@@ -117,3 +155,570 @@ class TestOdometerAPI:
         response = api_client.get(f"/trips/api/odometers/{sample_odometer.pk}/")
         assert response.status_code == status.HTTP_200_OK
         assert response.data["km"] == 100000
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    """Tests for keyset cursor pagination on the trip and odometer endpoints."""
+
+    @pytest.fixture
+    def trips(self, sample_car):
+        """Create 25 trips, several sharing each date."""
+        return [
+            Trip.objects.create(
+                date=date(2025, 1, 1) + timedelta(days=index // 3),
+                destination=f"Dest {index}",
+                reason="Business",
+                distance=Decimal("1.0"),
+                car=sample_car,
+            )
+            for index in range(25)
+        ]
+
+    def walk(self, api_client, url, direction="next"):
+        """Follow links from url in direction, returning every page's results."""
+        pages = []
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            pages.append(response.data["results"])
+            url = response.data[direction]
+        return pages
+
+    def test_pages_cover_every_trip_in_order(self, api_client, trips):
+        """Test walking forward returns every trip once, newest first."""
+        pages = self.walk(api_client, "/trips/api/trips/")
+        assert [len(page) for page in pages] == [10, 10, 5]
+        destinations = [row["destination"] for page in pages for row in page]
+        expected = sorted(trips, key=lambda trip: (trip.date, trip.pk), reverse=True)
+        assert destinations == [trip.destination for trip in expected]
+
+    def test_previous_links(self, api_client, trips):
+        """Test walking back from the last page returns the same pages."""
+        forward = self.walk(api_client, "/trips/api/trips/")
+        response = api_client.get("/trips/api/trips/")
+        response = api_client.get(response.data["next"])
+        last = api_client.get(response.data["next"])
+        assert last.data["next"] is None
+        backward = self.walk(api_client, last.data["previous"], direction="previous")
+        assert backward == forward[-2::-1]
+
+    def test_stable_under_inserts(self, api_client, trips, sample_car):
+        """Test that trips inserted ahead of the cursor do not shift the next page."""
+        first = api_client.get("/trips/api/trips/")
+        expected = api_client.get(first.data["next"]).data["results"]
+        Trip.objects.create(
+            date=date(2026, 1, 1), destination="New", reason="Business", distance=Decimal("1.0"), car=sample_car
+        )
+        assert api_client.get(first.data["next"]).data["results"] == expected
+
+    def test_no_count_query(self, api_client, trips):
+        """Test that paging never counts the table."""
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get("/trips/api/trips/")
+        assert not any("COUNT(" in query["sql"] for query in queries)
+
+    def test_date_range_filter(self, api_client, trips):
+        """Test that TripFilter date ranges are applied before paging."""
+        response = api_client.get("/trips/api/trips/?date_after=2025-01-02&date_before=2025-01-03")
+        assert [row["date"] for row in response.data["results"]] == ["2025-01-03"] * 3 + ["2025-01-02"] * 3
+        assert response.data["next"] is None
+
+    def test_year_and_month_filters(self, api_client, sample_car):
+        """Test the year and month filters, including the December boundary."""
+        for day in (date(2024, 12, 31), date(2025, 1, 1), date(2025, 12, 31), date(2026, 1, 1)):
+            Trip.objects.create(date=day, destination="A", reason="B", distance=Decimal("1.0"), car=sample_car)
+        response = api_client.get("/trips/api/trips/?year=2025")
+        assert [row["date"] for row in response.data["results"]] == ["2025-12-31", "2025-01-01"]
+        response = api_client.get("/trips/api/trips/?month=2024-12")
+        assert [row["date"] for row in response.data["results"]] == ["2024-12-31"]
+        response = api_client.get("/trips/api/trips/?month=2024-13")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("path", ["/trips/api/trips/", "/trips/api/trips.json", "/trips/api/trips/?year=2025"])
+    def test_list_matches_serializer(self, api_client, trips, path):
+        """Test that every page of the values() list renders the same bytes as TripSerializer on model instances."""
+        request = APIRequestFactory().get(path)
+        context = {"request": request, "format": "json" if ".json" in path else None}
+        expected_trips = list(Trip.objects.order_by("-date", "-id"))
+        url = path
+        while url:
+            response = api_client.get(url)
+            page, expected_trips = expected_trips[:10], expected_trips[10:]
+            expected = {
+                "next": response.data["next"],
+                "previous": response.data["previous"],
+                "results": TripSerializer(page, many=True, context=context).data,
+            }
+            assert response.content == JSONRenderer().render(expected)
+            url = response.data["next"]
+        assert not expected_trips
+
+    def test_list_reads_one_table(self, api_client, trips):
+        """Test that listing trips does not join or query the car table."""
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get("/trips/api/trips/")
+        assert not any('"trips_car"' in query["sql"] for query in queries)
+
+    def test_invalid_cursor(self, api_client, trips):
+        """Test that a malformed cursor is a 404."""
+        response = api_client.get("/trips/api/trips/?cursor=garbage")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_odometers_paginated(self, api_client, sample_car):
+        """Test that odometer readings are paged by date too."""
+        for index in range(12):
+            Odometer.objects.create(date=date(2025, 1, 1) + timedelta(days=index), car=sample_car, km=index)
+        pages = self.walk(api_client, "/trips/api/odometers/")
+        assert [row["km"] for page in pages for row in page] == list(range(11, -1, -1))
+
+
+@pytest.mark.django_db
+class TestTripBulkAPI:
+    """Tests for the bulk trip endpoint."""
+
+    url = "/trips/api/trips/bulk/"
+
+    @pytest.fixture
+    def car_url(self, sample_car):
+        """Hyperlink for the sample car."""
+        return f"http://testserver/trips/api/cars/{sample_car.pk}/"
+
+    def trip_payload(self, car_url, day=15, distance="10.0"):
+        """Build a trip payload."""
+        return {
+            "date": f"2025-03-{day:02d}",
+            "destination": "Office",
+            "reason": "Business",
+            "distance": distance,
+            "car": car_url,
+        }
+
+    def test_bulk_create(self, api_client, car_url, sample_car):
+        """Test creating several trips in one request."""
+        payload = [self.trip_payload(car_url, day) for day in range(1, 6)]
+        response = api_client.post(self.url, payload, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data) == 5
+        assert Trip.objects.filter(car=sample_car).count() == 5
+        rollup = TripRollup.objects.get(car=sample_car, year=2025, month=3)
+        assert (rollup.trip_count, rollup.total_distance) == (5, Decimal("50.0"))
+
+    def test_bulk_create_reports_item_errors(self, api_client, car_url):
+        """Test that one invalid item fails the batch and is reported by position."""
+        payload = [self.trip_payload(car_url), {**self.trip_payload(car_url), "distance": "bad"}]
+        response = api_client.post(self.url, payload, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert "distance" in response.data[1]
+        assert not Trip.objects.exists()
+
+    def test_bulk_partial_update(self, api_client, car_url, sample_car):
+        """Test updating several trips by id, including moving them to another month."""
+        trips = [
+            Trip.objects.create(
+                date=date(2025, 3, day), destination="A", reason="B", distance=Decimal("1.0"), car=sample_car
+            )
+            for day in (1, 2)
+        ]
+        payload = [{"id": trips[0].pk, "distance": "7.5"}, {"id": trips[1].pk, "date": "2025-04-02"}]
+        response = api_client.patch(self.url, payload, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        trips[0].refresh_from_db()
+        trips[1].refresh_from_db()
+        assert trips[0].distance == Decimal("7.5")
+        assert trips[1].date == date(2025, 4, 2)
+        assert trips[1].modified > trips[1].created
+        rollups = {(rollup.month, rollup.trip_count, rollup.total_distance) for rollup in TripRollup.objects.all()}
+        assert rollups == {(3, 1, Decimal("7.5")), (4, 1, Decimal("1.0"))}
+
+    def test_bulk_create_without_returned_pks(self, api_client, car_url, sample_car, monkeypatch):
+        """Test that trips get their pks on backends where bulk_create does not return them, as on MySQL."""
+        monkeypatch.setattr(type(connection.features), "can_return_rows_from_bulk_insert", False)
+        payload = [self.trip_payload(car_url, day) for day in range(1, 4)]
+        response = api_client.post(self.url, payload, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        pks = sorted(Trip.objects.filter(car=sample_car).values_list("pk", flat=True))
+        assert [item["url"] for item in response.data] == [f"http://testserver/trips/api/trips/{pk}/" for pk in pks]
+
+    def test_bulk_update_duplicate_id(self, api_client, sample_car):
+        """Test that changing the same trip twice in one request is rejected, leaving the totals alone."""
+        trip = Trip.objects.create(
+            date=date(2025, 3, 1), destination="A", reason="B", distance=Decimal("1.0"), car=sample_car
+        )
+        payload = [{"id": trip.pk, "distance": "2.0"}, {"id": trip.pk, "distance": "3.0"}]
+        response = api_client.patch(self.url, payload, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data[0] == {}
+        assert "id" in response.data[1]
+        sample_car.refresh_from_db()
+        assert (sample_car.trip_count, sample_car.total_distance) == (1, Decimal("1.0"))
+
+    def test_bulk_update_unknown_id(self, api_client, sample_car):
+        """Test that unknown ids are reported per item."""
+        trip = Trip.objects.create(
+            date=date(2025, 3, 1), destination="A", reason="B", distance=Decimal("1.0"), car=sample_car
+        )
+        payload = [{"id": trip.pk, "distance": "2.0"}, {"id": 99999, "distance": "2.0"}]
+        response = api_client.patch(self.url, payload, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "id" in response.data[1]
+        trip.refresh_from_db()
+        assert trip.distance == Decimal("1.0")
+
+    def test_bulk_delete(self, api_client, sample_car):
+        """Test deleting several trips by id."""
+        trips = [
+            Trip.objects.create(
+                date=date(2025, 3, day), destination="A", reason="B", distance=Decimal("1.0"), car=sample_car
+            )
+            for day in (1, 2, 3)
+        ]
+        response = api_client.delete(self.url, [trips[0].pk, trips[1].pk], format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"deleted": 2}
+        assert list(Trip.objects.all()) == [trips[2]]
+        assert TripRollup.objects.get(car=sample_car).trip_count == 1
+
+    def test_bulk_delete_unknown_id(self, api_client, sample_car):
+        """Test that deleting an unknown id deletes nothing."""
+        trip = Trip.objects.create(
+            date=date(2025, 3, 1), destination="A", reason="B", distance=Decimal("1.0"), car=sample_car
+        )
+        response = api_client.delete(self.url, [trip.pk, 99999], format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Trip.objects.filter(pk=trip.pk).exists()
+
+    def test_bulk_requires_list(self, api_client):
+        """Test that a non-list payload is rejected."""
+        response = api_client.post(self.url, {"date": "2025-03-01"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestBenchmarkCommand:
+    """Smoke test for the benchmark command."""
+
+    def test_bulk_trip_create_benchmark(self, tmp_path):
+        """Test the bulk create benchmark runs and leaves no rows behind."""
+        output = tmp_path / "results.json"
+        out = StringIO()
+        call_command("benchmark", "bulk_trip_create", size=[5], output=str(output), stdout=out)
+        result = json.loads(out.getvalue())
+        assert result["benchmark"] == "bulk_trip_create"
+        assert result["bulk_rows_per_second"] > 0
+        assert json.loads(output.read_text()) == [result]
+        assert not Trip.objects.exists()
+
+    def test_car_delete_benchmark(self):
+        """Test the car delete benchmark compares both paths and leaves no rows behind."""
+        out = StringIO()
+        call_command("benchmark", "car_delete", size=[5], stdout=out)
+        result = json.loads(out.getvalue())
+        assert result["batched_seconds"] > 0
+        assert result["cascade_peak_kib"] > 0
+        assert not Car.objects.exists()
+
+    def test_trip_import_benchmark(self):
+        """Test the import benchmark reports throughput and leaves no rows behind."""
+        out = StringIO()
+        call_command("benchmark", "trip_import", size=[5], stdout=out)
+        result = json.loads(out.getvalue())
+        assert result["rows_per_second"] > 0
+        assert not Trip.objects.exists()
+
+    def test_views_benchmark(self):
+        """Test the view benchmark requests every URL once per size and leaves no rows behind."""
+        out = StringIO()
+        call_command("benchmark", "views", size=[10, 20], stdout=out)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [result["size"] for result in results] == [10, 20]
+        urls = results[1]["urls"]
+        assert {name: timing["status"] for name, timing in urls.items()} == dict.fromkeys(urls, 200)
+        assert urls["trip_list"]["queries"] > 0
+        assert not Trip.objects.exists()
+
+    def test_trip_list_serialization_benchmark(self):
+        """Test the serialization benchmark finds both paths give the same JSON and leaves no rows behind."""
+        out = StringIO()
+        call_command("benchmark", "trip_list_serialization", size=[5], stdout=out)
+        result = json.loads(out.getvalue())
+        assert result["identical"]
+        assert result["values_rows_per_second"] > 0
+        assert not Trip.objects.exists()
+
+    def test_json_rendering_benchmark(self):
+        """Test the JSON benchmark finds both renderers give the same bytes and leaves no rows behind."""
+        out = StringIO()
+        call_command("benchmark", "json_rendering", size=[5], stdout=out)
+        result = json.loads(out.getvalue())
+        assert result["identical"]
+        assert result["orjson_render_rows_per_second"] > 0
+        assert not Trip.objects.exists()
+
+    def test_sparse_fields_benchmark(self):
+        """Test the sparse fields benchmark finds the mobile selection smallest and leaves no rows behind."""
+        out = StringIO()
+        call_command("benchmark", "sparse_fields", size=[5], stdout=out)
+        result = json.loads(out.getvalue())
+        assert result["mobile_bytes"] < result["pk_bytes"] < result["full_bytes"]
+        assert not Trip.objects.exists()
+
+    def test_views_benchmark_covers_every_url(self):
+        """Test that the view benchmark requests every trips URL that answers GET."""
+        names = {pattern.name for pattern in [*urls.urlpatterns, *urls.router.urls] if getattr(pattern, "name", None)}
+        objects = (User(pk=1), Car(pk=1), Trip(pk=1), Odometer(pk=1))
+        assert set(benchmarks.view_urls(*objects)) == names - {"trip-bulk"}
+
+
+@pytest.mark.django_db
+class TestSyncAPI:
+    """Tests for the delta sync endpoint."""
+
+    url = "/trips/api/sync/"
+
+    def make_trip(self, car, destination="Office"):
+        """Create a trip for car."""
+        return Trip.objects.create(
+            date=date(2025, 3, 1), destination=destination, reason="B", distance=Decimal("1.0"), car=car
+        )
+
+    def backdate(self, model, days=1):
+        """Move every row's modified timestamp days into the past."""
+        model.objects.update(modified=timezone.now() - timedelta(days=days))
+
+    def test_full_sync_without_token(self, api_client, sample_car):
+        """Test that the first sync returns everything and a token."""
+        self.make_trip(sample_car)
+        Odometer.objects.create(date=date(2025, 3, 1), car=sample_car, km=1000)
+        response = api_client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["token"]
+        assert response.data["full"]
+        assert [car["name"] for car in response.data["cars"]] == ["API Test Car"]
+        assert len(response.data["trips"]) == 1
+        assert len(response.data["odometers"]) == 1
+        assert response.data["deleted"] == {"cars": [], "trips": [], "odometers": []}
+
+    def test_incremental_sync(self, api_client, sample_car):
+        """Test that a token only returns rows changed or deleted since it was issued."""
+        unchanged = self.make_trip(sample_car, "Unchanged")
+        edited = self.make_trip(sample_car, "Edited")
+        deleted = self.make_trip(sample_car, "Deleted")
+        for model in (Car, Trip):
+            self.backdate(model, days=2)
+        token = api_client.get(self.url).data["token"]
+        Tombstone.objects.update(deleted=timezone.now() - timedelta(days=2))
+
+        edited.destination = "Edited Again"
+        edited.save()
+        deleted_pk = deleted.pk
+        deleted.delete()
+        self.make_trip(sample_car, "New")
+
+        response = api_client.get(self.url, {"since": token})
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.data["full"]
+        assert response.data["cars"] == []
+        assert {trip["destination"] for trip in response.data["trips"]} == {"Edited Again", "New"}
+        assert response.data["deleted"]["trips"] == [f"http://testserver/trips/api/trips/{deleted_pk}/"]
+        assert unchanged.destination not in {trip["destination"] for trip in response.data["trips"]}
+
+    def test_bulk_delete_records_tombstones(self, api_client, sample_car):
+        """Test that trips deleted through the bulk endpoint are reported."""
+        trip = self.make_trip(sample_car)
+        token = api_client.get(self.url).data["token"]
+        api_client.delete("/trips/api/trips/bulk/", [trip.pk], format="json")
+        response = api_client.get(self.url, {"since": token})
+        assert response.data["deleted"]["trips"] == [f"http://testserver/trips/api/trips/{trip.pk}/"]
+
+    def test_deleted_pks(self, api_client, sample_car):
+        """Test that deletions are listed by id with relations=pk."""
+        trip = self.make_trip(sample_car)
+        token = api_client.get(self.url).data["token"]
+        trip_pk = trip.pk
+        trip.delete()
+        response = api_client.get(self.url, {"since": token, "relations": "pk"})
+        assert response.data["deleted"]["trips"] == [trip_pk]
+
+    def test_fields_across_collections(self, api_client, sample_car):
+        """Test that fields may name fields of any collection, each collection keeping those it has."""
+        self.make_trip(sample_car)
+        response = api_client.get(self.url, {"relations": "pk", "fields": "id,name,distance"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["cars"] == [{"id": sample_car.pk, "name": "API Test Car"}]
+        assert list(response.data["trips"][0]) == ["id", "distance"]
+
+    def test_car_cascade_records_tombstones(self, api_client, sample_car):
+        """Test that deleting a car reports its trips and odometer readings as deleted."""
+        trip = self.make_trip(sample_car)
+        odometer = Odometer.objects.create(date=date(2025, 3, 1), car=sample_car, km=1000)
+        car_pk = sample_car.pk
+        sample_car.delete()
+        assert set(Tombstone.objects.values_list("model_name", "object_id")) == {
+            ("car", car_pk),
+            ("trip", trip.pk),
+            ("odometer", odometer.pk),
+        }
+
+    def test_invalid_token(self, api_client):
+        """Test that a tampered token is rejected."""
+        response = api_client.get(self.url, {"since": "not-a-token"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_token_older_than_retention(self, api_client, sample_car, settings):
+        """Test that a token from before the tombstone retention cutoff gets a full sync."""
+        self.make_trip(sample_car)
+        token = api_client.get(self.url).data["token"]
+        settings.SYNC_TOMBSTONE_RETENTION = timedelta(seconds=30)
+        response = api_client.get(self.url, {"since": token})
+        assert response.data["full"]
+        assert len(response.data["trips"]) == 1
+
+    def test_prune_tombstones(self, sample_car):
+        """Test that prune_tombstones deletes only the tombstones older than the retention."""
+        self.make_trip(sample_car).delete()
+        self.make_trip(sample_car).delete()
+        old = Tombstone.objects.first()
+        Tombstone.objects.filter(pk=old.pk).update(deleted=timezone.now() - timedelta(days=91))
+        out = StringIO()
+        call_command("prune_tombstones", stdout=out)
+        assert "Pruned 1 tombstones." in out.getvalue()
+        assert not Tombstone.objects.filter(pk=old.pk).exists()
+        assert Tombstone.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestTripExportAPI:
+    """Tests for the streaming trip export."""
+
+    @pytest.fixture
+    def trips(self, sample_car):
+        """Create trips across two months."""
+        return [
+            Trip.objects.create(
+                date=date(2025, 1 + index % 2, 10 + index),
+                destination=f"Dest {index}",
+                reason="Business",
+                distance=Decimal(f"{index}.5"),
+                car=sample_car,
+            )
+            for index in range(5)
+        ]
+
+    def content(self, response):
+        """Join a streaming response's chunks."""
+        assert response.streaming
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_csv(self, api_client, trips):
+        """Test the CSV export has a header and one row per trip, newest first."""
+        response = api_client.get("/trips/api/trips/export/csv/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "text/csv"
+        lines = self.content(response).splitlines()
+        assert lines[0] == "id,date,destination,reason,distance,car"
+        assert len(lines) == 6
+        assert lines[1] == f"{trips[3].pk},2025-02-13,Dest 3,Business,3.5,API Test Car"
+
+    def test_export_ndjson(self, api_client, trips):
+        """Test the NDJSON export keeps decimal distances as strings."""
+        response = api_client.get("/trips/api/trips/export/ndjson/", HTTP_ACCEPT="application/x-ndjson")
+        assert response.status_code == status.HTTP_200_OK
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        assert len(rows) == 5
+        assert rows[0] == {
+            "id": trips[3].pk,
+            "date": "2025-02-13",
+            "destination": "Dest 3",
+            "reason": "Business",
+            "distance": "3.5",
+            "car": "API Test Car",
+        }
+
+    def test_export_honours_filters(self, api_client, trips):
+        """Test that TripFilter date ranges limit the export."""
+        response = api_client.get("/trips/api/trips/export/ndjson/?date_before=2025-01-31")
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        assert [row["date"] for row in rows] == ["2025-01-14", "2025-01-12", "2025-01-10"]
+
+    def test_export_errors_are_json(self, api_client, trips):
+        """Test that errors are rendered as JSON even when the client only accepts CSV."""
+        response = api_client.get("/trips/api/trips/export/csv/?date_after=bad", HTTP_ACCEPT="text/csv")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response["Content-Type"] == "application/json"
+        assert "date" in response.json()
+
+        response = APIClient().get("/trips/api/trips/export/csv/", HTTP_ACCEPT="text/csv")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response["Content-Type"] == "application/json"
+        assert "detail" in response.json()
+
+    def test_export_reads_in_chunks(self, trips):
+        """Test that rows spanning several chunks come back once each, in order."""
+        rows = list(export_rows(Trip.objects.all(), chunk_size=2))
+        assert [row["id"] for row in rows] == [trip.pk for trip in sorted(trips, key=lambda t: t.date, reverse=True)]
+
+
+@pytest.mark.django_db
+class TestTripStatsAPI:
+    """Tests for the grouped trip statistics endpoint."""
+
+    url = "/trips/api/trips/stats/"
+
+    @pytest.fixture
+    def trips(self, sample_car):
+        """Create trips across two cars, months and reasons."""
+        other_car = Car.objects.create(name="Other Car")
+        rows = [
+            (date(2024, 12, 1), "Business", "10.0", sample_car),
+            (date(2025, 1, 5), "Business", "2.5", sample_car),
+            (date(2025, 1, 6), "Personal", "4.0", sample_car),
+            (date(2025, 2, 1), "Business", "1.0", other_car),
+        ]
+        return [
+            Trip.objects.create(date=day, destination="A", reason=reason, distance=Decimal(distance), car=car)
+            for day, reason, distance, car in rows
+        ]
+
+    def test_totals_without_groups(self, api_client, trips):
+        """Test that no group_by returns a single total."""
+        response = api_client.get(self.url)
+        assert response.data["results"] == [{"trip_count": 4, "total_distance": "17.5"}]
+
+    def test_group_by_year_month(self, api_client, trips):
+        """Test grouping by year and month."""
+        response = api_client.get(self.url, {"group_by": "year,month"})
+        assert response.data["results"] == [
+            {"year": 2024, "month": 12, "trip_count": 1, "total_distance": "10.0"},
+            {"year": 2025, "month": 1, "trip_count": 2, "total_distance": "6.5"},
+            {"year": 2025, "month": 2, "trip_count": 1, "total_distance": "1.0"},
+        ]
+
+    def test_group_by_car_and_reason(self, api_client, trips, sample_car):
+        """Test grouping by car and reason."""
+        response = api_client.get(self.url, {"group_by": "car,reason"})
+        results = {(row["car_name"], row["reason"]): row["trip_count"] for row in response.data["results"]}
+        assert results == {
+            ("API Test Car", "Business"): 2,
+            ("API Test Car", "Personal"): 1,
+            ("Other Car", "Business"): 1,
+        }
+        assert response.data["results"][0]["car"].endswith(f"/trips/api/cars/{sample_car.pk}/")
+
+    def test_respects_filters(self, api_client, trips):
+        """Test that TripFilter date ranges apply before grouping."""
+        response = api_client.get(self.url, {"group_by": "year", "date_after": "2025-01-01"})
+        assert response.data["results"] == [{"year": 2025, "trip_count": 3, "total_distance": "7.5"}]
+
+    def test_single_query(self, api_client, trips):
+        """Test that a grouped summary is one GROUP BY query."""
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get(self.url, {"group_by": "year,month,reason"})
+        assert sum("GROUP BY" in query["sql"] for query in queries) == 1
+        assert not any('FROM "trips_trip"' in query["sql"] and "GROUP BY" not in query["sql"] for query in queries)
+
+    def test_unknown_group(self, api_client):
+        """Test that unknown groups are rejected."""
+        response = api_client.get(self.url, {"group_by": "year,colour"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,125 @@
+"""Unit tests for destination and reason autocomplete."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from trips.autocomplete import SuggestionIndex, suggest, usage_weights
+from trips.models import Car, Trip
+
+
+@pytest.fixture
+def car(db):
+    """Create a test car."""
+    return Car.objects.create(name="Suggest Car")
+
+
+@pytest.fixture
+def api_client(db):
+    """Create an API client logged in as a regular user."""
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_user(username="suggester", password="pass"))
+    return client
+
+
+def make_trips(car, destination, count, day=None, reason="Business"):
+    """Create count trips to destination on day."""
+    for _ in range(count):
+        Trip.objects.create(
+            date=day or date.today(), destination=destination, reason=reason, distance=Decimal("1.0"), car=car
+        )
+
+
+class TestSuggestionIndex:
+    """Tests for prefix lookups on the in-memory index."""
+
+    @pytest.fixture
+    def index(self):
+        """Build an index over a handful of weighted values."""
+        return SuggestionIndex({"Office": 5.0, "Office Depot": 9.0, "office park": 1.0, "Airport": 3.0, "Of": 0.5})
+
+    def test_prefix_ranked_by_weight(self, index):
+        """Test that prefix matches come back heaviest first, case-insensitively."""
+        assert index.suggest("off") == ["Office Depot", "Office", "office park"]
+        assert index.suggest("OFFICE ") == ["Office Depot", "office park"]
+
+    def test_empty_prefix_ranks_everything(self, index):
+        """Test that no prefix returns every value by weight."""
+        assert index.suggest("", limit=3) == ["Office Depot", "Office", "Airport"]
+
+    def test_limit_and_no_match(self, index):
+        """Test the limit and a prefix nothing starts with."""
+        assert index.suggest("o", limit=2) == ["Office Depot", "Office"]
+        assert index.suggest("zzz") == []
+
+
+@pytest.mark.django_db
+class TestUsageWeights:
+    """Tests for frequency and recency weighting."""
+
+    def test_recent_beats_frequent_but_stale(self, car):
+        """Test that a value's weight decays with time since its last use."""
+        today = date(2025, 6, 1)
+        make_trips(car, "Old Client", 4, day=today - timedelta(days=365))
+        make_trips(car, "New Client", 2, day=today)
+        weights = usage_weights("destination", today=today)
+        assert weights["New Client"] == 2
+        assert weights["Old Client"] < 1
+
+    def test_rebuilt_after_trips_change(self, car):
+        """Test that a new trip shows up in the next lookup."""
+        make_trips(car, "Office", 1)
+        assert suggest("destination", "o") == ["Office"]
+        make_trips(car, "Orchard", 2)
+        assert suggest("destination", "o") == ["Orchard", "Office"]
+
+    def test_lookups_skip_the_database(self, car):
+        """Test that repeat lookups are answered without queries."""
+        make_trips(car, "Office", 1)
+        suggest("destination", "o")
+        with CaptureQueriesContext(connection) as queries:
+            assert suggest("destination", "of") == ["Office"]
+        assert len(queries) == 0
+
+
+@pytest.mark.django_db
+class TestAutocompleteAPI:
+    """Tests for the autocomplete endpoint."""
+
+    def test_destinations(self, api_client, car):
+        """Test that destinations are suggested by prefix, most used first."""
+        make_trips(car, "Office", 1)
+        make_trips(car, "Orchard", 3)
+        make_trips(car, "Airport", 5)
+        response = api_client.get("/trips/api/autocomplete/destination/?q=o")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == ["Orchard", "Office"]
+
+    def test_reasons_with_limit(self, api_client, car):
+        """Test reason suggestions and the limit parameter."""
+        make_trips(car, "Office", 2, reason="Client meeting")
+        make_trips(car, "Office", 1, reason="Conference")
+        response = api_client.get("/trips/api/autocomplete/reason/?q=c&limit=1")
+        assert response.data == ["Client meeting"]
+
+    def test_unknown_field(self, api_client):
+        """Test that only destination and reason can be looked up."""
+        response = api_client.get("/trips/api/autocomplete/car/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_limit(self, api_client):
+        """Test that a non-numeric limit is rejected."""
+        response = api_client.get("/trips/api/autocomplete/reason/?limit=lots")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_requires_login(self, db):
+        """Test that anonymous users get no suggestions."""
+        response = APIClient().get("/trips/api/autocomplete/destination/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,187 @@
+"""Unit tests for the bulk trip writes, batched car delete and car merge."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+from rest_framework.test import APIClient
+
+from trips.bulk import delete_car, merge_cars, update_trips
+from trips.models import Car, Destination, Odometer, Reason, Tombstone, Trip, TripRollup
+
+
+@pytest.fixture
+def car(db):
+    """Create a car with five trips over two months and three odometer readings."""
+    car = Car.objects.create(name="Doomed Car")
+    for index in range(5):
+        Trip.objects.create(
+            date=date(2025, 1, 20) + timedelta(days=index * 5),
+            destination="Office",
+            reason="Business",
+            distance=Decimal("2.0"),
+            car=car,
+        )
+    for index in range(3):
+        Odometer.objects.create(date=date(2025, 1, 1) + timedelta(days=index), car=car, km=index)
+    return car
+
+
+@pytest.fixture
+def other_car(db):
+    """Create a car with one trip that should survive."""
+    car = Car.objects.create(name="Survivor")
+    Trip.objects.create(date=date(2025, 1, 1), destination="Office", reason="Other", distance=Decimal("1.0"), car=car)
+    return car
+
+
+@pytest.mark.django_db
+class TestUpdateTrips:
+    """Tests for updating trips in bulk."""
+
+    def test_same_trip_twice(self, car):
+        """Test that a trip changed twice in one call is refused before anything is written."""
+        trip = Trip.objects.filter(car=car).first()
+        with pytest.raises(ValueError, match="only be changed once"):
+            update_trips([(trip, {"distance": Decimal("3.0")}), (trip, {"distance": Decimal("4.0")})])
+        trip.refresh_from_db()
+        assert trip.distance == Decimal("2.0")
+
+
+@pytest.mark.django_db
+class TestDeleteCar:
+    """Tests for deleting a car and its dependents in batches."""
+
+    def test_deletes_dependents_and_bookkeeping(self, car, other_car):
+        """Test that trips, readings, rollups and unused names go, and only the other car's data stays."""
+        trip_ids = set(Trip.objects.filter(car=car).values_list("pk", flat=True))
+        reading_ids = set(Odometer.objects.filter(car=car).values_list("pk", flat=True))
+        car_id = car.pk
+
+        assert delete_car(car, batch_size=2) == 8
+
+        assert not Car.objects.filter(pk=car_id).exists()
+        assert list(Trip.objects.values_list("car__name", flat=True)) == ["Survivor"]
+        assert not Odometer.objects.exists()
+        assert list(TripRollup.objects.values_list("car_id", "trip_count")) == [(other_car.pk, 1)]
+        assert list(Destination.objects.values_list("name", "trip_count")) == [("Office", 1)]
+        assert list(Reason.objects.values_list("name", flat=True)) == ["Other"]
+        tombstones = set(Tombstone.objects.values_list("model_name", "object_id"))
+        assert tombstones == (
+            {("trip", pk) for pk in trip_ids} | {("odometer", pk) for pk in reading_ids} | {("car", car_id)}
+        )
+
+    def test_reports_progress(self, car):
+        """Test that progress is reported after every batch."""
+        calls = []
+        delete_car(car, batch_size=2, progress=lambda deleted, total: calls.append((deleted, total)))
+        assert calls == [(2, 8), (4, 8), (5, 8), (7, 8), (8, 8)]
+
+    def test_delete_view_uses_batches(self, client, django_user_model, car):
+        """Test that the car delete view removes the car and its trips."""
+        client.force_login(django_user_model.objects.create_user(username="deleter", password="pass"))
+        response = client.post(reverse("trips:car_delete", args=[car.pk]))
+        assert response.status_code == 302
+        assert not Car.objects.exists()
+        assert not Trip.objects.exists()
+
+    def test_api_delete_uses_batches(self, django_user_model, car, other_car):
+        """Test that deleting a car through the API removes its trips in one batch and keeps the bookkeeping."""
+        client = APIClient()
+        client.force_authenticate(django_user_model.objects.create_user(username="api-deleter"))
+        with CaptureQueriesContext(connection) as queries:
+            response = client.delete(reverse("trips:car-detail", args=[car.pk]))
+        assert response.status_code == 204
+        trip_deletes = [query for query in queries if query["sql"].startswith('DELETE FROM "trips_trip"')]
+        assert len(trip_deletes) == 1
+        assert list(Car.objects.all()) == [other_car]
+        assert Tombstone.objects.filter(model_name="trip").count() == 5
+        assert not TripRollup.objects.filter(car_id=car.pk).exists()
+
+
+@pytest.mark.django_db
+class TestDeleteCarCommand:
+    """Tests for the delete_car management command."""
+
+    def test_deletes_with_progress(self, car):
+        """Test that the command deletes the named car and prints progress."""
+        out = StringIO()
+        call_command("delete_car", "Doomed Car", batch_size=4, stdout=out)
+        assert "Deleted 4/8 trips and odometer readings" in out.getvalue()
+        assert "Deleted Doomed Car with 8 trips and odometer readings." in out.getvalue()
+        assert not Car.objects.exists()
+
+    def test_unknown_car(self, db):
+        """Test that an unknown car name is an error."""
+        with pytest.raises(CommandError, match="No car named 'Nope'"):
+            call_command("delete_car", "Nope")
+
+
+def add_trips(car, count, day=date(2025, 1, 10)):
+    """Create count trips for car on day."""
+    for _ in range(count):
+        Trip.objects.create(date=day, destination="Office", reason="Business", distance=Decimal("1.5"), car=car)
+
+
+@pytest.mark.django_db
+class TestMergeCars:
+    """Tests for merging one car into another."""
+
+    def test_moves_rows_and_deletes_source(self, car, other_car):
+        """Test that trips, readings, rollups and counters end up on the target."""
+        source_id = car.pk
+        assert merge_cars(car, other_car) == 8
+
+        assert not Car.objects.filter(pk=source_id).exists()
+        assert Trip.objects.filter(car=other_car).count() == 6
+        assert Odometer.objects.filter(car=other_car).count() == 3
+        assert set(TripRollup.objects.values_list("car_id", "year", "month", "trip_count")) == {
+            (other_car.pk, 2025, 1, 4),
+            (other_car.pk, 2025, 2, 2),
+        }
+        other_car.refresh_from_db()
+        assert (other_car.trip_count, other_car.total_distance) == (6, Decimal("11.0"))
+        assert list(Tombstone.objects.values_list("model_name", "object_id")) == [("car", source_id)]
+
+    def test_marks_moved_rows_modified(self, car, other_car):
+        """Test that moved rows are picked up by the next delta sync."""
+        before = Trip.objects.get(car=other_car).modified
+        merge_cars(car, other_car)
+        assert Trip.objects.filter(modified__gt=before).count() == 5
+        assert Odometer.objects.filter(modified__gt=before).count() == 3
+
+    def test_constant_queries(self, db):
+        """Test that merging 20 trips takes no more queries than merging 2."""
+
+        def count_merge_queries(trip_count):
+            source, target = Car.objects.create(name=f"Source {trip_count}"), Car.objects.create(name=f"T{trip_count}")
+            add_trips(source, trip_count)
+            add_trips(target, 1)
+            with CaptureQueriesContext(connection) as queries:
+                merge_cars(source, target)
+            return len(queries)
+
+        assert count_merge_queries(20) == count_merge_queries(2)
+
+    def test_merge_into_itself(self, car):
+        """Test that a car cannot be merged into itself."""
+        with pytest.raises(ValueError, match="itself"):
+            merge_cars(car, car)
+
+    def test_command(self, car, other_car):
+        """Test that the merge_cars command merges cars by name."""
+        out = StringIO()
+        call_command("merge_cars", "Doomed Car", "Survivor", stdout=out)
+        assert "Merged Doomed Car into Survivor, moving 8 trips and odometer readings." in out.getvalue()
+        assert list(Car.objects.values_list("name", flat=True)) == ["Survivor"]
+
+    def test_command_unknown_car(self, car):
+        """Test that an unknown car name is an error."""
+        with pytest.raises(CommandError, match="No car named 'Nope'"):
+            call_command("merge_cars", "Doomed Car", "Nope")
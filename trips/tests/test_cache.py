@@ -0,0 +1,128 @@
+"""Unit tests for the versioned view cache."""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+
+from trips.cache import VERSION_KEY, bump_data_version, cached, data_version
+from trips.models import Car, Odometer, Trip
+
+
+@pytest.fixture
+def client(db):
+    """Create an authenticated test client."""
+    User.objects.create_user(username="testuser", password="testpass123")
+    c = Client()
+    c.login(username="testuser", password="testpass123")
+    return c
+
+
+@pytest.fixture
+def car(db):
+    """Create a test car."""
+    return Car.objects.create(name="Cache Car")
+
+
+def make_trip(car, distance="10.0"):
+    """Create a trip this year."""
+    return Trip.objects.create(
+        date=date.today(), destination="Office", reason="Business", distance=Decimal(distance), car=car
+    )
+
+
+def count_queries(client, url):
+    """Return the response and number of queries for a GET."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+class TestCached:
+    """Tests for the cache helpers."""
+
+    def test_cached_until_version_bump(self):
+        """Test that values are reused until the data version changes."""
+        calls = []
+
+        def compute(value):
+            calls.append(value)
+            return value * 2
+
+        assert cached("double", compute, 2) == 4
+        assert cached("double", compute, 2) == 4
+        assert calls == [2]
+        bump_data_version()
+        assert cached("double", compute, 2) == 4
+        assert calls == [2, 2]
+
+    def test_lost_version_is_not_reused(self):
+        """Test that a version evicted from the cache restarts somewhere new."""
+        version = data_version()
+        cache.delete(VERSION_KEY)
+        assert data_version() != version
+
+
+@pytest.mark.django_db
+class TestCachedViews:
+    """Tests for cached view data and its invalidation on writes."""
+
+    @pytest.mark.parametrize(
+        "url_name",
+        ["trips:dashboard", "trips:car_list", "trips:cra_report", "trips:trip_list"],
+    )
+    def test_repeat_requests_use_cache(self, client, car, url_name):
+        """Test that a second request runs fewer queries."""
+        make_trip(car)
+        _, first = count_queries(client, reverse(url_name))
+        _, second = count_queries(client, reverse(url_name))
+        assert second < first
+
+    def test_trip_save_invalidates_dashboard(self, client, car):
+        """Test that adding a trip shows up on the next dashboard request."""
+        make_trip(car)
+        assert client.get(reverse("trips:dashboard")).context["trips_this_year"] == 1
+        make_trip(car)
+        assert client.get(reverse("trips:dashboard")).context["trips_this_year"] == 2
+
+    def test_trip_delete_invalidates_car_list(self, client, car):
+        """Test that deleting a trip updates the car list."""
+        trip = make_trip(car)
+        assert client.get(reverse("trips:car_list")).context["cars"][0].trip_count == 1
+        trip.delete()
+        assert client.get(reverse("trips:car_list")).context["cars"][0].trip_count == 0
+
+    def test_odometer_save_invalidates_cra_report(self, client, car):
+        """Test that a new odometer reading shows up in the CRA report."""
+        make_trip(car)
+        year = date.today().year
+        url = reverse("trips:cra_report") + f"?year={year}"
+        assert client.get(url).context["car_odometer_data"][0]["start_reading"] is None
+        reading = Odometer.objects.create(date=date(year, 1, 1), car=car, km=1000)
+        assert client.get(url).context["car_odometer_data"][0]["start_reading"] == reading
+
+    def test_car_rename_invalidates_car_list(self, client, car):
+        """Test that renaming a car updates the car list."""
+        client.get(reverse("trips:car_list"))
+        car.name = "Renamed"
+        car.save()
+        assert client.get(reverse("trips:car_list")).context["cars"][0].name == "Renamed"
+
+    def test_rebuild_rollups_invalidates_dashboard(self, client, car):
+        """Test that trips written without signals show up once rebuild_rollups has run."""
+        assert client.get(reverse("trips:dashboard")).context["trips_this_year"] == 0
+        Trip.objects.bulk_create(
+            [Trip(date=date.today(), destination="Office", reason="Business", distance=Decimal("1.0"), car=car)]
+        )
+        call_command("rebuild_rollups", stdout=StringIO())
+        assert client.get(reverse("trips:dashboard")).context["trips_this_year"] == 1
@@ -0,0 +1,147 @@
+"""Unit tests for the per-car trip_count and total_distance counters."""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+
+from trips.bulk import create_trips, delete_trips, update_trips
+from trips.models import Car, Trip
+
+
+@pytest.fixture
+def car(db):
+    """Create a test car."""
+    return Car.objects.create(name="Counter Car")
+
+
+@pytest.fixture
+def other_car(db):
+    """Create a second test car."""
+    return Car.objects.create(name="Other Car")
+
+
+def make_trip(car, distance="10.0"):
+    """Create a trip for car."""
+    return Trip.objects.create(
+        date=date(2025, 3, 1), destination="Office", reason="Business", distance=Decimal(distance), car=car
+    )
+
+
+def totals(car):
+    """Return car's stored (trip_count, total_distance)."""
+    car.refresh_from_db()
+    return car.trip_count, car.total_distance
+
+
+@pytest.mark.django_db
+class TestCarTotalsSignals:
+    """Tests for keeping car counters in step with trip writes."""
+
+    def test_create_and_delete(self, car):
+        """Test that trips are added to and removed from their car's totals."""
+        make_trip(car, "10.0")
+        trip = make_trip(car, "2.5")
+        assert totals(car) == (2, Decimal("12.5"))
+        trip.delete()
+        assert totals(car) == (1, Decimal("10.0"))
+
+    def test_edit_distance(self, car):
+        """Test that editing the distance adjusts the total."""
+        trip = make_trip(car, "10.0")
+        trip.distance = Decimal("4.0")
+        trip.save()
+        assert totals(car) == (1, Decimal("4.0"))
+
+    def test_move_between_cars(self, car, other_car):
+        """Test that moving a trip moves its count and distance to the new car."""
+        trip = make_trip(car, "10.0")
+        trip.car = other_car
+        trip.distance = Decimal("7.0")
+        trip.save()
+        assert totals(car) == (0, Decimal("0.0"))
+        assert totals(other_car) == (1, Decimal("7.0"))
+
+    def test_bulk_writes(self, car, other_car):
+        """Test that the bulk write paths keep the counters consistent."""
+        with transaction.atomic():
+            trips = create_trips(
+                [
+                    Trip(date=date(2025, 3, 1), destination="A", reason="B", distance=Decimal("1.5"), car=car)
+                    for _ in range(3)
+                ]
+            )
+            update_trips([(trips[0], {"car": other_car})])
+            delete_trips(trips[1:2])
+        assert totals(car) == (1, Decimal("1.5"))
+        assert totals(other_car) == (1, Decimal("1.5"))
+
+    def test_stale_car_save_keeps_counters(self, car):
+        """Test that saving a car loaded before a trip was added does not reset its counters."""
+        stale = Car.objects.get(pk=car.pk)
+        make_trip(car, "10.0")
+        stale.name = "Renamed"
+        stale.save()
+        assert totals(car) == (1, Decimal("10.0"))
+        assert car.name == "Renamed"
+
+    def test_car_list_reads_one_table(self, client, django_user_model, car, other_car):
+        """Test that the car list does not join trips or rollups."""
+        make_trip(car, "10.0")
+        client.force_login(django_user_model.objects.create_user(username="counter", password="pass"))
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("trips:car_list"))
+        car_queries = [query["sql"] for query in queries if '"trips_car"' in query["sql"]]
+        assert len(car_queries) == 1
+        assert "JOIN" not in car_queries[0]
+        assert [(row.name, row.trip_count) for row in response.context["cars"]] == [
+            ("Counter Car", 1),
+            ("Other Car", 0),
+        ]
+
+
+@pytest.mark.django_db
+class TestCheckCarTotals:
+    """Tests for the check_car_totals management command."""
+
+    def test_consistent(self, car):
+        """Test that consistent totals are reported as such."""
+        make_trip(car)
+        out = StringIO()
+        call_command("check_car_totals", stdout=out)
+        assert "All car totals are consistent." in out.getvalue()
+
+    def test_repairs_drift(self, car, other_car):
+        """Test that drifted totals are reported and repaired."""
+        make_trip(car, "10.0")
+        Trip.objects.bulk_create([Trip(date=date(2025, 3, 2), destination="A", reason="B", distance=3, car=car)])
+        Car.objects.filter(pk=other_car.pk).update(trip_count=5)
+
+        out = StringIO()
+        call_command("check_car_totals", stdout=out)
+        assert "Counter Car: stored 1 trips (10.0 km), actual 2 trips (13.0 km)" in out.getvalue()
+        assert "Repaired 2 cars." in out.getvalue()
+        assert totals(car) == (2, Decimal("13.0"))
+        assert totals(other_car) == (0, Decimal("0.0"))
+
+    def test_repair_invalidates_car_list(self, client, django_user_model, car):
+        """Test that the car list shows the repaired totals rather than its cached copy."""
+        client.force_login(django_user_model.objects.create_user(username="counter", password="pass"))
+        Car.objects.filter(pk=car.pk).update(trip_count=5)
+        assert client.get(reverse("trips:car_list")).context["cars"][0].trip_count == 5
+        call_command("check_car_totals", stdout=StringIO())
+        assert client.get(reverse("trips:car_list")).context["cars"][0].trip_count == 0
+
+    def test_dry_run(self, car):
+        """Test that --dry-run reports drift without repairing it."""
+        Car.objects.filter(pk=car.pk).update(trip_count=5)
+        out = StringIO()
+        call_command("check_car_totals", "--dry-run", stdout=out)
+        assert "1 cars have drifted." in out.getvalue()
+        assert totals(car)[0] == 5
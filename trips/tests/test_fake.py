@@ -0,0 +1,61 @@
+"""Unit tests for the fake trip generator."""
+
+from datetime import date
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+
+import pytest
+
+from trips.fake import generate_trips
+from trips.models import Car, Destination, Odometer, Trip, TripRollup
+
+
+@pytest.mark.django_db
+class TestGenerateTrips:
+    """Tests for generate_trips."""
+
+    def test_spreads_trips_over_cars_and_years(self):
+        """Test that trips cover every car and year, with the bookkeeping tables kept current."""
+        cars = generate_trips(300, cars=2, years=2, end=date(2025, 6, 30), batch_size=100)
+        assert [car.name for car in cars] == ["Fake car 1", "Fake car 2"]
+        assert Trip.objects.count() == 300
+        assert set(Trip.objects.values_list("car__name", flat=True)) == {"Fake car 1", "Fake car 2"}
+        assert set(Trip.objects.dates("date", "year")) == {date(2024, 1, 1), date(2025, 1, 1)}
+        assert not Trip.objects.filter(date__gt=date(2025, 6, 30)).exists()
+        assert sum(car.trip_count for car in Car.objects.all()) == 300
+        assert TripRollup.objects.aggregate(total=Sum("trip_count"))["total"] == 300
+        assert Destination.objects.aggregate(total=Sum("trip_count"))["total"] == 300
+
+    def test_seeded(self):
+        """Test that the same seed gives the same trips."""
+
+        def trips(seed):
+            generate_trips(50, end=date(2025, 6, 30), seed=seed)
+            values = list(Trip.objects.values_list("date", "destination", "reason", "distance", "car__name"))
+            Trip.objects.all().delete()
+            return sorted(values)
+
+        assert trips(1) == trips(1)
+        assert trips(1) != trips(2)
+
+    def test_odometer_counts_up(self):
+        """Test that each car's monthly odometer readings never go down."""
+        for car in generate_trips(200, years=1, end=date(2025, 12, 31)):
+            readings = list(Odometer.objects.filter(car=car).order_by("date").values_list("km", flat=True))
+            assert readings
+            assert readings == sorted(readings)
+
+    def test_command(self):
+        """Test that the command reports progress and creates the trips."""
+        out = StringIO()
+        call_command("generate_fake_trips", "30", cars=1, batch_size=20, stdout=out)
+        assert "Created 20/30 trips" in out.getvalue()
+        assert "Created 30 trips for Fake car 1." in out.getvalue()
+        assert Trip.objects.count() == 30
+
+    def test_command_rejects_no_cars(self):
+        """Test that at least one car is needed."""
+        with pytest.raises(CommandError, match="at least 1"):
+            call_command("generate_fake_trips", "30", cars=0)
@@ -0,0 +1,195 @@
+"""Unit tests for the CSV and NDJSON trip import."""
+
+import json
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+import pytest
+
+from trips.export import export_rows, stream_csv, stream_ndjson
+from trips.imports import InvalidRowError, format_for, import_trips, parse_csv, parse_ndjson
+from trips.models import Car, Destination, Trip, TripRollup
+
+
+@pytest.fixture
+def car(db):
+    """Create the car the imported trips belong to."""
+    return Car.objects.create(name="Import Car")
+
+
+def rows(count, car_name="Import Car", bad_row=None):
+    """Export-format rows for count trips, with an unknown car at 1-based row bad_row."""
+    return [
+        {
+            "id": index,
+            "date": date(2025, 1, index % 28 + 1),
+            "destination": f"Place {index % 3}",
+            "reason": "Imported",
+            "distance": Decimal(f"{index}.5"),
+            "car": "Nowhere" if index + 1 == bad_row else car_name,
+        }
+        for index in range(count)
+    ]
+
+
+def csv_lines(count, **kwargs):
+    """A CSV file of count trips, as trips.export writes it."""
+    return StringIO("".join(stream_csv(rows(count, **kwargs))))
+
+
+@pytest.mark.django_db
+class TestImportTrips:
+    """Tests for import_trips."""
+
+    def test_csv_round_trip(self, car):
+        """Test that an exported CSV imports back as the same trips, with the bookkeeping updated."""
+        assert import_trips(parse_csv(csv_lines(5)), batch_size=2) == 5
+        exported = [{key: value for key, value in row.items() if key != "id"} for row in export_rows(Trip.objects)]
+        expected = [{key: value for key, value in row.items() if key != "id"} for row in rows(5)]
+        assert sorted(exported, key=lambda row: row["date"]) == expected
+        car.refresh_from_db()
+        assert (car.trip_count, car.total_distance) == (5, Decimal("12.5"))
+        assert TripRollup.objects.get(car=car).trip_count == 5
+        assert Destination.objects.get(name="Place 0").trip_count == 2
+
+    def test_ndjson(self, car):
+        """Test that NDJSON as written by the export is imported, skipping blank lines."""
+        lines = StringIO("".join(stream_ndjson(rows(3))) + "\n")
+        assert import_trips(parse_ndjson(lines)) == 3
+        assert Trip.objects.filter(car=car).count() == 3
+
+    def test_invalid_row_stops_after_earlier_batches(self, car):
+        """Test that an invalid row raises with its position once earlier batches are committed."""
+        batches = []
+        with pytest.raises(InvalidRowError) as excinfo:
+            import_trips(parse_csv(csv_lines(7, bad_row=6)), batch_size=2, on_batch=lambda *args: batches.append(args))
+        assert excinfo.value.row_number == 6
+        assert excinfo.value.errors == {"car": ["Unknown car 'Nowhere'."]}
+        assert batches == [(2, 2), (4, 4)]
+        assert Trip.objects.count() == 4
+
+    def test_validation_errors(self, car):
+        """Test that values are validated with the trip form's rules."""
+        record = {**rows(1)[0], "date": "yesterday", "distance": "far"}
+        with pytest.raises(InvalidRowError) as excinfo:
+            import_trips([record])
+        assert set(excinfo.value.errors) == {"date", "distance"}
+
+    def test_ndjson_line_not_an_object(self, car):
+        """Test that an NDJSON line holding JSON other than an object is an invalid row."""
+        lines = StringIO("".join(stream_ndjson(rows(1))) + '[1, 2]\n"x"\n')
+        invalid = []
+        assert import_trips(parse_ndjson(lines), skip_invalid=True, on_invalid=invalid.append) == 1
+        assert [(error.row_number, error.errors) for error in invalid] == [
+            (2, {"__all__": ["Expected a JSON object."]}),
+            (3, {"__all__": ["Expected a JSON object."]}),
+        ]
+
+    def test_skip_invalid(self, car):
+        """Test that skip_invalid reports bad rows and imports the rest."""
+        invalid = []
+        assert import_trips(parse_csv(csv_lines(4, bad_row=2)), skip_invalid=True, on_invalid=invalid.append) == 3
+        assert [error.row_number for error in invalid] == [2]
+
+    def test_skip(self, car):
+        """Test that the first skip rows are passed over and positions count from the start of the file."""
+        batches = []
+        assert import_trips(parse_csv(csv_lines(5)), batch_size=2, skip=3, on_batch=lambda *a: batches.append(a)) == 2
+        assert batches == [(5, 2)]
+
+    def test_format_for(self):
+        """Test that the format is taken from the file extension."""
+        assert format_for("trips.CSV") == "csv"
+        assert format_for("trips.jsonl") == "ndjson"
+        assert format_for("trips.txt") is None
+
+
+@pytest.mark.django_db
+class TestImportTripsCommand:
+    """Tests for the import_trips management command."""
+
+    def test_import_and_resume(self, car, tmp_path):
+        """Test that a failed import leaves a checkpoint that --resume continues from."""
+        path = tmp_path / "trips.csv"
+        path.write_text(csv_lines(5, bad_row=4).getvalue())
+        checkpoint = tmp_path / "trips.csv.checkpoint"
+
+        with pytest.raises(CommandError, match=r"Row 4.*--resume"):
+            call_command("import_trips", str(path), batch_size=2, stdout=StringIO(), stderr=StringIO())
+        assert json.loads(checkpoint.read_text()) == {"rows": 2}
+        assert Trip.objects.count() == 2
+
+        with pytest.raises(CommandError, match="pass --resume"):
+            call_command("import_trips", str(path), stdout=StringIO())
+
+        path.write_text(csv_lines(5).getvalue())
+        out = StringIO()
+        call_command("import_trips", str(path), batch_size=2, resume=True, stdout=out)
+        assert "Imported 3 trips." in out.getvalue()
+        assert Trip.objects.count() == 5
+        assert not checkpoint.exists()
+
+    def test_resume_without_checkpoint(self, car, tmp_path):
+        """Test that --resume without a checkpoint is an error."""
+        path = tmp_path / "trips.ndjson"
+        path.write_text("")
+        with pytest.raises(CommandError, match="No checkpoint"):
+            call_command("import_trips", str(path), resume=True)
+
+    def test_unknown_format(self, tmp_path):
+        """Test that a file of unknown format needs --format."""
+        with pytest.raises(CommandError, match="pass --format"):
+            call_command("import_trips", str(tmp_path / "trips.txt"))
+
+
+@pytest.mark.django_db
+class TestImportAdmin:
+    """Tests for the trip admin import page."""
+
+    @pytest.fixture
+    def url(self):
+        """The URL of the import page."""
+        return reverse("admin:trips_trip_import")
+
+    @pytest.fixture
+    def upload(self, admin_client, url):
+        """Post content as an uploaded trips.csv."""
+
+        def upload(content, **data):
+            upload = SimpleUploadedFile("trips.csv", content.encode(), content_type="text/csv")
+            return admin_client.post(url, {"file": upload, "skip": 0, **data}, follow=True)
+
+        return upload
+
+    def test_form(self, admin_client, url):
+        """Test that the import page renders its form."""
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert b'name="file"' in response.content
+
+    def test_upload(self, upload, car):
+        """Test that an uploaded CSV is imported and reported."""
+        response = upload(csv_lines(3).getvalue())
+        assert response.redirect_chain[-1][0] == reverse("admin:trips_trip_changelist")
+        assert "Imported 3 trips." in [str(message) for message in response.context["messages"]]
+        assert Trip.objects.count() == 3
+
+    def test_upload_skip_invalid(self, upload, car):
+        """Test that skipped rows are reported as a warning."""
+        response = upload(csv_lines(3, bad_row=2).getvalue(), skip_invalid="on")
+        messages = [str(message) for message in response.context["messages"]]
+        assert messages[0] == "Imported 2 trips."
+        assert messages[1].startswith("Skipped 1 invalid rows: Row 2:")
+
+    def test_upload_invalid_row(self, upload, url, car):
+        """Test that an invalid row stops the upload and is reported."""
+        response = upload(csv_lines(3, bad_row=2).getvalue())
+        assert response.redirect_chain[-1][0] == url
+        [message] = [str(message) for message in response.context["messages"]]
+        assert message.startswith("Row 2:")
+        assert not Trip.objects.exists()
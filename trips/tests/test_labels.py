@@ -0,0 +1,108 @@
+"""Unit tests for the Destination and Reason usage tables."""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+
+import pytest
+
+from trips.bulk import create_trips, delete_trips, update_trips
+from trips.models import Car, Destination, Reason, Trip
+
+
+@pytest.fixture
+def car(db):
+    """Create a test car."""
+    return Car.objects.create(name="Label Car")
+
+
+def make_trip(car, day, destination="Office", reason="Business"):
+    """Create a trip for car on day."""
+    return Trip.objects.create(date=day, destination=destination, reason=reason, distance=Decimal("5.0"), car=car)
+
+
+def usage(model):
+    """Return {name: (trip_count, last_used)} for every row of model."""
+    return {label.name: (label.trip_count, label.last_used) for label in model.objects.all()}
+
+
+@pytest.mark.django_db
+class TestTripLabelSignals:
+    """Tests for keeping destination and reason usage in step with trip writes."""
+
+    def test_create_counts_uses(self, car):
+        """Test that new trips count against their destination and reason."""
+        make_trip(car, date(2025, 3, 1))
+        make_trip(car, date(2025, 3, 5), destination="Airport")
+        assert usage(Destination) == {"Office": (1, date(2025, 3, 1)), "Airport": (1, date(2025, 3, 5))}
+        assert usage(Reason) == {"Business": (2, date(2025, 3, 5))}
+
+    def test_edit_moves_use(self, car):
+        """Test that changing the reason moves the use and drops unused names."""
+        trip = make_trip(car, date(2025, 3, 1))
+        trip.reason = "Personal"
+        trip.save()
+        assert usage(Reason) == {"Personal": (1, date(2025, 3, 1))}
+
+    def test_edit_date_updates_last_used(self, car):
+        """Test that moving a trip earlier recomputes the last use."""
+        make_trip(car, date(2025, 1, 1))
+        trip = make_trip(car, date(2025, 3, 1))
+        trip.date = date(2024, 12, 1)
+        trip.save()
+        assert usage(Destination) == {"Office": (2, date(2025, 1, 1))}
+
+    def test_delete_recomputes_last_used(self, car):
+        """Test that deleting the latest trip falls back to the previous one."""
+        make_trip(car, date(2025, 1, 1))
+        make_trip(car, date(2025, 3, 1)).delete()
+        assert usage(Destination) == {"Office": (1, date(2025, 1, 1))}
+
+    def test_car_delete_cascades(self, car):
+        """Test that deleting a car with trips leaves no unused names behind."""
+        make_trip(car, date(2025, 3, 1))
+        car.delete()
+        assert usage(Destination) == {}
+        assert usage(Reason) == {}
+
+    def test_bulk_writes(self, car):
+        """Test that the bulk write paths keep usage consistent."""
+        with transaction.atomic():
+            trips = create_trips(
+                [
+                    Trip(date=date(2025, 3, day), destination="Office", reason="Business", distance=1, car=car)
+                    for day in (1, 2, 3)
+                ]
+            )
+        assert usage(Destination) == {"Office": (3, date(2025, 3, 3))}
+
+        with transaction.atomic():
+            update_trips([(trips[0], {"destination": "Airport"}), (trips[1], {"distance": Decimal("9.0")})])
+        assert usage(Destination) == {"Office": (2, date(2025, 3, 3)), "Airport": (1, date(2025, 3, 1))}
+
+        with transaction.atomic():
+            delete_trips(trips[1:])
+        assert usage(Destination) == {"Airport": (1, date(2025, 3, 1))}
+        assert usage(Reason) == {"Business": (1, date(2025, 3, 1))}
+
+
+@pytest.mark.django_db
+class TestRebuildLabels:
+    """Tests for rebuilding the usage tables from trips."""
+
+    def test_rebuild_repairs_drift(self, car):
+        """Test that rebuild_rollups recomputes destinations and reasons too."""
+        make_trip(car, date(2025, 3, 1))
+        make_trip(car, date(2025, 4, 1), reason="Personal")
+        expected = usage(Destination), usage(Reason)
+
+        Destination.objects.update(trip_count=99)
+        Reason.objects.filter(name="Personal").delete()
+
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        assert (usage(Destination), usage(Reason)) == expected
+        assert "Rebuilt 1 destinations and 2 reasons" in out.getvalue()
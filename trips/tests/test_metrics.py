@@ -0,0 +1,149 @@
+"""Unit tests for the Prometheus metrics."""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from django.urls import reverse
+
+import pytest
+from prometheus_client import REGISTRY
+from prometheus_client.multiprocess import mark_process_dead
+
+from trips.metrics import exposition
+
+
+CAR_LIST = {"route": "trips:car_list", "method": "GET"}
+
+# What a gunicorn worker does for requests GETs of the car list, leaving one more request in flight
+WORKER = """
+import os
+from trips import metrics
+metrics.request_started()
+for _ in range({requests}):
+    metrics.observe_request("trips:car_list", "GET", 200, 0.01, 2, 0.001)
+print(os.getpid())
+"""
+
+
+@pytest.fixture(autouse=True)
+def debug(settings):
+    """Serve /metrics without a token, as in development."""
+    settings.DEBUG = True
+
+
+@pytest.fixture
+def logged_in_client(client, django_user_model):
+    """Create a client logged in as a regular user."""
+    client.force_login(django_user_model.objects.create_user(username="scraped", password="pass"))
+    return client
+
+
+def samples(text):
+    """The sample lines of an exposition as {name{labels}: value}."""
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def sample(name, labels):
+    """A sample of this process's metrics, 0 until it is first recorded."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def run_worker(directory, requests):
+    """Record requests in another process with its metrics in directory, as a gunicorn worker would; return its pid."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", WORKER.format(requests=requests)],
+        cwd=Path(__file__).resolve().parents[2],
+        env={"PROMETHEUS_MULTIPROC_DIR": str(directory)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout)
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    """Tests for the /metrics endpoint."""
+
+    def test_request_metrics(self, logged_in_client):
+        """Test that requests are counted by route, method and status, with their latency and queries."""
+        requests = sample("http_requests_total", {**CAR_LIST, "status": "200"})
+        latencies = sample("http_request_duration_seconds_count", CAR_LIST)
+        queries = sample("db_queries_total", {"route": "trips:car_list"})
+        logged_in_client.get(reverse("trips:car_list"))
+        logged_in_client.get(reverse("trips:car_list"))
+
+        response = logged_in_client.get(reverse("metrics"))
+        assert response["Content-Type"].startswith("text/plain; version=")
+        text = response.content.decode()
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert sample("http_requests_total", {**CAR_LIST, "status": "200"}) == requests + 2
+        assert sample("http_request_duration_seconds_count", CAR_LIST) == latencies + 2
+        assert sample("db_queries_total", {"route": "trips:car_list"}) > queries
+        values = samples(text)
+        assert values["gunicorn_worker_requests_in_flight"] == "1.0"
+        assert values["gunicorn_workers"] == "1.0"
+
+    def test_buckets_in_order(self, logged_in_client):
+        """Test that histogram buckets are listed in increasing order and are cumulative."""
+        logged_in_client.get(reverse("trips:car_list"))
+        text = logged_in_client.get(reverse("metrics")).content.decode()
+        buckets = re.findall(
+            r'http_request_duration_seconds_bucket\{le="([^"]+)",method="GET",route="trips:car_list"\} ([\d.]+)', text
+        )
+        bounds = [float(bound) for bound, _ in buckets]
+        assert bounds == sorted(bounds)
+        assert bounds[-1] == float("inf")
+        counts = [float(count) for _, count in buckets]
+        assert counts == sorted(counts)
+
+    def test_unmatched_route(self, client):
+        """Test that requests for unknown URLs share one route label."""
+        client.get("/no-such-page/")
+        assert 'method="GET",route="unmatched",status="404"' in client.get(reverse("metrics")).content.decode()
+
+    def test_token(self, client, settings):
+        """Test that METRICS_TOKEN is required as a bearer token when set."""
+        settings.METRICS_TOKEN = "secret"
+        assert client.get(reverse("metrics")).status_code == 403
+        assert client.get(reverse("metrics"), headers={"Authorization": "Bearer wrong"}).status_code == 403
+        assert client.get(reverse("metrics"), headers={"Authorization": "Bearer secret"}).status_code == 200
+
+    def test_no_token_without_debug(self, client, settings):
+        """Test that without METRICS_TOKEN, metrics are only served when DEBUG is on."""
+        settings.METRICS_TOKEN = None
+        settings.DEBUG = False
+        assert client.get(reverse("metrics")).status_code == 403
+        settings.DEBUG = True
+        assert client.get(reverse("metrics")).status_code == 200
+
+
+@pytest.mark.django_db
+class TestMultiprocess:
+    """Tests for adding up the metrics of several worker processes."""
+
+    def test_sums_workers(self, client, monkeypatch, tmp_path):
+        """Test that a scrape adds every worker's counters and lists each worker's gauges."""
+        first = run_worker(tmp_path, 3)
+        second = run_worker(tmp_path, 1)
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+        values = samples(client.get(reverse("metrics")).content.decode())
+        assert values['http_requests_total{method="GET",route="trips:car_list",status="200"}'] == "4.0"
+        assert values[f'gunicorn_worker_requests_in_flight{{pid="{first}"}}'] == "1.0"
+        assert values[f'gunicorn_worker_requests_in_flight{{pid="{second}"}}'] == "1.0"
+        assert values["gunicorn_workers"] == "2.0"
+
+    def test_dead_worker(self, tmp_path):
+        """Test that an exited worker's counters are kept and its gauges dropped."""
+        first = run_worker(tmp_path, 3)
+        second = run_worker(tmp_path, 2)
+        mark_process_dead(first, tmp_path)
+
+        values = samples(exposition(tmp_path).decode())
+        assert values['http_requests_total{method="GET",route="trips:car_list",status="200"}'] == "5.0"
+        assert f'gunicorn_worker_requests_in_flight{{pid="{first}"}}' not in values
+        assert values[f'gunicorn_worker_requests_in_flight{{pid="{second}"}}'] == "1.0"
+        assert values["gunicorn_workers"] == "1.0"
@@ -0,0 +1,105 @@
+"""Unit tests for the request timing and query budget middleware."""
+
+import logging
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+
+from trips.middleware import QueryBudgetExceededError, query_budget
+from trips.models import Car
+from trips.views import CarListView, HomeView, TripCreateView, TripViewSet
+
+
+@pytest.fixture
+def logged_in_client(client, django_user_model):
+    """Create a client logged in as a regular user."""
+    client.force_login(django_user_model.objects.create_user(username="timed", password="pass"))
+    return client
+
+
+@pytest.mark.django_db
+class TestRequestTimingMiddleware:
+    """Tests for RequestTimingMiddleware."""
+
+    def test_server_timing_header(self, logged_in_client):
+        """Test that the header reports every query the request ran."""
+        Car.objects.create(name="Timed Car")
+        with CaptureQueriesContext(connection) as queries:
+            response = logged_in_client.get(reverse("trips:car_list"))
+        db, view = response["Server-Timing"].split(", ")
+        assert db.startswith("db;dur=")
+        assert db.endswith(f';desc="{len(queries)} queries"')
+        assert view.startswith("view;dur=")
+
+    def test_log_line(self, logged_in_client, caplog):
+        """Test that each request is logged with its view, query count and timings."""
+        with caplog.at_level(logging.INFO, logger="trips.middleware"):
+            logged_in_client.get(reverse("trips:car_list"))
+        [record] = caplog.records
+        assert record.getMessage().startswith("GET /trips/cars/ status=200 view=trips:car_list queries=")
+        assert record.view == "trips:car_list"
+        assert record.queries > 0
+        assert record.view_ms >= record.db_ms
+
+    def test_over_budget_raises_in_strict_mode(self, logged_in_client, monkeypatch):
+        """Test that going over a view's budget raises when QUERY_BUDGET_STRICT is set."""
+        monkeypatch.setattr(CarListView, "query_budget", 0)
+        with pytest.raises(QueryBudgetExceededError, match=r"GET /trips/cars/ \(trips:car_list\) ran \d+ queries"):
+            logged_in_client.get(reverse("trips:car_list"))
+
+    def test_over_budget_warns_otherwise(self, logged_in_client, monkeypatch, settings, caplog):
+        """Test that going over a view's budget is logged as a warning outside strict mode."""
+        settings.QUERY_BUDGET_STRICT = False
+        monkeypatch.setattr(CarListView, "query_budget", 0)
+        with caplog.at_level(logging.WARNING, logger="trips.middleware"):
+            response = logged_in_client.get(reverse("trips:car_list"))
+        assert response.status_code == 200
+        [warning] = [record for record in caplog.records if record.levelno == logging.WARNING]
+        assert warning.getMessage().endswith("queries, over its budget of 0")
+
+    def test_first_trip_within_budget(self, logged_in_client):
+        """Test that creating a car's first trip, which also creates its rollup and labels, stays within budget."""
+        car = Car.objects.create(name="First Trip Car")
+        payload = {
+            "date": "2025-05-01",
+            "destination": "New Destination",
+            "reason": "New Reason",
+            "distance": "12.5",
+            "car": f"http://testserver{reverse('trips:car-detail', args=[car.pk])}",
+        }
+        response = logged_in_client.post(reverse("trips:trip-list"), payload, content_type="application/json")
+        assert response.status_code == 201
+
+    def test_viewset_action_budget(self, logged_in_client, monkeypatch):
+        """Test that viewset budgets are looked up by action."""
+        monkeypatch.setattr(TripViewSet, "query_budget", {"retrieve": 0})
+        assert logged_in_client.get(reverse("trips:trip-list")).status_code == 200
+        monkeypatch.setattr(TripViewSet, "query_budget", {"list": 0})
+        with pytest.raises(QueryBudgetExceededError):
+            logged_in_client.get(reverse("trips:trip-list"))
+
+
+class TestQueryBudget:
+    """Tests for looking up a view's query budget."""
+
+    def test_single_budget(self):
+        """Test that a number applies to every method."""
+        assert query_budget(HomeView.as_view(), "POST") == HomeView.query_budget
+
+    def test_per_method(self):
+        """Test that a dict is keyed by lowercase method, and unlisted methods are not checked."""
+        view = TripCreateView.as_view()
+        assert query_budget(view, "POST") == TripCreateView.query_budget["post"]
+        assert query_budget(view, "OPTIONS") is None
+
+    def test_per_action(self):
+        """Test that viewset budgets are keyed by the action the method maps to."""
+        view = TripViewSet.as_view({"get": "retrieve", "put": "update"})
+        assert query_budget(view, "PUT") == TripViewSet.query_budget["update"]
+
+    def test_function_view(self):
+        """Test that views without a class have no budget."""
+        assert query_budget(lambda request: None, "GET") is None
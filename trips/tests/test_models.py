@@ -1,6 +1,6 @@
 """Unit tests for trips models."""
 
-from datetime import timedelta
+from datetime import date, timedelta
 from decimal import Decimal
 
 from django.db import IntegrityError
@@ -139,3 +139,59 @@ class TestOdometerModel:
         readings = list(Odometer.objects.all())
         assert readings[0].date == today
         assert readings[1].date == yesterday
+
+
+@pytest.mark.django_db
+class TestDateRangeQuerySet:
+    """Tests for the for_year/for_month/for_fiscal_year date range filters."""
+
+    @pytest.fixture
+    def car(self):
+        """Create a car with trips and readings around the 2024/2025 boundaries."""
+        car = Car.objects.create(name="Range Car")
+        for day in (date(2024, 12, 31), date(2025, 1, 1), date(2025, 3, 31), date(2025, 4, 1), date(2025, 12, 31)):
+            Trip.objects.create(date=day, destination="A", reason="B", distance=Decimal("1.0"), car=car)
+            Odometer.objects.create(date=day, car=car, km=day.toordinal())
+        Trip.objects.create(date=date(2026, 1, 1), destination="A", reason="B", distance=Decimal("1.0"), car=car)
+        return car
+
+    def dates(self, queryset):
+        """Return the sorted dates in queryset."""
+        return sorted(queryset.values_list("date", flat=True))
+
+    def test_for_year(self, car):
+        """Test that a year includes Jan 1 and Dec 31 but nothing either side."""
+        assert self.dates(Trip.objects.for_year(2025)) == [
+            date(2025, 1, 1),
+            date(2025, 3, 31),
+            date(2025, 4, 1),
+            date(2025, 12, 31),
+        ]
+
+    def test_for_month(self, car):
+        """Test month ranges, including December rolling into the next year."""
+        assert self.dates(Trip.objects.for_month(2025, 3)) == [date(2025, 3, 31)]
+        assert self.dates(Trip.objects.for_month(2025, 12)) == [date(2025, 12, 31)]
+
+    def test_for_fiscal_year(self, car):
+        """Test that fiscal years start on the first of start_month."""
+        assert self.dates(Trip.objects.for_fiscal_year(2025, start_month=4)) == [
+            date(2025, 4, 1),
+            date(2025, 12, 31),
+            date(2026, 1, 1),
+        ]
+        assert self.dates(Trip.objects.for_fiscal_year(2024, start_month=4)) == [
+            date(2024, 12, 31),
+            date(2025, 1, 1),
+            date(2025, 3, 31),
+        ]
+
+    def test_odometer_for_year(self, car):
+        """Test that odometer readings share the same range API."""
+        assert self.dates(Odometer.objects.for_year(2024)) == [date(2024, 12, 31)]
+
+    def test_emits_range_not_extract(self, car):
+        """Test that month filters compile to a plain range on date."""
+        sql = str(Trip.objects.for_month(2025, 3).query)
+        assert "django_date_extract" not in sql
+        assert "EXTRACT" not in sql.upper()
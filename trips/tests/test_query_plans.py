@@ -0,0 +1,136 @@
+"""Query plan regression tests for the hot trip and odometer querysets.
+
+These run EXPLAIN against SQLite and fail if a query falls back to a full
+table scan or needs a temporary b-tree to satisfy its ORDER BY.
+"""
+
+import re
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory
+
+import pytest
+
+from trips.models import Car, Odometer, Trip
+from trips.views import TripListView
+
+
+pytestmark = pytest.mark.skipif(connection.vendor != "sqlite", reason="EXPLAIN output is SQLite-specific")
+
+FULL_SCAN = re.compile(r"\bSCAN (trips_trip|trips_odometer)\b(?! USING)")
+
+
+def assert_uses_index(queryset):
+    """Assert the queryset's plan never scans a trips table without an index."""
+    plan = queryset.explain()
+    assert not FULL_SCAN.search(plan), plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+    return plan
+
+
+@pytest.fixture
+def car(db):
+    """Create a car with a few trips and odometer readings."""
+    car = Car.objects.create(name="Plan Car")
+    for month in range(1, 13):
+        Trip.objects.create(
+            date=date(2025, month, 10),
+            destination="Office",
+            reason="Business",
+            distance=Decimal("12.5"),
+            car=car,
+        )
+        Odometer.objects.create(date=date(2025, month, 1), car=car, km=1000 * month)
+    return car
+
+
+def trip_list_queryset(**params):
+    """Build TripListView's queryset for the given GET parameters."""
+    view = TripListView()
+    view.request = RequestFactory().get("/trips/trips/", params)
+    return view.get_queryset()
+
+
+@pytest.mark.django_db
+class TestTripQueryPlans:
+    """Trip querysets should be served from the (car, date) and date indexes."""
+
+    def test_trip_list_by_car(self, car):
+        plan = assert_uses_index(trip_list_queryset(car=car.pk))
+        assert "trip_car_date_idx" in plan
+
+    def test_trip_list_by_year(self, car):
+        assert_uses_index(trip_list_queryset(year="2025"))
+
+    def test_trip_list_by_car_and_year(self, car):
+        plan = assert_uses_index(trip_list_queryset(car=car.pk, year="2025"))
+        assert "trip_car_date_idx" in plan
+
+    def test_trip_list_by_reason(self, car):
+        # Matching trips are found by exact reason, so sorting them is fine; scanning every trip is not
+        plan = trip_list_queryset(reason="busi").explain()
+        assert not FULL_SCAN.search(plan), plan
+        assert "trip_reason_date_idx" in plan
+
+    def test_trip_list_keyset_page(self, car):
+        after = Q(date__lt=date(2025, 6, 10)) | Q(date=date(2025, 6, 10), id__lt=6)
+        assert_uses_index(trip_list_queryset().filter(after)[: TripListView.page_size + 1])
+
+    def test_trip_list_keyset_page_by_car(self, car):
+        after = Q(date__lt=date(2025, 6, 10)) | Q(date=date(2025, 6, 10), id__lt=6)
+        plan = assert_uses_index(trip_list_queryset(car=car.pk).filter(after)[: TripListView.page_size + 1])
+        assert "trip_car_date_idx" in plan
+
+    def test_default_ordering(self, car):
+        assert_uses_index(Trip.objects.all()[:10])
+
+    def test_last_trip_lookup(self, car):
+        plan = assert_uses_index(Trip.objects.order_by("-date", "-created")[:1])
+        assert "trip_date_created_idx" in plan
+
+    def test_year_report_trips(self, car):
+        assert_uses_index(Trip.objects.filter(date__year=2025).select_related("car").order_by("date"))
+
+
+@pytest.mark.django_db
+class TestDateRangeQueryPlans:
+    """for_year/for_month/for_fiscal_year should be index range scans on date."""
+
+    @pytest.mark.parametrize(
+        "filter_range",
+        [
+            lambda queryset: queryset.for_year(2025),
+            lambda queryset: queryset.for_month(2025, 6),
+            lambda queryset: queryset.for_fiscal_year(2025, start_month=4),
+        ],
+        ids=["year", "month", "fiscal_year"],
+    )
+    @pytest.mark.parametrize("model", [Trip, Odometer], ids=["trip", "odometer"])
+    def test_range_scan(self, car, model, filter_range):
+        plan = assert_uses_index(filter_range(model.objects.all()))
+        assert "date>? AND date<?" in plan
+
+    def test_month_by_car(self, car):
+        plan = assert_uses_index(Trip.objects.filter(car=car).for_month(2025, 6))
+        assert "trip_car_date_idx (car_id=? AND date>? AND date<?)" in plan
+
+
+@pytest.mark.django_db
+class TestOdometerQueryPlans:
+    """Per-car odometer lookups should be served from the (car, date) index."""
+
+    def test_start_of_year_reading(self, car):
+        queryset = Odometer.objects.filter(car=car, date__lte=date(2025, 1, 31)).order_by("-date")[:1]
+        plan = assert_uses_index(queryset)
+        assert "odometer_car_date_idx" in plan
+
+    def test_end_of_year_reading(self, car):
+        queryset = Odometer.objects.filter(car=car, date__gte=date(2025, 12, 1)).order_by("date")[:1]
+        plan = assert_uses_index(queryset)
+        assert "odometer_car_date_idx" in plan
+
+    def test_readings_by_date(self, car):
+        assert_uses_index(Odometer.objects.filter(date__gte=date(2025, 6, 1)))
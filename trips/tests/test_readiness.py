@@ -0,0 +1,111 @@
+"""Unit tests for the readiness probe."""
+
+import threading
+
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+
+from django_carlog import readiness
+from django_carlog.readiness import READINESS
+
+
+@pytest.fixture(autouse=True)
+def fresh_readiness():
+    """Run the checks afresh in every test."""
+    READINESS.clear()
+    yield
+    READINESS.clear()
+
+
+@pytest.mark.django_db
+class TestReadiness:
+    """Tests for the /ready/ endpoint."""
+
+    @pytest.fixture
+    def url(self):
+        """The URL of the readiness probe."""
+        return reverse("readiness")
+
+    def test_ready(self, client, url):
+        """Test that a working database, migrations and cache report ready, with each check's latency."""
+        response = client.get(url)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "ok"
+        assert set(body["checks"]) == {"database", "migrations", "cache"}
+        assert all(check["ok"] and check["ms"] >= 0 for check in body["checks"].values())
+
+    def test_result_is_cached(self, client, url, monkeypatch):
+        """Test that probes within CACHE_SECONDS reuse the last result without querying."""
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            body = client.get(url).json()
+        assert len(queries) == 0
+        assert body["age_seconds"] < readiness.CACHE_SECONDS
+
+        monkeypatch.setattr(readiness, "CACHE_SECONDS", 0)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        assert len(queries) > 0
+
+    def test_database_down(self, client, url, monkeypatch, caplog):
+        """Test that a database error makes the probe fail, naming only the exception and logging the rest."""
+
+        def unreachable():
+            raise OperationalError("(2003, \"Can't connect to MySQL server on 'db.internal'\")")
+
+        monkeypatch.setitem(readiness.CHECKS, "database", unreachable)
+        response = client.get(url)
+        assert response.status_code == 503
+        body = response.json()
+        assert body["status"] == "unavailable"
+        assert body["checks"]["database"]["error"] == "OperationalError"
+        assert "db.internal" not in response.content.decode()
+        assert "db.internal" in caplog.text
+        assert body["checks"]["cache"]["ok"]
+
+    def test_probes_do_not_wait_for_a_refresh(self, client, url, monkeypatch):
+        """Test that while one thread runs the checks, other probes get the last result at once."""
+        client.get(url)
+        started, release = threading.Event(), threading.Event()
+
+        def hanging():
+            started.set()
+            release.wait(timeout=10)
+            return {}
+
+        monkeypatch.setitem(readiness.CHECKS, "database", hanging)
+        monkeypatch.setattr(readiness, "CACHE_SECONDS", 0)
+        refresh = threading.Thread(target=READINESS.check)
+        refresh.start()
+        try:
+            assert started.wait(timeout=10)
+            ready, report = READINESS.check()
+            assert ready
+            assert set(report["checks"]) == {"database", "migrations", "cache"}
+        finally:
+            release.set()
+            refresh.join()
+
+    def test_not_ready_before_first_result(self, monkeypatch):
+        """Test that a probe arriving while the very first checks run reports not ready."""
+        monkeypatch.setattr(READINESS, "refreshing", True)
+        assert READINESS.check() == (False, {"status": "unavailable", "age_seconds": None, "checks": {}})
+
+    def test_pending_migrations(self, client, url, monkeypatch):
+        """Test that unapplied migrations are listed and make the probe fail."""
+        migration = type("Migration", (), {"app_label": "trips", "name": "9999_future"})
+        monkeypatch.setattr(readiness.MigrationExecutor, "migration_plan", lambda self, targets: [(migration, False)])
+        response = client.get(url)
+        assert response.status_code == 503
+        assert response.json()["checks"]["migrations"]["pending"] == ["trips.9999_future"]
+
+    def test_cache_down(self, client, url, settings):
+        """Test that a cache that does not keep values makes the probe fail."""
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        response = client.get(url)
+        assert response.status_code == 503
+        assert not response.json()["checks"]["cache"]["ok"]
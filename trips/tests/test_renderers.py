@@ -0,0 +1,108 @@
+"""Unit tests for the orjson renderer and parser."""
+
+import uuid
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from io import BytesIO
+
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from trips import renderers
+from trips.models import Car, Trip
+from trips.renderers import OrjsonParser, OrjsonRenderer
+
+
+PAYLOAD = {
+    "distance": Decimal("12.50"),
+    "raw_distance": "12.5",
+    "created": datetime(2025, 5, 1, 8, 30, 15, 123456, tzinfo=UTC),
+    "date": date(2025, 5, 1),
+    "label": gettext_lazy("Trips"),
+    "id": uuid.UUID(int=1),
+    "by_year": {2025: 3},
+    "destination": "Montréal\u2028Québec",
+    "trips": [{"ids": (1, 2)}, None, True, 1.5],
+}
+
+
+@pytest.fixture
+def without_orjson(monkeypatch):
+    """Run as if orjson were not installed."""
+    monkeypatch.setattr(renderers, "HAS_ORJSON", False)
+
+
+class TestOrjsonRenderer:
+    """Tests for OrjsonRenderer."""
+
+    def test_matches_json_renderer(self):
+        """Test that the output is byte for byte what JSONRenderer gives."""
+        assert OrjsonRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+    def test_indent(self):
+        """Test that pretty-printed responses are left to JSONRenderer."""
+        media_type = "application/json; indent=4"
+        assert OrjsonRenderer().render(PAYLOAD, media_type) == JSONRenderer().render(PAYLOAD, media_type)
+
+    def test_none(self):
+        """Test that no data renders as an empty body."""
+        assert OrjsonRenderer().render(None) == b""
+
+    def test_without_orjson(self, without_orjson):
+        """Test that rendering falls back to JSONRenderer when orjson is not installed."""
+        assert OrjsonRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+class TestOrjsonParser:
+    """Tests for OrjsonParser."""
+
+    def test_parse(self):
+        """Test that a body parses as JSONParser parses it."""
+        body = JSONRenderer().render({"distance": "12.5", "destination": "Montréal", "ids": [1, 2]})
+        assert OrjsonParser().parse(BytesIO(body)) == JSONParser().parse(BytesIO(body))
+
+    def test_invalid(self):
+        """Test that malformed JSON is a parse error."""
+        with pytest.raises(ParseError, match="JSON parse error"):
+            OrjsonParser().parse(BytesIO(b'{"distance": '))
+
+    def test_without_orjson(self, without_orjson):
+        """Test that parsing falls back to JSONParser when orjson is not installed."""
+        assert OrjsonParser().parse(BytesIO(b'{"distance": "12.5"}')) == {"distance": "12.5"}
+
+
+@pytest.mark.django_db
+class TestAPI:
+    """Tests for the renderer and parser as the API's defaults."""
+
+    @pytest.fixture
+    def api_client(self, django_user_model):
+        """Create an API client authenticated as a regular user."""
+        client = APIClient()
+        client.force_authenticate(django_user_model.objects.create_user(username="rendered", password="pass"))
+        return client
+
+    def test_trip_round_trip(self, api_client):
+        """Test that a trip posted as JSON comes back with its distance formatted as before."""
+        car = Car.objects.create(name="Rendered Car")
+        payload = {
+            "date": "2025-05-01",
+            "destination": "Québec",
+            "reason": "Client",
+            "distance": "12.5",
+            "car": f"http://testserver{reverse('trips:car-detail', args=[car.pk])}",
+        }
+        response = api_client.post(reverse("trips:trip-list"), payload, format="json")
+        assert response.status_code == 201
+        assert response.json()["distance"] == "12.5"
+        assert Trip.objects.get().distance == Decimal("12.5")
+
+        response = api_client.get(reverse("trips:trip-list"))
+        assert type(response.accepted_renderer) is OrjsonRenderer
+        assert response.content == JSONRenderer().render(response.data)
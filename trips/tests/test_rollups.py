@@ -0,0 +1,120 @@
+"""Unit tests for the monthly trip rollups."""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+import pytest
+
+from trips.models import Car, Trip, TripRollup
+
+
+@pytest.fixture
+def car(db):
+    """Create a test car."""
+    return Car.objects.create(name="Rollup Car")
+
+
+@pytest.fixture
+def other_car(db):
+    """Create a second test car."""
+    return Car.objects.create(name="Other Car")
+
+
+def make_trip(car, day, distance="10.0"):
+    """Create a trip for car on day."""
+    return Trip.objects.create(
+        date=day,
+        destination="Office",
+        reason="Business",
+        distance=Decimal(distance),
+        car=car,
+    )
+
+
+def rollup_totals():
+    """Return {(car_id, year, month): (trip_count, total_distance)} for every rollup row."""
+    return {
+        (rollup.car_id, rollup.year, rollup.month): (rollup.trip_count, rollup.total_distance)
+        for rollup in TripRollup.objects.all()
+    }
+
+
+@pytest.mark.django_db
+class TestTripRollupSignals:
+    """Tests for keeping rollups in step with trip writes."""
+
+    def test_create_adds_to_month(self, car):
+        """Test that new trips are added to their month's rollup."""
+        make_trip(car, date(2025, 3, 1), "10.0")
+        make_trip(car, date(2025, 3, 20), "5.5")
+        assert rollup_totals() == {(car.pk, 2025, 3): (2, Decimal("15.5"))}
+
+    def test_edit_distance(self, car):
+        """Test that editing distance adjusts the rollup total."""
+        trip = make_trip(car, date(2025, 3, 1), "10.0")
+        trip.distance = Decimal("12.5")
+        trip.save()
+        assert rollup_totals() == {(car.pk, 2025, 3): (1, Decimal("12.5"))}
+
+    def test_edit_moves_month(self, car):
+        """Test that changing the date moves the trip to the new month."""
+        make_trip(car, date(2025, 3, 1), "4.0")
+        trip = make_trip(car, date(2025, 3, 2), "10.0")
+        trip.date = date(2024, 12, 31)
+        trip.save()
+        assert rollup_totals() == {
+            (car.pk, 2025, 3): (1, Decimal("4.0")),
+            (car.pk, 2024, 12): (1, Decimal("10.0")),
+        }
+
+    def test_edit_moves_car(self, car, other_car):
+        """Test that changing the car moves the trip to the other car's rollup."""
+        trip = make_trip(car, date(2025, 3, 1), "10.0")
+        trip.car = other_car
+        trip.save()
+        assert rollup_totals() == {(other_car.pk, 2025, 3): (1, Decimal("10.0"))}
+
+    def test_unchanged_save(self, car):
+        """Test that saving an unchanged trip leaves the rollup alone."""
+        trip = make_trip(car, date(2025, 3, 1), "10.0")
+        trip.destination = "Elsewhere"
+        trip.save()
+        Trip.objects.get(pk=trip.pk).save()
+        assert rollup_totals() == {(car.pk, 2025, 3): (1, Decimal("10.0"))}
+
+    def test_delete_removes_empty_month(self, car):
+        """Test that deleting the last trip of a month removes its rollup row."""
+        trip = make_trip(car, date(2025, 3, 1))
+        trip.delete()
+        assert rollup_totals() == {}
+
+    def test_car_delete_cascades(self, car):
+        """Test that deleting a car with trips leaves no rollup rows behind."""
+        make_trip(car, date(2025, 3, 1))
+        make_trip(car, date(2025, 4, 1))
+        car.delete()
+        assert rollup_totals() == {}
+
+
+@pytest.mark.django_db
+class TestRebuildRollups:
+    """Tests for the rebuild_rollups management command."""
+
+    def test_rebuild_repairs_drift(self, car, other_car):
+        """Test that rebuilding recomputes totals from the trip table."""
+        make_trip(car, date(2025, 3, 1), "10.0")
+        make_trip(car, date(2025, 3, 2), "2.5")
+        make_trip(other_car, date(2025, 4, 1), "7.0")
+        expected = rollup_totals()
+
+        TripRollup.objects.all().update(trip_count=99)
+        Trip.objects.bulk_create([Trip(date=date(2025, 5, 1), destination="A", reason="B", distance=1, car=car)])
+        expected[(car.pk, 2025, 5)] = (1, Decimal("1.0"))
+
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        assert rollup_totals() == expected
+        assert "Rebuilt 3 trip rollup rows" in out.getvalue()
@@ -1,14 +1,23 @@
 """Unit tests for trips serializers."""
 
+from datetime import date
 from decimal import Decimal
 
 from django.test import RequestFactory
 from django.utils import timezone
 
 import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
 
 from trips.models import Car, Odometer, Trip
-from trips.serializers import CarSerializer, OdometerSerializer, TripSerializer
+from trips.serializers import (
+    CarSerializer,
+    OdometerSerializer,
+    TripSerializer,
+    ValuesSerializer,
+    check_field_selection,
+)
 
 
 @pytest.fixture
@@ -109,3 +118,98 @@ class TestOdometerSerializer:
         expected_fields = ["date", "car", "km"]
         for field in expected_fields:
             assert field in serializer.data
+
+
+@pytest.mark.django_db
+class TestValuesSerializer:
+    """Tests for serializing values() rows like a hyperlinked serializer."""
+
+    @pytest.mark.parametrize("serializer_class", [TripSerializer, OdometerSerializer, CarSerializer])
+    def test_matches_serializer(self, serializer_class, mock_request):
+        """Test that rows come out exactly as the serializer renders the instances."""
+        car = Car.objects.create(name="Values Car")
+        Trip.objects.create(date=date(2025, 5, 1), destination="A", reason="B", distance=Decimal("12.50"), car=car)
+        Odometer.objects.create(date=date(2025, 5, 1), car=car, km=1234)
+        model = serializer_class.Meta.model
+        context = {"request": mock_request}
+
+        values_serializer = ValuesSerializer(serializer_class(context=context))
+        rows = model.objects.order_by("pk").values(*values_serializer.columns)
+        expected = serializer_class(model.objects.order_by("pk"), many=True, context=context).data
+        assert JSONRenderer().render(values_serializer.to_representation(rows)) == JSONRenderer().render(expected)
+
+    def test_columns(self, mock_request):
+        """Test that hyperlinks read the pk and foreign key columns."""
+        values_serializer = ValuesSerializer(TripSerializer(context={"request": mock_request}))
+        assert values_serializer.columns == ["id", "date", "destination", "reason", "distance", "car_id"]
+
+
+@pytest.mark.django_db
+class TestDynamicFields:
+    """Tests for choosing fields and pk relations through the request."""
+
+    @pytest.fixture
+    def trip(self):
+        """Create a trip to serialize."""
+        car = Car.objects.create(name="Dynamic Car")
+        return Trip.objects.create(
+            date=date(2025, 5, 1), destination="A", reason="B", distance=Decimal("12.50"), car=car
+        )
+
+    def test_fields(self, trip, request_factory):
+        """Test that only the requested fields are kept, in the serializer's order."""
+        request = request_factory.get("/", {"fields": "distance,url"})
+        data = TripSerializer(trip, context={"request": request}).data
+        assert data == {"url": f"http://testserver/trips/api/trips/{trip.pk}/", "distance": "12.5"}
+
+    def test_unknown_field(self, request_factory):
+        """Test that asking for a field none of the serializers has is an error."""
+        request = request_factory.get("/", {"fields": "date,name,colour"})
+        with pytest.raises(serializers.ValidationError) as excinfo:
+            check_field_selection(request, [TripSerializer, CarSerializer])
+        assert excinfo.value.detail == {"fields": ["Unknown field: colour"]}
+
+    def test_fields_ignored_for_writes(self, request_factory):
+        """Test that writes take every field whatever fields asks for."""
+        request = request_factory.post("/?fields=date")
+        assert "destination" in TripSerializer(context={"request": request}).fields
+
+    def test_relations_pk(self, trip, request_factory):
+        """Test that pk mode gives the object's id and related pks instead of URLs."""
+        request = request_factory.get("/", {"relations": "pk", "fields": "id,date,distance,car"})
+        data = TripSerializer(trip, context={"request": request}).data
+        assert data == {"id": trip.pk, "date": "2025-05-01", "distance": "12.5", "car": trip.car_id}
+
+    def test_relations_pk_writes(self, trip, request_factory):
+        """Test that pk mode takes related objects by pk."""
+        request = request_factory.post("/?relations=pk")
+        payload = {"date": "2025-05-02", "destination": "C", "reason": "D", "distance": "3.0", "car": trip.car_id}
+        serializer = TripSerializer(data=payload, context={"request": request})
+        assert serializer.is_valid(), serializer.errors
+        assert serializer.save().car == trip.car
+
+    def test_unknown_relations(self, request_factory):
+        """Test that only url and pk relations are accepted."""
+        request = request_factory.get("/", {"relations": "name"})
+        with pytest.raises(serializers.ValidationError):
+            check_field_selection(request, [CarSerializer])
+
+    def test_serializer_ignores_unknown_values(self, request_factory):
+        """Test that serializers built for a bad request, as the browsable API's forms are, do not raise.
+
+        Unknown field names select nothing; an unknown relations mode falls back to URLs.
+        """
+        request = request_factory.get("/", {"relations": "name", "fields": "colour"})
+        assert list(CarSerializer(context={"request": request}).fields) == []
+        request = request_factory.get("/", {"relations": "name"})
+        assert list(CarSerializer(context={"request": request}).fields) == ["url", "name"]
+
+    @pytest.mark.parametrize("query", [{"relations": "pk"}, {"relations": "pk", "fields": "id,km"}, {"fields": "car"}])
+    def test_values_serializer(self, trip, request_factory, query):
+        """Test that ValuesSerializer follows the chosen fields and relations."""
+        Odometer.objects.create(date=date(2025, 5, 1), car=trip.car, km=1234)
+        context = {"request": request_factory.get("/", query)}
+        values_serializer = ValuesSerializer(OdometerSerializer(context=context))
+        rows = Odometer.objects.values(*values_serializer.columns)
+        expected = OdometerSerializer(Odometer.objects.all(), many=True, context=context).data
+        assert values_serializer.to_representation(rows) == expected
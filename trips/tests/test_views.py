@@ -4,12 +4,15 @@ from datetime import date
 from decimal import Decimal
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 import pytest
 
 from trips.models import Car, Odometer, Trip
+from trips.views import TripListView
 
 
 @pytest.fixture
@@ -133,6 +136,15 @@ class TestTripListView:
         assert response.status_code == 200
         assert sample_trip in response.context["trips"]
 
+    def test_trip_list_filter_by_partial_reason(self, client, sample_trip, sample_car):
+        """Test that the reason filter still matches case-insensitive substrings."""
+        Trip.objects.create(
+            date=date(2025, 2, 1), destination="A", reason="Personal", distance=Decimal("4.0"), car=sample_car
+        )
+        response = client.get(reverse("trips:trip_list"), {"reason": "SINE"})
+        assert list(response.context["trips"]) == [sample_trip]
+        assert response.context["reasons"] == ["Business", "Personal"]
+
     def test_trip_list_context_has_filters(self, client, sample_trip):
         """Test that trip list has filter options in context."""
         response = client.get(reverse("trips:trip_list"))
@@ -141,6 +153,44 @@ class TestTripListView:
         assert "reasons" in response.context
         assert "total_distance" in response.context
 
+    def test_trip_list_keyset_pages(self, client, sample_car, monkeypatch):
+        """Test paging through trips with the load more cursor."""
+        monkeypatch.setattr(TripListView, "page_size", 2)
+        trips = [
+            Trip.objects.create(
+                date=date(2025, 1, day), destination="A", reason="B", distance=Decimal("1.0"), car=sample_car
+            )
+            for day in (10, 10, 10, 9, 8)
+        ]
+        expected = sorted(trips, key=lambda trip: (trip.date, trip.pk), reverse=True)
+
+        seen = []
+        params = {"car": str(sample_car.pk)}
+        while True:
+            response = client.get(reverse("trips:trip_list"), params)
+            assert response.context["trip_count"] == 5
+            assert response.context["total_distance"] == Decimal("5.0")
+            seen.extend(response.context["trips"])
+            if not response.context["next_cursor"]:
+                break
+            assert "Load more" in response.content.decode()
+            params["after"] = response.context["next_cursor"]
+        assert seen == expected
+
+    def test_trip_list_totals_with_reason_filter(self, client, sample_trip, sample_car):
+        """Test that totals cover every matching trip, not just the first page."""
+        Trip.objects.create(
+            date=date(2025, 2, 1), destination="A", reason="Personal", distance=Decimal("4.0"), car=sample_car
+        )
+        response = client.get(reverse("trips:trip_list"), {"reason": "Business"})
+        assert response.context["trip_count"] == 1
+        assert response.context["total_distance"] == Decimal("25.5")
+
+    def test_trip_list_invalid_cursor(self, client):
+        """Test that a malformed cursor is a 404."""
+        response = client.get(reverse("trips:trip_list"), {"after": "not-a-cursor"})
+        assert response.status_code == 404
+
 
 @pytest.mark.django_db
 class TestTripCreateView:
@@ -286,6 +336,45 @@ class TestCRAReportView:
         response = client.get(reverse("trips:cra_report"), {"year": "2020"})
         assert response.status_code == 200
 
+    def test_cra_report_odometer_readings(self, client, sample_trip, sample_odometer):
+        """Test CRA report picks the start and end of year readings per car."""
+        Odometer.objects.create(date=date(2024, 12, 15), car=sample_trip.car, km=49000)
+        end_reading = Odometer.objects.create(date=date(2025, 12, 31), car=sample_trip.car, km=60000)
+        Car.objects.create(name="No Readings")
+        response = client.get(reverse("trips:cra_report"), {"year": "2025"})
+        data = {row["car"].name: row for row in response.context["car_odometer_data"]}
+        assert data["Test Car"]["start_reading"] == sample_odometer
+        assert data["Test Car"]["end_reading"] == end_reading
+        assert data["Test Car"]["total_km_driven"] == 10000
+        assert data["Test Car"]["logged_km"] == Decimal("25.5")
+        assert data["No Readings"]["start_reading"] is None
+        assert data["No Readings"]["total_km_driven"] is None
+
+    def test_cra_report_query_count_is_constant(self, client, sample_car):
+        """Test CRA report query count does not grow with cars or months."""
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(reverse("trips:cra_report"), {"year": "2025"})
+                assert response.status_code == 200
+            return len(queries)
+
+        Trip.objects.create(
+            date=date(2025, 1, 15), destination="A", reason="B", distance=Decimal("1.0"), car=sample_car
+        )
+        Odometer.objects.create(date=date(2025, 1, 1), car=sample_car, km=500)
+        baseline = count_queries()
+
+        for index in range(5):
+            car = Car.objects.create(name=f"Car {index}")
+            Odometer.objects.create(date=date(2025, 1, 1), car=car, km=1000)
+            Odometer.objects.create(date=date(2025, 12, 31), car=car, km=9000)
+            for month in range(1, 13):
+                Trip.objects.create(
+                    date=date(2025, month, 10), destination="A", reason="B", distance=Decimal("2.0"), car=car
+                )
+        assert count_queries() == baseline
+
 
 @pytest.mark.django_db
 class TestCarListView:
@@ -3,6 +3,7 @@ from django.urls import include, path
 from rest_framework import routers
 
 from trips.views import (
+    AutocompleteView,
     CarCreateView,
     CarDeleteView,
     CarListView,
@@ -11,6 +12,7 @@ from trips.views import (
     CRAReportView,
     DashboardView,
     OdometerViewSet,
+    SyncView,
     TripCreateView,
     TripDeleteView,
     TripListView,
@@ -43,6 +45,8 @@ urlpatterns = [
     path("cars/<int:pk>/delete/", CarDeleteView.as_view(), name="car_delete"),
     path("reports/cra/", CRAReportView.as_view(), name="cra_report"),
     # API views
+    path("api/sync/", SyncView.as_view(), name="sync"),
+    path("api/autocomplete/<str:field>/", AutocompleteView.as_view(), name="autocomplete"),
     path("api/", include(router.urls)),
     path("api-auth/", include("rest_framework.urls", namespace="rest_framework")),
 ]
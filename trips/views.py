@@ -1,12 +1,17 @@
-from datetime import date
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
-from django.db.models import Count, Sum
+from django.core import signing
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import redirect
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -17,16 +22,29 @@ from django.views.generic import (
 )
 
 from django_filters import rest_framework as filters
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
-
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from trips import autocomplete
+from trips.bulk import delete_car, delete_trips
+from trips.cache import cached
+from trips.export import EXPORT_FORMATS, PassthroughRenderer, export_rows
 from trips.forms import CarForm, TripForm
-from trips.models import Car, Odometer, Trip
+from trips.models import Car, Odometer, Reason, Tombstone, Trip, TripRollup
+from trips.pagination import DateCursorPagination, after_position
+from trips.renderers import OrjsonRenderer
 from trips.serializers import (
     CarSerializer,
     OdometerSerializer,
     TripSerializer,
     UserSerializer,
+    ValuesSerializer,
+    check_field_selection,
 )
 
 
@@ -35,9 +53,16 @@ from trips.serializers import (
 # =============================================================================
 
 
+def trip_years():
+    """Years with at least one trip, oldest first."""
+    return list(TripRollup.objects.values_list("year", flat=True).distinct().order_by("year"))
+
+
 class HomeView(View):
     """Root page - redirects authenticated users to dashboard, unauthenticated users to login."""
 
+    query_budget = 2
+
     def get(self, request):
         if request.user.is_authenticated:
             return redirect("trips:dashboard")
@@ -49,37 +74,283 @@ class HomeView(View):
 # =============================================================================
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class FieldSelectionMixin:
+    """Answer a ``?relations=`` or ``?fields=`` value the serializers do not understand with a 400.
+
+    Checked in initial(), before the view runs, so that the error is always
+    handled as a bad request, whichever renderer answers.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        check_field_selection(request, self.get_selectable_serializers())
+
+    def get_selectable_serializers(self):
+        return [self.get_serializer_class()]
+
+
+class UserViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 8
 
 
-class CarViewSet(viewsets.ModelViewSet):
+class CarViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     queryset = Car.objects.all()
     serializer_class = CarSerializer
     permission_classes = [IsAuthenticated]
+    # destroy is left out: delete_car runs a few queries per batch of the car's trips and readings
+    query_budget = dict.fromkeys(("list", "retrieve", "create", "update", "partial_update"), 8)
+
+    def perform_destroy(self, instance):
+        delete_car(instance)
 
 
 class TripFilter(filters.FilterSet):
     date = filters.DateFromToRangeFilter(field_name="date")
+    year = filters.NumberFilter(method="filter_year", min_value=1, max_value=9998)
+    month = filters.DateFilter(method="filter_month", input_formats=["%Y-%m"], label="Month (YYYY-MM)")
 
     class Meta:
         model = Trip
         fields = ["car", "date"]
 
+    def filter_year(self, queryset, name, value):
+        return queryset.for_year(int(value))
+
+    def filter_month(self, queryset, name, value):
+        return queryset.for_month(value.year, value.month)
+
 
-class TripViewSet(viewsets.ModelViewSet):
+class TripViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     queryset = Trip.objects.all()
     serializer_class = TripSerializer
     filterset_class = TripFilter
+    pagination_class = DateCursorPagination
     permission_classes = [IsAuthenticated]
+    # Writes include the rollup, label and car total updates from trips.signals.
+    # bulk is left out: it runs a query per car, month and name its items touch.
+    query_budget = {
+        "list": 6,
+        "retrieve": 5,
+        "create": 25,
+        "update": 40,
+        "partial_update": 40,
+        "destroy": 25,
+        "export": 5,
+        "stats": 5,
+    }
 
+    def list(self, request, *args, **kwargs):
+        """List trips from ``values()`` rows through ValuesSerializer: the same JSON, without a model per row."""
+        values_serializer = ValuesSerializer(self.get_serializer())
+        queryset = self.filter_queryset(self.get_queryset()).values("id", "date", *values_serializer.columns)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(values_serializer.to_representation(queryset))
+        return self.get_paginated_response(values_serializer.to_representation(page))
+
+    @action(detail=False, methods=["post", "patch", "delete"])
+    def bulk(self, request):
+        """Create, partially update or delete many trips in one transaction.
+
+        POST takes a list of trips, PATCH a list of partial trips each with an
+        ``id``, and DELETE a list of ids. Nothing is written unless every item
+        is valid; otherwise the response lists the errors for each item.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ["Expected a list of items."]})
+
+        with transaction.atomic():
+            if request.method == "DELETE":
+                return self.bulk_destroy(request.data)
+
+            instance = None
+            if request.method == "PATCH":
+                ids = [item.get("id") for item in request.data if isinstance(item, dict)]
+                instance = list(Trip.objects.filter(pk__in=[pk for pk in ids if isinstance(pk, int)]))
+            serializer = self.get_serializer(instance, data=request.data, many=True, partial=instance is not None)
+            if not serializer.is_valid():
+                errors = serializer.errors
+                # Older DRF reports a list per item, newer a dict keyed by position
+                if isinstance(errors, dict):
+                    errors = [errors.get(index, {}) for index in range(len(request.data))]
+                raise ValidationError(errors)
+            serializer.save()
+
+        response_status = status.HTTP_201_CREATED if request.method == "POST" else status.HTTP_200_OK
+        return Response(serializer.data, status=response_status)
+
+    def bulk_destroy(self, ids):
+        trips = Trip.objects.in_bulk([pk for pk in ids if isinstance(pk, int)])
+        errors = [{} if pk in trips else {"id": ["No trip with this id."]} for pk in ids]
+        if any(errors):
+            raise ValidationError(errors)
+        return Response({"deleted": delete_trips(trips.values())})
+
+    @action(
+        detail=False,
+        url_path=r"export/(?P<export_format>csv|ndjson)",
+        renderer_classes=[OrjsonRenderer, PassthroughRenderer],
+    )
+    def export(self, request, export_format):
+        """Stream every trip matching the TripFilter filters as CSV or NDJSON."""
+        stream, content_type = EXPORT_FORMATS[export_format]
+        rows = export_rows(self.filter_queryset(self.get_queryset()))
+        response = StreamingHttpResponse(stream(rows), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="trips.{export_format}"'
+        return response
+
+    def handle_exception(self, exc):
+        # PassthroughRenderer matches any Accept header, but would write out an error's dict as is
+        if self.action == "export":
+            self.request.accepted_renderer = OrjsonRenderer()
+            self.request.accepted_media_type = OrjsonRenderer.media_type
+        return super().handle_exception(exc)
+
+    # group_by name -> columns it adds to the GROUP BY
+    STATS_GROUPS = {
+        "year": {"year": ExtractYear("date")},
+        "month": {"month": ExtractMonth("date")},
+        "car": {"car_pk": F("car_id"), "car_name": F("car__name")},
+        "reason": {"reason_value": F("reason")},
+    }
 
-class OdometerViewSet(viewsets.ModelViewSet):
+    @action(detail=False)
+    def stats(self, request):
+        """Trip counts and distance totals grouped by any of year, month, car and reason.
+
+        Pass the groups as ``?group_by=year,month``; TripFilter filters apply.
+        Everything is computed by a single GROUP BY query.
+        """
+        group_by = [name for name in request.query_params.get("group_by", "").split(",") if name]
+        unknown = [name for name in group_by if name not in self.STATS_GROUPS]
+        if unknown:
+            raise ValidationError({"group_by": [f"Unknown group: {name}" for name in unknown]})
+
+        columns = {}
+        for name in group_by:
+            columns.update(self.STATS_GROUPS[name])
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        totals = {"trip_count": Count("id"), "total_distance": Sum("distance")}
+        if columns:
+            rows = queryset.values(**columns).annotate(**totals).order_by(*columns)
+        else:
+            rows = [queryset.aggregate(**totals)]
+
+        results = []
+        for row in rows:
+            result = {}
+            if "year" in group_by:
+                result["year"] = row["year"]
+            if "month" in group_by:
+                result["month"] = row["month"]
+            if "car" in group_by:
+                result["car"] = request.build_absolute_uri(reverse("trips:car-detail", args=[row["car_pk"]]))
+                result["car_name"] = row["car_name"]
+            if "reason" in group_by:
+                result["reason"] = row["reason_value"]
+            result["trip_count"] = row["trip_count"]
+            # Match Trip.distance's formatting; some backends drop the places on SUM()
+            result["total_distance"] = str((row["total_distance"] or Decimal(0)).quantize(Decimal("0.1")))
+            results.append(result)
+        return Response({"results": results})
+
+
+class OdometerViewSet(FieldSelectionMixin, viewsets.ModelViewSet):
     queryset = Odometer.objects.all()
     serializer_class = OdometerSerializer
+    pagination_class = DateCursorPagination
+    permission_classes = [IsAuthenticated]
+    query_budget = 8
+
+
+class SyncView(FieldSelectionMixin, APIView):
+    """Every car, trip and odometer reading changed since a sync token, plus deletions.
+
+    Call without ``since`` for a full download, then pass the returned
+    ``token`` as ``since`` to fetch only what changed in between. Deletions
+    are listed as the URLs of the removed objects under ``deleted``, or as
+    their ids with ``?relations=pk``.
+
+    Deletions are only remembered for settings.SYNC_TOMBSTONE_RETENTION, so
+    a token older than that gets a full download too. ``full`` says which
+    kind a response is: after a full one, clients should drop whatever they
+    hold that it does not list.
+    """
+
     permission_classes = [IsAuthenticated]
+    query_budget = 10
+    collections = (
+        ("cars", Car, CarSerializer),
+        ("trips", Trip, TripSerializer),
+        ("odometers", Odometer, OdometerSerializer),
+    )
+    token_salt = "trips.sync"
+    # Tokens are backdated so writes still in flight when the token was issued
+    # are picked up by the next sync. Clients may see a few objects twice.
+    token_overlap = timedelta(minutes=1)
+
+    def get_selectable_serializers(self):
+        # ?fields= may name fields of any collection; each keeps those it has
+        return [serializer_class for _, _, serializer_class in self.collections]
+
+    def get(self, request):
+        since = self.parse_token(request.query_params.get("since"))
+        if since and since < Tombstone.objects.cutoff():
+            # Deletions from before it may have been pruned already
+            since = None
+        token = signing.dumps((timezone.now() - self.token_overlap).isoformat(), salt=self.token_salt)
+        context = {"request": request}
+
+        data = {"token": token, "full": since is None, "deleted": {}}
+        for key, model, serializer_class in self.collections:
+            model_name = model.__name__.lower()
+            queryset = model.objects.order_by("pk")
+            deleted_ids = []
+            if since:
+                queryset = queryset.filter(modified__gte=since)
+                deleted_ids = Tombstone.objects.filter(model_name=model_name, deleted__gte=since).values_list(
+                    "object_id", flat=True
+                )
+            data[key] = serializer_class(queryset, many=True, context=context).data
+            if request.query_params.get("relations") == "pk":
+                data["deleted"][key] = list(deleted_ids)
+            else:
+                data["deleted"][key] = [
+                    request.build_absolute_uri(reverse(f"trips:{model_name}-detail", args=[pk])) for pk in deleted_ids
+                ]
+        return Response(data)
+
+    def parse_token(self, token):
+        if not token:
+            return None
+        try:
+            return datetime.fromisoformat(signing.loads(token, salt=self.token_salt))
+        except (signing.BadSignature, TypeError, ValueError) as e:
+            raise ValidationError({"since": ["Invalid sync token."]}) from e
+
+
+class AutocompleteView(APIView):
+    """Destination or reason suggestions starting with ``q``, most used and most recent first.
+
+    Answered from an in-process index (see trips.autocomplete), so a lookup
+    per keystroke costs no database queries once the index is built.
+    """
+
+    permission_classes = [IsAuthenticated]
+    max_limit = 50
+    query_budget = 4
+
+    def get(self, request, field):
+        if field not in autocomplete.FIELDS:
+            raise Http404
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), self.max_limit)
+        except ValueError as e:
+            raise ValidationError({"limit": ["A valid integer is required."]}) from e
+        return Response(autocomplete.suggest(field, request.query_params.get("q", ""), max(limit, 0)))
 
 
 # =============================================================================
@@ -91,31 +362,41 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     """Main dashboard with stats and quick actions."""
 
     template_name = "trips/dashboard.html"
+    query_budget = 6
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         current_year = date.today().year
 
-        # Get trips for current year
-        year_trips = Trip.objects.filter(date__year=current_year)
-
         context["current_year"] = current_year
-        context["trips_this_year"] = year_trips.count()
-        context["total_distance_year"] = year_trips.aggregate(total=Sum("distance"))["total"] or Decimal(0)
-        context["recent_trips"] = Trip.objects.all()[:10]
+        context.update(cached("dashboard", self.get_stats, current_year))
 
         return context
 
+    def get_stats(self, current_year):
+        # Year totals come from the monthly rollups rather than the trip table
+        year_totals = TripRollup.objects.filter(year=current_year).aggregate(
+            trip_count=Sum("trip_count"),
+            total_distance=Sum("total_distance"),
+        )
+        return {
+            "trips_this_year": year_totals["trip_count"] or 0,
+            "total_distance_year": year_totals["total_distance"] or Decimal(0),
+            "recent_trips": list(Trip.objects.select_related("car")[:10]),
+        }
+
 
 class TripListView(LoginRequiredMixin, ListView):
-    """List all trips with filtering."""
+    """List trips with filtering, newest first, one keyset page at a time."""
 
     model = Trip
     template_name = "trips/trip_list.html"
     context_object_name = "trips"
+    page_size = 50
+    query_budget = 10
 
     def get_queryset(self):
-        queryset = Trip.objects.select_related("car").all()
+        queryset = Trip.objects.select_related("car").order_by("-date", "-id")
 
         # Apply filters
         year = self.request.GET.get("year")
@@ -123,32 +404,79 @@ class TripListView(LoginRequiredMixin, ListView):
         reason = self.request.GET.get("reason")
 
         if year:
-            queryset = queryset.filter(date__year=year)
+            try:
+                queryset = queryset.for_year(int(year))
+            except ValueError as e:
+                raise Http404("Invalid year.") from e
         if car:
             queryset = queryset.filter(car_id=car)
         if reason:
-            queryset = queryset.filter(reason__icontains=reason)
+            # Match against the small table of distinct reasons, then select trips by exact value
+            queryset = queryset.filter(reason__in=Reason.objects.filter(name__icontains=reason).values("name"))
 
         return queryset
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+        trips, next_cursor = self.get_page(self.object_list)
+        context = super().get_context_data(object_list=trips, **kwargs)
+        context["next_cursor"] = next_cursor
 
         # Get filter options
-        context["years"] = Trip.objects.dates("date", "year").values_list("date__year", flat=True).distinct()
+        context["years"] = cached("trip_years", trip_years)
         context["cars"] = Car.objects.all()
-        context["reasons"] = Trip.objects.values_list("reason", flat=True).distinct().order_by("reason")
+        context["reasons"] = cached("trip_reasons", lambda: list(Reason.objects.values_list("name", flat=True)))
 
         # Selected filters
         context["selected_year"] = self.request.GET.get("year", "")
         context["selected_car"] = self.request.GET.get("car", "")
         context["selected_reason"] = self.request.GET.get("reason", "")
 
-        # Calculate total distance for filtered results
-        context["total_distance"] = self.get_queryset().aggregate(total=Sum("distance"))["total"] or Decimal(0)
+        context["trip_count"], context["total_distance"] = self.get_totals(self.object_list)
 
         return context
 
+    def get_page(self, queryset):
+        """Return the page of trips after the ``after`` cursor, and the cursor for the next page.
+
+        Cursors are ``<date>_<id>`` of the last trip shown, so each page is an
+        index range scan on (date, id) instead of an OFFSET over earlier pages.
+        """
+        after = self.request.GET.get("after")
+        if after:
+            try:
+                after_date, after_id = after.split("_")
+                after_date, after_id = date.fromisoformat(after_date), int(after_id)
+            except ValueError as e:
+                raise Http404("Invalid page cursor.") from e
+            queryset = queryset.filter(after_position(after_date, after_id))
+
+        trips = list(queryset[: self.page_size + 1])
+        if len(trips) <= self.page_size:
+            return trips, None
+        trips = trips[: self.page_size]
+        last = trips[-1]
+        return trips, f"{last.date.isoformat()}_{last.pk}"
+
+    def get_totals(self, queryset):
+        """Trip count and total distance for the filtered results.
+
+        Year and car filters line up with the monthly rollups; a reason filter
+        has to fall back to a single aggregate over the filtered trips.
+        """
+        year = self.request.GET.get("year")
+        car = self.request.GET.get("car")
+
+        if self.request.GET.get("reason"):
+            totals = queryset.order_by().aggregate(trip_count=Count("id"), total_distance=Sum("distance"))
+        else:
+            rollups = TripRollup.objects.all()
+            if year:
+                rollups = rollups.filter(year=year)
+            if car:
+                rollups = rollups.filter(car_id=car)
+            totals = rollups.aggregate(trip_count=Sum("trip_count"), total_distance=Sum("total_distance"))
+        return totals["trip_count"] or 0, totals["total_distance"] or Decimal(0)
+
 
 class TripCreateView(LoginRequiredMixin, CreateView):
     """Create a new trip."""
@@ -157,6 +485,7 @@ class TripCreateView(LoginRequiredMixin, CreateView):
     form_class = TripForm
     template_name = "trips/trip_form.html"
     success_url = reverse_lazy("trips:trip_list")
+    query_budget = {"get": 10, "post": 25}
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -167,11 +496,9 @@ class TripCreateView(LoginRequiredMixin, CreateView):
         context["prefill_destination"] = self.request.GET.get("destination", "")
         context["prefill_reason"] = self.request.GET.get("reason", "")
 
-        # Common destinations and reasons for autocomplete
-        context["common_destinations"] = (
-            Trip.objects.values_list("destination", flat=True).distinct().order_by("destination")[:20]
-        )
-        context["common_reasons"] = Trip.objects.values_list("reason", flat=True).distinct().order_by("reason")[:20]
+        # Most used destinations and reasons for autocomplete
+        context["common_destinations"] = autocomplete.suggest("destination")
+        context["common_reasons"] = autocomplete.suggest("reason")
 
         # Default car (most recently used)
         last_trip = Trip.objects.order_by("-date", "-created").first()
@@ -202,6 +529,7 @@ class TripUpdateView(LoginRequiredMixin, UpdateView):
     form_class = TripForm
     template_name = "trips/trip_form.html"
     success_url = reverse_lazy("trips:trip_list")
+    query_budget = {"get": 8, "post": 40}
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -209,10 +537,8 @@ class TripUpdateView(LoginRequiredMixin, UpdateView):
         context["today"] = date.today().isoformat()
         context["prefill_destination"] = ""
         context["prefill_reason"] = ""
-        context["common_destinations"] = (
-            Trip.objects.values_list("destination", flat=True).distinct().order_by("destination")[:20]
-        )
-        context["common_reasons"] = Trip.objects.values_list("reason", flat=True).distinct().order_by("reason")[:20]
+        context["common_destinations"] = autocomplete.suggest("destination")
+        context["common_reasons"] = autocomplete.suggest("reason")
         return context
 
     def form_valid(self, form):
@@ -227,6 +553,7 @@ class TripDeleteView(LoginRequiredMixin, DeleteView):  # type: ignore[misc]
     template_name = "trips/trip_confirm_delete.html"
     success_url = reverse_lazy("trips:trip_list")
     context_object_name = "trip"
+    query_budget = {"get": 6, "post": 25}
 
     def form_valid(self, form):
         messages.success(self.request, "Trip deleted successfully!")
@@ -239,12 +566,11 @@ class CarListView(LoginRequiredMixin, ListView):
     model = Car
     template_name = "trips/car_list.html"
     context_object_name = "cars"
+    query_budget = 5
 
     def get_queryset(self):
-        return Car.objects.annotate(
-            trip_count=Count("trip"),
-            total_distance=Sum("trip__distance"),
-        )
+        # trip_count and total_distance are stored on Car, so this reads one table
+        return cached("car_list", Car.objects.all)
 
 
 class CarCreateView(LoginRequiredMixin, CreateView):
@@ -254,6 +580,7 @@ class CarCreateView(LoginRequiredMixin, CreateView):
     form_class = CarForm
     template_name = "trips/car_form.html"
     success_url = reverse_lazy("trips:car_list")
+    query_budget = 8
 
     def form_valid(self, form):
         messages.success(self.request, "Car added successfully!")
@@ -267,6 +594,7 @@ class CarUpdateView(LoginRequiredMixin, UpdateView):
     form_class = CarForm
     template_name = "trips/car_form.html"
     success_url = reverse_lazy("trips:car_list")
+    query_budget = 8
 
     def form_valid(self, form):
         messages.success(self.request, "Car updated successfully!")
@@ -280,21 +608,26 @@ class CarDeleteView(LoginRequiredMixin, DeleteView):  # type: ignore[misc]
     template_name = "trips/car_confirm_delete.html"
     success_url = reverse_lazy("trips:car_list")
     context_object_name = "car"
+    # Deleting runs a fixed number of queries per batch of delete_car, so only the confirmation page has a budget
+    query_budget = {"get": 5}
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["trip_count"] = Trip.objects.filter(car=self.object).count()
+        context["trip_count"] = self.object.trip_count
         return context
 
     def form_valid(self, form):
+        # Batched rather than Django's cascade, which loads every trip of the car into memory
+        delete_car(self.object)
         messages.success(self.request, "Car deleted successfully!")
-        return super().form_valid(form)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class CRAReportView(LoginRequiredMixin, TemplateView):
     """CRA-compliant mileage report for tax purposes."""
 
     template_name = "trips/cra_report.html"
+    query_budget = 10
 
     # CRA mileage rates by year (cents per km)
     CRA_RATES = {
@@ -307,7 +640,7 @@ class CRAReportView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
 
         # Get available years
-        years = list(Trip.objects.dates("date", "year").values_list("date__year", flat=True).distinct())
+        years = cached("trip_years", trip_years)
         if not years:
             years = [date.today().year]
 
@@ -322,18 +655,23 @@ class CRAReportView(LoginRequiredMixin, TemplateView):
         context["selected_year"] = selected_year
 
         # Get all trips for the year
-        all_trips = Trip.objects.filter(date__year=selected_year).select_related("car").order_by("date")
+        all_trips = Trip.objects.for_year(selected_year).select_related("car").order_by("date")
         context["trips"] = all_trips
 
-        # Summary statistics
-        trips_summary = all_trips.aggregate(total_distance=Sum("distance"))
-        context["trips_summary"] = {
-            "trip_count": all_trips.count(),
-            "total_distance": trips_summary["total_distance"] or Decimal(0),
-        }
+        context.update(cached("cra_report", self.get_year_summary, selected_year))
+
+        # CRA rate and estimated deduction
+        cra_rate = self.CRA_RATES.get(selected_year, Decimal("0.70"))
+        context["cra_rate"] = cra_rate
+        business_distance = context["trips_summary"]["total_distance"]
+        context["estimated_deduction"] = business_distance * cra_rate
+
+        return context
 
-        # Monthly breakdown
-        monthly_data = []
+    def get_year_summary(self, selected_year):
+        """Monthly breakdown, totals and per-car odometer data for the year."""
+        # Monthly breakdown and summary from a single GROUP BY over the rollups
+        year_rollups = TripRollup.objects.filter(year=selected_year)
         month_names = [
             "January",
             "February",
@@ -348,53 +686,79 @@ class CRAReportView(LoginRequiredMixin, TemplateView):
             "November",
             "December",
         ]
-        for month in range(1, 13):
-            month_trips = all_trips.filter(date__month=month)
-            if month_trips.exists():
-                month_total = month_trips.aggregate(total=Sum("distance"))["total"] or Decimal(0)
-                monthly_data.append(
-                    {
-                        "month": month,
-                        "month_name": month_names[month - 1],
-                        "trip_count": month_trips.count(),
-                        "total_distance": month_total,
-                    }
-                )
-        context["monthly_data"] = monthly_data
+        monthly_totals = (
+            year_rollups.order_by("month")
+            .values("month")
+            .annotate(month_trip_count=Sum("trip_count"), month_total_distance=Sum("total_distance"))
+        )
+        monthly_data = [
+            {
+                "month": row["month"],
+                "month_name": month_names[row["month"] - 1],
+                "trip_count": row["month_trip_count"],
+                "total_distance": row["month_total_distance"],
+            }
+            for row in monthly_totals
+            if row["month_trip_count"]
+        ]
+        trips_summary = {
+            "trip_count": sum(month["trip_count"] for month in monthly_data),
+            "total_distance": sum((month["total_distance"] for month in monthly_data), Decimal(0)),
+        }
 
-        # CRA rate and estimated deduction
-        cra_rate = self.CRA_RATES.get(selected_year, Decimal("0.70"))
-        context["cra_rate"] = cra_rate
-        business_distance = context["trips_summary"]["total_distance"]
-        context["estimated_deduction"] = business_distance * cra_rate
+        return {
+            "monthly_data": monthly_data,
+            "trips_summary": trips_summary,
+            # Odometer readings for fiscal year (CRA requirement)
+            "car_odometer_data": self.get_car_odometer_data(selected_year, year_rollups),
+        }
+
+    def get_car_odometer_data(self, selected_year, year_rollups):
+        """Per-car odometer readings and logged distance for the year.
+
+        Runs a fixed number of queries however many cars there are: one for the
+        cars with their start/end reading ids picked by correlated subqueries,
+        one to load those readings, and one GROUP BY for the logged distances.
+        """
+        # Odometer reading closest to start of year
+        start_readings = (
+            Odometer.objects.filter(car=OuterRef("pk"), date__lte=date(selected_year, 1, 31))
+            .order_by("-date")
+            .values("pk")[:1]
+        )
+        # Odometer reading closest to end of year
+        end_readings = (
+            Odometer.objects.filter(car=OuterRef("pk"), date__gte=date(selected_year, 12, 1))
+            .order_by("date")
+            .values("pk")[:1]
+        )
+        cars = list(
+            Car.objects.annotate(
+                start_reading_pk=Subquery(start_readings),
+                end_reading_pk=Subquery(end_readings),
+            )
+        )
+        readings = Odometer.objects.in_bulk(
+            [pk for car in cars for pk in (car.start_reading_pk, car.end_reading_pk) if pk is not None]
+        )
+        logged_km_by_car = dict(
+            year_rollups.order_by()
+            .values("car_id")
+            .annotate(total=Sum("total_distance"))
+            .values_list("car_id", "total")
+        )
 
-        # Odometer readings for fiscal year (CRA requirement)
-        cars = Car.objects.all()
         car_odometer_data = []
         for car in cars:
-            # Get odometer reading closest to start of year
-            start_reading = (
-                Odometer.objects.filter(car=car, date__year__lte=selected_year)
-                .filter(date__lte=date(selected_year, 1, 31))
-                .order_by("-date")
-                .first()
-            )
-            # Get odometer reading closest to end of year
-            end_reading = (
-                Odometer.objects.filter(car=car, date__year__gte=selected_year)
-                .filter(date__gte=date(selected_year, 12, 1))
-                .order_by("date")
-                .first()
-            )
+            start_reading = readings.get(car.start_reading_pk)
+            end_reading = readings.get(car.end_reading_pk)
 
             # Calculate total km driven for the year
             total_km_driven = None
             if start_reading and end_reading:
                 total_km_driven = end_reading.km - start_reading.km
 
-            # Get car's trips for the year
-            car_trips = all_trips.filter(car=car)
-            car_logged_km = car_trips.aggregate(total=Sum("distance"))["total"] or Decimal(0)
+            car_logged_km = logged_km_by_car.get(car.pk) or Decimal(0)
 
             # Calculate business use percentage
             business_percentage = None
@@ -412,6 +776,4 @@ class CRAReportView(LoginRequiredMixin, TemplateView):
                     "business_percentage": business_percentage,
                 }
             )
-        context["car_odometer_data"] = car_odometer_data
-
-        return context
+        return car_odometer_data